@@ -9,15 +9,11 @@ BASE_DIR = Path(__file__).resolve().parent
 LOG_DIR = BASE_DIR / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 
-# 2)  global basicConfig  (tüm import’lar buna bağlanır)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s: %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_DIR / "app.log", encoding="utf-8"),
-        logging.StreamHandler(sys.stdout),
-    ],
-)
+# 2)  logging: tek yapılandırma app.core.logger'da (import anında kurulur).
+#     Çağıran thread yalnızca kuyruğa atar; dosya yazımı BatchQueueListener
+#     thread'inde (wms.log / errors.log), konsol doğrudan.
+from app.core.logger import WMSLogger  # noqa: E402
+WMSLogger.initialize()
 logging.info("Logging başlatıldı  ➜  %s", LOG_DIR)
 
 
@@ -26,6 +22,7 @@ logging.info("Logging başlatıldı  ➜  %s", LOG_DIR)
 from typing import Callable, Any
 
 _toast_cb: Callable[[str, str | None], Any] | None = None   # GUI yüklenince set edilir
+_root_log = logging.getLogger()
 
 def register_toast(cb: Callable[[str, str | None], Any]) -> None:
     """MainWindow, kendi callback’ini burada kaydeder."""
@@ -37,8 +34,8 @@ def toast(title: str, msg: str | None = None) -> None:
     Arka-plan servisleri ile UI sayfaları buraya çağrı yapar.
     GUI açıksa callback devreye girer, yoksa sessizce log’da kalır.
     """
-    import logging
-    logging.info("TOAST ▸ %s – %s", title, msg or "")
+    if _root_log.isEnabledFor(logging.INFO):
+        _root_log.info("TOAST ▸ %s – %s", title, msg or "")
     if _toast_cb:
         _toast_cb(title, msg)
 # ──────────────────────────────────────────────────────────
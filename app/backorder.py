@@ -5,25 +5,71 @@ backorder.py – Eksik satır & sevkiyat kayıtları
  • İki yardımcı tablo oluşturur:
       dbo.backorders       –  eksik (missing) satırlar
       dbo.shipment_lines   –  gönderilen (shipped) satırlar
- • insert_backorder      → eksik satır ekle / güncelle
- • add_shipment          → sevk satırı ekle / güncelle
- • create_tables() ilk import’ta otomatik çalışır
+ • insert_backorders_bulk → eksik satırları tek MERGE ile ekle / güncelle
+                            (dbo.BackorderTVP table-valued parametresi)
+ • insert_backorder      → tek satırlık kısayol
+ • bulk_upsert_backorders → aynı MERGE, fast_executemany ile (TVP'siz)
+ • add_shipments         → sevk satırlarını tek MERGE ile ekle / güncelle
+                            (dbo.ShipmentLineTVP table-valued parametresi)
+ • add_shipment          → tek satırlık kısayol
+ • list_pending / list_fulfilled → pyodbc.Row iterator'ı (`r.order_no`);
+   liste gerekiyorsa *_all() sürümleri, dict gerekiyorsa `row_to_dict(r)`
+ • create_tables() ilk kullanımda bir kez çalışır (süreç başına);
+   şema hazır işareti LOG_DIR/.schema_v<N> dosyasında saklanır.
+   Marker yoksa import sırasında arka plan thread'inde önceden başlatılır;
+   WMS_SKIP_SCHEMA_INIT=1 ile DDL tamamen atlanır
 """
 
 from __future__ import annotations
-from typing import Optional, List, Dict, Any
-import logging, os
+from datetime import date
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Sequence
+import logging, os, threading
 
-from app.dao.logo import get_conn   # aynı ODBC bağlantısını kullanıyoruz
+import pyodbc
+
+from app import LOG_DIR
+from app.dao.logo import get_conn_pooled, SERVER, DATABASE   # ortak ODBC havuzu
 
 _log = logging.getLogger(__name__)
+# Import anında bir kez okunur; SQL sabitleri buna göre üretildiği için
+# BACKORDER_SCHEMA değişikliği uygulamanın yeniden başlatılmasını gerektirir.
 SCHEMA = os.getenv("BACKORDER_SCHEMA", "dbo")
 
 # -------------------------------------------------------------------- #
-#  TABLOLARI OLUŞTUR – yalnızca ilk import’ta                                 #
+#  TABLOLARI OLUŞTUR – süreç başına yalnızca ilk kullanımda             #
 # -------------------------------------------------------------------- #
-def create_tables() -> None:
-    ddl = f"""
+# WMS_SKIP_SCHEMA_INIT=1 → şemanın hazır olduğu varsayılır, DDL hiç çalışmaz
+# (salt-okunur replika, rapor / CLI araçları)
+_SKIP_SCHEMA_INIT = os.getenv("WMS_SKIP_SCHEMA_INIT") == "1"
+_TABLES_READY = _SKIP_SCHEMA_INIT
+_TABLES_LOCK  = threading.Lock()
+_SCHEMA_VERSION = 5          # DDL değiştikçe artır → marker geçersizleşir
+_SCHEMA_MARKER = LOG_DIR / f".schema_v{_SCHEMA_VERSION}"
+_SCHEMA_KEY    = f"{SERVER}/{DATABASE}/{SCHEMA}"
+
+# Tek round-trip'lik kontrol:
+#   2 tablo + shipment_lines.loaded kolonu + BackorderTVP + ShipmentLineTVP
+#   + IX_backorders_fulfilled_date
+#   + IX_backorders_pending / UX_shipment_lines_key (yalnız UNIQUE halleri) → 8
+# Eski veride tekrar eden anahtar yüzünden UNIQUE olmayan yedek indeks
+# kurulduysa sayı 8'e ulaşmaz; marker yazılmaz, her başlangıçta yeniden denenir.
+_SQL_PROBE = """
+SELECT (SELECT COUNT(*) FROM sys.objects
+         WHERE name IN ('backorders','shipment_lines'))
+     + (SELECT COUNT(*) FROM sys.columns
+         WHERE object_id = OBJECT_ID(?) AND name = 'loaded')
+     + (SELECT COUNT(*) FROM sys.types
+         WHERE name IN ('BackorderTVP', 'ShipmentLineTVP')
+           AND is_table_type = 1)
+     + (SELECT COUNT(*) FROM sys.indexes
+         WHERE name = 'IX_backorders_fulfilled_date')
+     + (SELECT COUNT(*) FROM sys.indexes
+         WHERE name IN ('IX_backorders_pending', 'UX_shipment_lines_key')
+           AND is_unique = 1)
+"""
+_PROBE_EXPECTED = 8
+
+_DDL = f"""
     IF NOT EXISTS (SELECT * FROM sys.objects WHERE name='backorders')
     CREATE TABLE {SCHEMA}.backorders(
         id           INT IDENTITY PRIMARY KEY,
@@ -53,37 +99,324 @@ def create_tables() -> None:
     -- Mevcut tabloya loaded kolonu ekle (eğer yoksa)
     IF NOT EXISTS (SELECT * FROM sys.columns WHERE object_id = OBJECT_ID('{SCHEMA}.shipment_lines') AND name = 'loaded')
     ALTER TABLE {SCHEMA}.shipment_lines ADD loaded BIT DEFAULT 0;
+
+    -- insert_backorders_bulk için table-valued parametre tipi
+    IF TYPE_ID('{SCHEMA}.BackorderTVP') IS NULL
+    CREATE TYPE {SCHEMA}.BackorderTVP AS TABLE(
+        order_no     NVARCHAR(32),
+        line_id      INT,
+        warehouse_id INT,
+        item_code    NVARCHAR(64),
+        qty_missing  FLOAT,
+        eta_date     DATE NULL
+    );
+
+    -- add_shipments için table-valued parametre tipi
+    IF TYPE_ID('{SCHEMA}.ShipmentLineTVP') IS NULL
+    CREATE TYPE {SCHEMA}.ShipmentLineTVP AS TABLE(
+        invoice_no   NVARCHAR(32),
+        item_code    NVARCHAR(64),
+        warehouse_id INT,
+        invoiced_qty FLOAT,
+        qty_delta    FLOAT
+    );
+    """
+
+# İndeksler ayrı batch: başarısız olursa tablolar/tipler yine hazırdır
+_DUP_PENDING = f"""SELECT 1 FROM {SCHEMA}.backorders WHERE fulfilled = 0
+                  GROUP BY order_no, item_code HAVING COUNT(*) > 1"""
+_DUP_SHIP = f"""SELECT 1 FROM {SCHEMA}.shipment_lines
+               GROUP BY invoice_no, item_code HAVING COUNT(*) > 1"""
+
+_DDL_INDEXES = f"""
+    -- Açık eksikler: MERGE anahtarı (sipariş + stok başına tek satır) ve
+    -- list_pending için kapsayan filtreli indeks. Kapanan satırlar indekse
+    -- girmez → boyutu yalnızca açık eksik sayısı kadar.
+    -- (v4'teki INCLUDE'suz IX_backorders_open'ın yerini alır)
+    IF EXISTS (SELECT * FROM sys.indexes WHERE name='IX_backorders_open')
+    DROP INDEX IX_backorders_open ON {SCHEMA}.backorders;
+
+    -- Eski veride açık satırlarda tekrar eden (order_no, item_code) varsa
+    -- UNIQUE kurulamaz → aynı kolonlarla UNIQUE olmayan indeks (MERGE yine
+    -- çalışır). Tekrarlar temizlenince sonraki başlangıçta UNIQUE'e yükselir.
+    IF EXISTS (SELECT * FROM sys.indexes
+               WHERE name='IX_backorders_pending' AND is_unique = 0)
+       AND NOT EXISTS ({_DUP_PENDING})
+    DROP INDEX IX_backorders_pending ON {SCHEMA}.backorders;
+
+    IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='IX_backorders_pending')
+    BEGIN
+        IF NOT EXISTS ({_DUP_PENDING})
+            CREATE UNIQUE INDEX IX_backorders_pending
+                ON {SCHEMA}.backorders(order_no, item_code)
+                INCLUDE (line_id, warehouse_id, qty_missing, eta_date,
+                         fulfilled, created_at, fulfilled_at)
+                WHERE fulfilled = 0;
+        ELSE
+            CREATE INDEX IX_backorders_pending
+                ON {SCHEMA}.backorders(order_no, item_code)
+                INCLUDE (line_id, warehouse_id, qty_missing, eta_date,
+                         fulfilled, created_at, fulfilled_at)
+                WHERE fulfilled = 0;
+    END
+
+    -- list_fulfilled(on_date) → fulfilled_at gün aralığı seek'i
+    IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='IX_backorders_fulfilled_date')
+    CREATE INDEX IX_backorders_fulfilled_date
+        ON {SCHEMA}.backorders(fulfilled_at)
+        WHERE fulfilled = 1;
+
+    -- add_shipment MERGE anahtarı. IDENTITY PK yerinde kalır ama MERGE
+    -- (invoice_no, item_code) üzerinden seek yapar; INCLUDE ile UPDATE/INSERT
+    -- için tabloya geri dönülmez.
+    -- Tekrar eden anahtar varsa yukarıdaki gibi UNIQUE olmayan yedek.
+    IF EXISTS (SELECT * FROM sys.indexes
+               WHERE name='UX_shipment_lines_key' AND is_unique = 0)
+       AND NOT EXISTS ({_DUP_SHIP})
+    DROP INDEX UX_shipment_lines_key ON {SCHEMA}.shipment_lines;
+
+    IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='UX_shipment_lines_key')
+    BEGIN
+        IF NOT EXISTS ({_DUP_SHIP})
+            CREATE UNIQUE INDEX UX_shipment_lines_key
+                ON {SCHEMA}.shipment_lines(invoice_no, item_code)
+                INCLUDE (warehouse_id, invoiced_qty, qty_shipped, loaded, last_update);
+        ELSE
+            CREATE INDEX UX_shipment_lines_key
+                ON {SCHEMA}.shipment_lines(invoice_no, item_code)
+                INCLUDE (warehouse_id, invoiced_qty, qty_shipped, loaded, last_update);
+    END
+    """
+
+
+def _marker_ok() -> bool:
+    try:
+        return _SCHEMA_MARKER.read_text(encoding="utf-8") == _SCHEMA_KEY
+    except OSError:
+        return False
+
+
+def create_tables() -> None:
+    """
+    Tabloları (yoksa) oluşturur. Süreç içinde yalnızca bir kez çalışır;
+    marker dosyası bu DB/şema için yazılmışsa sorgu bile atılmaz.
+    """
+    global _TABLES_READY
+    if _TABLES_READY:
+        return
+    with _TABLES_LOCK:
+        if _TABLES_READY:
+            return
+        if not _marker_ok() and _run_ddl():
+            try:
+                _SCHEMA_MARKER.write_text(_SCHEMA_KEY, encoding="utf-8")
+            except OSError as exc:
+                _log.warning("Şema marker yazılamadı: %s", exc)
+        _TABLES_READY = True
+
+
+def _run_ddl() -> bool:
+    """
+    Tablo/tip DDL'i hata verirse yükseltir (onlarsız DAO çalışamaz).
+    İndeks DDL'i hatası yalnızca loglanır. Döner ⇒ şema tam (marker yazılabilir).
     """
-    with get_conn(autocommit=True) as cn:
-        cn.execute(ddl)
-    _log.info("backorders / shipment_lines tabloları hazır.")
+    probe_arg = f"{SCHEMA}.shipment_lines"
+    with get_conn_pooled(autocommit=True) as cn:
+        found = cn.execute(_SQL_PROBE, probe_arg).fetchone()[0]
+        if found >= _PROBE_EXPECTED:
+            return True
+        cn.execute(_DDL)
+        try:
+            cn.execute(_DDL_INDEXES)
+        except pyodbc.Error as exc:
+            _log.error("backorder indeksleri oluşturulamadı: %s", exc)
+            return False
+        found = cn.execute(_SQL_PROBE, probe_arg).fetchone()[0]
+    if found < _PROBE_EXPECTED:
+        _log.warning(
+            "backorders / shipment_lines tablolarında tekrar eden anahtarlar var; "
+            "UNIQUE yerine normal indeks kullanıldı. Tekrarlar temizlenince "
+            "sonraki başlangıçta UNIQUE indekse geçilir.")
+        return False
+    if _log.isEnabledFor(logging.INFO):
+        _log.info("backorders / shipment_lines tabloları hazır.")
+    return True
+
+
+def _warm_up_schema() -> None:
+    try:
+        create_tables()
+    except Exception as exc:             # ilk kullanımda tekrar denenir
+        _log.warning("Şema ön hazırlığı başarısız: %s", exc)
+
+
+def _schedule_schema_init() -> None:
+    """create_tables()'ı import'u bekletmeden arka planda bir kez çalıştırır.
+    DAO fonksiyonları yine create_tables() ile (kilit altında) hazır olmasını bekler."""
+    threading.Thread(target=_warm_up_schema, name="backorder-schema-init",
+                     daemon=True).start()
+
+
+if not _SKIP_SCHEMA_INIT and not _marker_ok():
+    _schedule_schema_init()
 
-# İlk import’ta tablo var mı diye kontrol et
-create_tables()
 
 # -------------------------------------------------------------------- #
 #  BACK-ORDER KAYITLARI                                                #
 # -------------------------------------------------------------------- #
+_SQL_MERGE_BO = f"""
+MERGE {SCHEMA}.backorders AS tgt
+USING ? AS src
+   ON tgt.fulfilled = 0
+  AND tgt.order_no  = src.order_no
+  AND tgt.item_code = src.item_code
+WHEN MATCHED THEN
+    UPDATE SET qty_missing = tgt.qty_missing + src.qty_missing
+WHEN NOT MATCHED THEN
+    INSERT (order_no, line_id, warehouse_id, item_code, qty_missing, eta_date)
+    VALUES (src.order_no, src.line_id, src.warehouse_id,
+            src.item_code, src.qty_missing, src.eta_date);
+"""
+
+
+def _tvp(type_name: str, rows: Iterable[Sequence[Any]]) -> list:
+    """pyodbc TVP parametresi: [tip adı, şema, satır1, satır2, …]"""
+    return [type_name, SCHEMA, *rows]
+
+
+def _coalesce_backorders(rows: Iterable[Sequence[Any]]) -> List[tuple]:
+    """Aynı (order_no, item_code) satırlarını qty_missing toplayarak birleştirir."""
+    merged: Dict[tuple, list] = {}
+    for order_no, line_id, warehouse_id, item_code, qty_missing, eta_date in rows:
+        if isinstance(eta_date, str):
+            eta_date = date.fromisoformat(eta_date)
+        key = (order_no, item_code)
+        if key in merged:
+            merged[key][4] += qty_missing
+        else:
+            merged[key] = [order_no, line_id, warehouse_id, item_code,
+                           qty_missing, eta_date]
+    return [tuple(r) for r in merged.values()]
+
+
+def insert_backorders_bulk(rows: Iterable[Sequence[Any]]) -> int:
+    """
+    rows : (order_no, line_id, warehouse_id, item_code, qty_missing, eta_date)
+
+    Tüm satırlar tek MERGE ile yazılır (1 round-trip). Aynı sipariş + stok
+    birden fazla kez gelirse qty_missing toplanır; MERGE kaynağında tekrar
+    eden anahtar olmaz. Döner ⇒ gönderilen (tekilleştirilmiş) satır sayısı.
+    """
+    merged = _coalesce_backorders(rows)
+    if not merged:
+        return 0
+
+    create_tables()
+    with get_conn_pooled(autocommit=True) as cn:
+        cn.execute(_SQL_MERGE_BO, _tvp("BackorderTVP", merged))
+    return len(merged)
+
+
+# Satır başına parametreli MERGE – fast_executemany ile dizi halinde gider
+_SQL_MERGE_BO_ROW = f"""
+MERGE {SCHEMA}.backorders AS tgt
+USING (VALUES (?, ?, ?, ?, ?, ?))
+      AS src(order_no, line_id, warehouse_id, item_code, qty_missing, eta_date)
+   ON tgt.fulfilled = 0
+  AND tgt.order_no  = src.order_no
+  AND tgt.item_code = src.item_code
+WHEN MATCHED THEN
+    UPDATE SET qty_missing = tgt.qty_missing + src.qty_missing
+WHEN NOT MATCHED THEN
+    INSERT (order_no, line_id, warehouse_id, item_code, qty_missing, eta_date)
+    VALUES (src.order_no, src.line_id, src.warehouse_id,
+            src.item_code, src.qty_missing, src.eta_date);
+"""
+
+# Parametre tipleri sabit → pyodbc her batch'te SQLDescribeParam yapmaz
+_BO_INPUT_SIZES = [
+    (pyodbc.SQL_WVARCHAR, 32, 0),      # order_no
+    (pyodbc.SQL_INTEGER, 0, 0),        # line_id
+    (pyodbc.SQL_INTEGER, 0, 0),        # warehouse_id
+    (pyodbc.SQL_WVARCHAR, 64, 0),      # item_code
+    (pyodbc.SQL_DOUBLE, 0, 0),         # qty_missing
+    (pyodbc.SQL_TYPE_DATE, 0, 0),      # eta_date
+]
+
+
+def bulk_upsert_backorders(rows: Iterable[Sequence[Any]]) -> int:
+    """
+    insert_backorders_bulk ile aynı satır biçimi ve sonuç; TVP yerine
+    `fast_executemany` kullanır (parametre dizisi tek seferde gider).
+    Büyük senkron / rapor aktarımları için.
+    """
+    merged = _coalesce_backorders(rows)
+    if not merged:
+        return 0
+
+    create_tables()
+    with get_conn_pooled(autocommit=True) as cn:
+        cur = cn.cursor()
+        cur.fast_executemany = True
+        cur.setinputsizes(_BO_INPUT_SIZES)
+        cur.executemany(_SQL_MERGE_BO_ROW, merged)
+    return len(merged)
+
+
 def insert_backorder(order_no:str, line_id:int, warehouse_id:int,
                      item_code:str, qty_missing:float, eta_date:Optional[str]=None):
     """
     Aynı sipariş + stok için kayıt varsa qty_missing ↑ artar (idempotent).
+    Birden çok satır için insert_backorders_bulk() tercih edilmeli.
+    """
+    insert_backorders_bulk(
+        [(order_no, line_id, warehouse_id, item_code, qty_missing, eta_date)])
+
+_SQL_MERGE_SHIP = f"""
+MERGE {SCHEMA}.shipment_lines AS tgt
+USING ? AS src
+   ON tgt.invoice_no = src.invoice_no
+  AND tgt.item_code  = src.item_code
+WHEN MATCHED THEN
+    UPDATE
+       SET qty_shipped = tgt.qty_shipped + src.qty_delta,
+           last_update = GETDATE()
+WHEN NOT MATCHED THEN
+    INSERT (invoice_no, item_code,
+            warehouse_id, invoiced_qty, qty_shipped,
+            last_update)
+    VALUES (src.invoice_no, src.item_code,
+            src.warehouse_id, src.invoiced_qty, src.qty_delta,
+            GETDATE());
+"""
+
+
+def add_shipments(rows: Iterable[Sequence[Any]]) -> int:
     """
-    sql_sel = f"""SELECT id, qty_missing FROM {SCHEMA}.backorders
-                  WHERE fulfilled=0 AND order_no=? AND item_code=?"""
-    sql_ins = f"""INSERT INTO {SCHEMA}.backorders
-                  (order_no,line_id,warehouse_id,item_code,qty_missing,eta_date)
-                  VALUES (?,?,?,?,?,?)"""
-    sql_upd = f"""UPDATE {SCHEMA}.backorders
-                  SET qty_missing = qty_missing + ?
-                  WHERE id=?"""
-    with get_conn(autocommit=True) as cn:
-        row = cn.execute(sql_sel, order_no, item_code).fetchone()
-        if row:
-            cn.execute(sql_upd, qty_missing, row.id)
+    rows : (order_no, item_code, warehouse_id, invoiced_qty, qty_delta)
+
+    • Aynı (order_no + item_code) satırı varsa qty_shipped alanını artırır,
+      yoksa yeni satır açar – hepsi tek MERGE / tek round-trip.
+    • Aynı anahtar listede tekrar ederse qty_delta toplanır.
+    Döner ⇒ gönderilen (tekilleştirilmiş) satır sayısı.
+    """
+    merged: Dict[tuple, list] = {}
+    for order_no, item_code, warehouse_id, invoiced_qty, qty_delta in rows:
+        key = (order_no, item_code)
+        if key in merged:
+            merged[key][4] += qty_delta
         else:
-            cn.execute(sql_ins,
-                       order_no,line_id,warehouse_id,item_code,qty_missing,eta_date)
+            merged[key] = [order_no, item_code, warehouse_id,
+                           invoiced_qty, qty_delta]
+    if not merged:
+        return 0
+
+    create_tables()
+    with get_conn_pooled(autocommit=True) as cn:
+        cn.execute(_SQL_MERGE_SHIP,
+                   _tvp("ShipmentLineTVP", (tuple(r) for r in merged.values())))
+    return len(merged)
+
 
 def add_shipment(order_no: str,          # sipariş / fatura kökü
                  trip_date: str,         # YYYY-MM-DD  → gün anahtarı
@@ -93,68 +426,89 @@ def add_shipment(order_no: str,          # sipariş / fatura kökü
                  qty_delta: float):      # bu sevk-tamamlama ile gönderilen
 
     """
-    • Aynı (order_no + item_code) satırı varsa
-      qty_shipped alanını artırır.
-    • Yoksa yeni satır açar.
+    Tek satırlık add_shipments() kısayolu.
     • trip_date parametresi backward compatibility için korunuyor
     """
-
-    sql = f"""
-    MERGE {SCHEMA}.shipment_lines AS tgt
-    USING (SELECT
-              ? AS invoice_no,
-              ? AS item_code) src
-      ON  tgt.invoice_no = src.invoice_no
-      AND tgt.item_code  = src.item_code
-    WHEN MATCHED THEN
-        UPDATE
-           SET qty_shipped = qty_shipped + ?,
-               last_update = GETDATE()
-    WHEN NOT MATCHED THEN
-        INSERT (invoice_no, item_code,
-                warehouse_id, invoiced_qty, qty_shipped,
-                last_update)
-        VALUES (?,?,?,?,?,GETDATE());
-    """
-
-    with get_conn(autocommit=True) as cn:
-        cn.execute(sql,
-                   order_no, item_code,              # src
-                   qty_delta,                        # UPDATE
-                   order_no, item_code,              # INSERT
-                   warehouse_id, invoiced_qty, qty_delta)
+    add_shipments([(order_no, item_code, warehouse_id, invoiced_qty, qty_delta)])
 
 
 # -------------------------------------------------------------------- #
 #  YARDIMCI LİSTELER                                                   #
 # -------------------------------------------------------------------- #
-def list_pending() -> List[Dict[str,Any]]:
-    sql = f"SELECT * FROM {SCHEMA}.backorders WHERE fulfilled=0"
-    with get_conn() as cn:
-        cur = cn.execute(sql)
-        cols = [c[0].lower() for c in cur.description]
-        return [dict(zip(cols,row)) for row in cur.fetchall()]
+# --------------------------------------------------------------------
+#  Satırlar – pyodbc.Row olduğu gibi döner (kopya yok)
+# --------------------------------------------------------------------
+def row_to_dict(r: pyodbc.Row) -> Dict[str, Any]:
+    """dict gereken yerler (DataFrame, JSON) için tek satırı çevirir."""
+    return {c[0].lower(): v for c, v in zip(r.cursor_description, r)}
 
-def mark_fulfilled(back_id:int):
-    sql = f"""UPDATE {SCHEMA}.backorders
+
+# Sabit metin → SQL Server plan cache her çağrıda aynı planı bulur
+_SQL_LIST_PENDING = f"SELECT * FROM {SCHEMA}.backorders WHERE fulfilled=0"
+_SQL_MARK_FULFILLED = f"""UPDATE {SCHEMA}.backorders
               SET fulfilled=1, fulfilled_at=GETDATE() WHERE id=?"""
-    with get_conn(autocommit=True) as cn:
-        cn.execute(sql, back_id)
+_SQL_LIST_FULFILLED = f"SELECT * FROM {SCHEMA}.backorders WHERE fulfilled = 1"
+# Yarı açık gün aralığı [gün, gün+1) → IX_backorders_fulfilled_date üzerinde seek
+_SQL_LIST_FULFILLED_ON = (_SQL_LIST_FULFILLED
+                          + " AND fulfilled_at >= ? AND fulfilled_at < DATEADD(day, 1, ?)")
+
+
+_FETCH_CHUNK = 500
+
+
+def _iter_rows(sql: str, params: tuple) -> Iterator[pyodbc.Row]:
+    """Sonucu `_FETCH_CHUNK`'lık parçalar halinde akıtır; bellek O(chunk).
+    Bağlantı, iterator tükenene / kapanana kadar havuza dönmez: çağıran
+    sonuna kadar tüketmeli ya da erken bırakıyorsa `.close()` etmeli
+    (ör. `contextlib.closing`). Cursor, bağlantı havuza dönmeden kapatılır;
+    sonraki kullanıcı açık sonuç kümesine ("connection is busy") takılmaz."""
+    with get_conn_pooled() as cn:
+        cur = cn.execute(sql, *params)
+        try:
+            cur.arraysize = _FETCH_CHUNK
+            while True:
+                chunk = cur.fetchmany()
+                if not chunk:
+                    break
+                yield from chunk
+        finally:
+            cur.close()
+
+
+def list_pending() -> Iterator[pyodbc.Row]:
+    """Açık eksikler – iterator (sayfalı görünüm / CSV akışı için).
+    Sonuna kadar tüketilmeli ya da close() edilmeli; bkz. _iter_rows."""
+    create_tables()
+    return _iter_rows(_SQL_LIST_PENDING, ())
+
+
+def list_pending_all() -> List[pyodbc.Row]:
+    """list_pending() sonucunu liste olarak döndürür (indeks / len gerekirse)."""
+    return list(list_pending())
+
+def mark_fulfilled(back_id:int):
+    create_tables()
+    with get_conn_pooled(autocommit=True) as cn:
+        cn.execute(_SQL_MARK_FULFILLED, back_id)
 
 
 # --------------------------------------------------------------------
 #  Tamamlanmış eksikler – listele
 # --------------------------------------------------------------------
-def list_fulfilled(on_date: Optional[str] = None) -> List[Dict[str, Any]]:
-    sql = f"SELECT * FROM {SCHEMA}.backorders WHERE fulfilled = 1"
+def list_fulfilled(on_date: Optional[str] = None) -> Iterator[pyodbc.Row]:
+    """Tamamlanmış eksikler – iterator; sonuna kadar tüketilmeli ya da
+    close() edilmeli (bkz. _iter_rows)."""
     if on_date:
-        # güvenlik / performans için parametreli ver
-        sql += " AND CAST(fulfilled_at AS DATE) = ?"
-        params = (on_date,)
+        # güvenlik / performans için parametreli ver; geçersiz tarih → ValueError
+        day = date.fromisoformat(on_date)
+        sql, params = _SQL_LIST_FULFILLED_ON, (day, day)
     else:
-        params = ()
-    with get_conn() as cn:
-        cur = cn.execute(sql, *params)
-        cols = [c[0].lower() for c in cur.description]
-        return [dict(zip(cols, row)) for row in cur.fetchall()]
+        sql, params = _SQL_LIST_FULFILLED, ()
+    create_tables()
+    return _iter_rows(sql, params)
+
+
+def list_fulfilled_all(on_date: Optional[str] = None) -> List[pyodbc.Row]:
+    """list_fulfilled() sonucunu liste olarak döndürür."""
+    return list(list_fulfilled(on_date))
 
@@ -2,6 +2,7 @@
 Uygulama genelinde kullanılan sabitler
 =====================================
 """
+from types import MappingProxyType
 
 # Database sabitleri
 MAX_RETRY = 3
@@ -11,13 +12,10 @@ RETRY_WAIT = 2  # saniye
 DEFAULT_COMPANY_NR = "025"
 DEFAULT_PERIOD_NR = "01"
 
-# Depo ID → Prefix mapping
-WAREHOUSE_PREFIXES = {
-    0: "D1-",
-    1: "D3-",
-    2: "D4-",
-    3: "D5-"
-}
+# Depo ID → Prefix (id'ler 0..3 ardışık → tuple index ile erişilir)
+WAREHOUSE_PREFIXES = ("D1-", "D3-", "D4-", "D5-")
+# id ile .get() gereken (seyrek anahtarlı) çağıranlar için salt-okunur eşlem
+WAREHOUSE_PREFIXES_MAP = MappingProxyType(dict(enumerate(WAREHOUSE_PREFIXES)))
 
 # UI sabitleri
 DEFAULT_SIDEBAR_WIDTH = 200
@@ -30,14 +28,14 @@ DB_STATUS_TIMER_MS = 10_000  # 10 saniye
 DEFAULT_AUTO_REFRESH_SEC = 30
 
 # Ses dosyaları
-SOUND_FILES = {
+SOUND_FILES = MappingProxyType({
     "success": "ding.wav",
     "duplicate": "bip.wav", 
     "error": "error.wav"
-}
+})
 
 # PDF ayarları
-PDF_COLUMN_WIDTHS_MM = [55, 105, 20]  # mm cinsinden
+PDF_COLUMN_WIDTHS_MM = (55, 105, 20)  # mm cinsinden
 
 # CSS tema sabitleri
 DARK_THEME_CSS = """
@@ -2,16 +2,22 @@
 Kullanıcı Authentication ve Session Yönetimi
 ===========================================
 """
+import atexit
 import hashlib
-import json
+import hmac
 import os
+import secrets
+import sqlite3
+import threading
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Optional, List
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 
-from app.core.logger import get_logger
+from app.core.logger import (
+    get_logger, log_user_action, set_user_context, clear_user_context
+)
 from app.core.exceptions import (
     AuthenticationException, InvalidUserException, InactiveUserException,
     FileSystemException, ValidationException
@@ -19,17 +25,62 @@ from app.core.exceptions import (
 
 logger = get_logger(__name__)
 
+# Eski users.json okuma (tek seferlik SQLite'a taşıma) – orjson varsa o
+from app.core.jsonio import json_loads
+
+# Dosya tabanlı kullanıcı deposu: SQLite, username birincil anahtar
+_USER_COLS = (
+    "user_id", "username", "full_name", "email", "role", "warehouse_id",
+    "is_active", "created_at", "last_login", "password_salt", "password_hash",
+)
+_SQL_CREATE_USERS = """
+CREATE TABLE IF NOT EXISTS users(
+    username      TEXT PRIMARY KEY,
+    user_id       INTEGER NOT NULL UNIQUE,
+    full_name     TEXT,
+    email         TEXT,
+    role          TEXT,
+    warehouse_id  INTEGER,
+    is_active     INTEGER NOT NULL DEFAULT 1,
+    created_at    TEXT,
+    last_login    TEXT,
+    password_salt TEXT,
+    password_hash TEXT
+)"""
+_SQL_SELECT_USER = f"SELECT {', '.join(_USER_COLS)} FROM users WHERE username = ?"
+_SQL_SELECT_USERS = f"SELECT {', '.join(_USER_COLS)} FROM users ORDER BY user_id"
+_SQL_INSERT_USER = (
+    f"INSERT INTO users({', '.join(_USER_COLS)}) "
+    f"VALUES ({', '.join('?' * len(_USER_COLS))})"
+)
+_SQL_UPDATE_LAST_LOGIN = "UPDATE users SET last_login = ? WHERE username = ?"
+_SQL_UPDATE_PASSWORD = (
+    "UPDATE users SET password_salt = ?, password_hash = ? WHERE username = ?"
+)
+_UPDATABLE_COLS = frozenset(_USER_COLS) - {"user_id", "username"}
+
+# Varsayılan kullanıcılar: (user_id, username, full_name, email, role, warehouse_id)
+_DEFAULT_USERS = (
+    (1, "admin", "Sistem Yöneticisi", "admin@company.com", "admin", 0),
+    (2, "operator", "Depo Operatörü", "operator@company.com", "operator", 0),
+    (3, "scanner", "Barkod Okuyucu", "scanner@company.com", "scanner", 0),
+)
+
+# WMS_SKIP_DEFAULT_USER_PERSIST=1 → kullanıcı deposu bellekte tutulur,
+# diske dosya yazılmaz (CI / geçici ortamlar)
+_SKIP_DEFAULT_USER_PERSIST = os.getenv("WMS_SKIP_DEFAULT_USER_PERSIST") == "1"
+
 # SQL tabanlı user management'ı import et
 try:
     from app.core.user_db import DatabaseUserManager, User
     USE_DATABASE = True
     logger.info("Using SQL database for user management")
 except Exception as e:
-    logger.warning(f"Database user management not available, using file-based: {e}")
+    logger.warning("Database user management not available, using file-based: %s", e)
     USE_DATABASE = False
     
     # Fallback: File-based user management (eski sistem)
-    @dataclass
+    @dataclass(slots=True)
     class User:
         """Kullanıcı veri sınıfı"""
         user_id: int
@@ -41,10 +92,27 @@ except Exception as e:
         is_active: bool
         created_at: str
         last_login: Optional[str] = None
+        password_salt: Optional[str] = None
+        password_hash: Optional[str] = None
+        # to_dict() sonucu; alan değiştiren kod None'a çekmeli
+        _cached_dict: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
         
         def to_dict(self) -> Dict:
-            """User'ı dictionary'ye çevir"""
-            return asdict(self)
+            """User'ı dictionary'ye çevir (şifre alanları hariç, önbellekli)"""
+            if self._cached_dict is not None:
+                return self._cached_dict
+            self._cached_dict = {
+                'user_id': self.user_id,
+                'username': self.username,
+                'full_name': self.full_name,
+                'email': self.email,
+                'role': self.role,
+                'warehouse_id': self.warehouse_id,
+                'is_active': self.is_active,
+                'created_at': self.created_at,
+                'last_login': self.last_login,
+            }
+            return self._cached_dict
         
         @classmethod
         def from_dict(cls, data: Dict) -> 'User':
@@ -52,101 +120,123 @@ except Exception as e:
             return cls(**data)
 
 
+def _hash_password(password: str, salt: str) -> str:
+    """Dosya tabanlı sistem için tuzlu blake2b özeti (salt ≤ 16 byte)"""
+    return hashlib.blake2b(
+        password.encode('utf-8'), salt=salt.encode('ascii'), digest_size=32
+    ).hexdigest()
+
+
 class UserManager:
     """Kullanıcı yönetimi sınıfı - SQL veya dosya tabanlı"""
     
     def __init__(self, users_file: str = "users.json"):
+        # username → User (yalnızca file-based); add/update/şifre değişiminde
+        # geçersiz kılınır. SQL modunda DatabaseUserManager'ın TTL'li önbelleği
+        # kullanılır – başka terminaldeki değişiklikler en geç TTL sonunda görünür.
+        self._user_cache: Dict[str, User] = {}
         if USE_DATABASE:
             self._db_manager = DatabaseUserManager()
             logger.info("Initialized SQL database user manager")
         else:
-            # Fallback to file-based system
+            # Fallback: yerel SQLite (users.json varsa ilk açılışta taşınır)
             self.users_file = Path(users_file)
-            self.users: Dict[str, User] = {}
-            self._load_users()
-            self._create_default_users()
-            logger.info("Initialized file-based user manager")
+            self.db_file = self.users_file.with_suffix(".db")
+            self._db_lock = threading.Lock()
+            self._db = sqlite3.connect(
+                ":memory:" if _SKIP_DEFAULT_USER_PERSIST else str(self.db_file),
+                isolation_level=None, check_same_thread=False,
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(_SQL_CREATE_USERS)
+            atexit.register(self._db.close)
+            self._next_id = 1
+            # Taşıma + varsayılan kullanıcılar tek işlem: yarım kalan iş diske yansımaz
+            with self._db_lock:
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    self._load_users()
+                    self._create_default_users()
+                except BaseException:
+                    self._db.execute("ROLLBACK")
+                    raise
+                self._db.execute("COMMIT")
+            logger.info("Initialized file-based user manager (%s)", self.db_file)
+    
+    # ---- SQLite yardımcıları (yalnızca file-based sistem) ----
+    def _execute(self, sql: str, *params) -> int:
+        with self._db_lock:
+            return self._db.execute(sql, params).rowcount
+    
+    def _fetch_users(self, sql: str, *params) -> List[User]:
+        with self._db_lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [User(*row[:6], bool(row[6]), *row[7:]) for row in rows]
+    
+    @property
+    def users(self) -> Dict[str, User]:
+        """Tüm kullanıcılar (username → User); geriye dönük uyumluluk için"""
+        return {u.username: u for u in self.get_all_users()}
     
     def _load_users(self):
-        """Kullanıcıları dosyadan yükle (sadece file-based sistemde)"""
+        """
+        Eski users.json'u (varsa) boş SQLite tablosuna bir kez taşı.
+        Çağıran _db_lock'u tutar ve işlemi açar; hata olursa taşıma
+        savepoint'e geri alınır (yarım kayıt kalmaz), tablo boş döner.
+        """
         if USE_DATABASE:
             return
-            
-        if self.users_file.exists():
+        
+        count, max_id = self._db.execute(
+            "SELECT COUNT(*), COALESCE(MAX(user_id), 0) FROM users"
+        ).fetchone()
+        
+        if not count and self.users_file.exists():
+            self._db.execute("SAVEPOINT migrate_users")
             try:
-                with open(self.users_file, 'r', encoding='utf-8') as f:
-                    users_data = json.load(f)
-                    for username, user_data in users_data.items():
-                        self.users[username] = User.from_dict(user_data)
-                logger.info(f"Loaded {len(self.users)} users from {self.users_file}")
+                users_data = json_loads(self.users_file.read_bytes())
+                self._db.executemany(_SQL_INSERT_USER, (
+                    tuple(getattr(User.from_dict(data), c) for c in _USER_COLS)
+                    for data in users_data.values()
+                ))
+                max_id = self._db.execute(
+                    "SELECT COALESCE(MAX(user_id), 0) FROM users"
+                ).fetchone()[0]
+                logger.info("Migrated %d users from %s", len(users_data), self.users_file)
             except Exception as e:
-                logger.error(f"Error loading users: {e}")
-    
-    def _save_users(self):
-        """Kullanıcıları dosyaya kaydet (sadece file-based sistemde)"""
-        if USE_DATABASE:
-            return
-            
-        try:
-            users_data = {username: user.to_dict() for username, user in self.users.items()}
-            with open(self.users_file, 'w', encoding='utf-8') as f:
-                json.dump(users_data, f, ensure_ascii=False, indent=2)
-            logger.info(f"Saved {len(self.users)} users to {self.users_file}")
-        except Exception as e:
-            logger.error(f"Error saving users: {e}")
+                self._db.execute("ROLLBACK TO migrate_users")
+                max_id = 0
+                logger.error("Error loading users: %s", e)
+            finally:
+                self._db.execute("RELEASE migrate_users")
+        self._next_id = max_id + 1
     
     def _create_default_users(self):
         """Varsayılan kullanıcıları oluştur (sadece file-based sistemde)"""
         if USE_DATABASE:
             return
             
-        if not self.users:
-            default_users = [
-                {
-                    "user_id": 1,
-                    "username": "admin",
-                    "full_name": "Sistem Yöneticisi",
-                    "email": "admin@company.com",
-                    "role": "admin",
-                    "warehouse_id": 0,
-                    "is_active": True,
-                    "created_at": datetime.now().isoformat()
-                },
-                {
-                    "user_id": 2,
-                    "username": "operator",
-                    "full_name": "Depo Operatörü",
-                    "email": "operator@company.com",
-                    "role": "operator",
-                    "warehouse_id": 0,
-                    "is_active": True,
-                    "created_at": datetime.now().isoformat()
-                },
-                {
-                    "user_id": 3,
-                    "username": "scanner",
-                    "full_name": "Barkod Okuyucu",
-                    "email": "scanner@company.com",
-                    "role": "scanner",
-                    "warehouse_id": 0,
-                    "is_active": True,
-                    "created_at": datetime.now().isoformat()
-                }
-            ]
-            
-            for user_data in default_users:
-                user = User(**user_data)
-                self.users[user.username] = user
-            
-            self._save_users()
+        if self._next_id == 1:          # tablo boş (çağıran _db_lock'u tutar)
+            now = datetime.now().isoformat()    # tüm seed kullanıcılar için tek zaman damgası
+            self._db.executemany(_SQL_INSERT_USER, (
+                (*u, 1, now, None, None, None) for u in _DEFAULT_USERS
+            ))
+            self._next_id = len(_DEFAULT_USERS) + 1
             logger.info("Created default users: admin, operator, scanner")
     
     def get_user(self, username: str) -> Optional[User]:
-        """Kullanıcı al"""
+        """Kullanıcı al (önbellekli)"""
         if USE_DATABASE:
             return self._db_manager.get_user(username)
-        else:
-            return self.users.get(username)
+        user = self._user_cache.get(username)
+        if user is not None:
+            return user
+        found = self._fetch_users(_SQL_SELECT_USER, username)
+        user = found[0] if found else None
+        if user is not None:
+            self._user_cache[username] = user
+        return user
     
     def authenticate(self, username: str, password: str = None) -> Optional[User]:
         """Kullanıcı doğrula"""
@@ -164,10 +254,19 @@ class UserManager:
             if not user.is_active:
                 raise InactiveUserException(username)
             
-            # Şimdilik basit authentication - production'da gerçek password kontrolü yapılmalı
+            # Şifre atanmış kullanıcıda şifre zorunlu; sabit zamanlı karşılaştırma
+            if user.password_hash:
+                if not password or not hmac.compare_digest(
+                    _hash_password(password, user.password_salt or ""),
+                    user.password_hash,
+                ):
+                    raise InvalidUserException(username)
+            
+            # Yalnızca tek satır güncellenir
             user.last_login = datetime.now().isoformat()
-            self._save_users()
-            logger.info(f"User authenticated: {username}")
+            user._cached_dict = None
+            self._execute(_SQL_UPDATE_LAST_LOGIN, user.last_login, username)
+            logger.info("User authenticated: %s", username)
             return user
     
     def get_all_users(self) -> List[User]:
@@ -175,36 +274,44 @@ class UserManager:
         if USE_DATABASE:
             return self._db_manager.get_all_users()
         else:
-            return list(self.users.values())
+            return self._fetch_users(_SQL_SELECT_USERS)
     
     def add_user(self, user_data: Dict) -> User:
         """Yeni kullanıcı ekle"""
+        self._user_cache.pop(user_data.get('username'), None)
         if USE_DATABASE:
             return self._db_manager.create_user(user_data)
         else:
-            user_data['user_id'] = max([u.user_id for u in self.users.values()], default=0) + 1
             user_data['created_at'] = datetime.now().isoformat()
             user_data['is_active'] = True
+            with self._db_lock:
+                user_data['user_id'] = self._next_id
+                user = User(**user_data)
+                try:
+                    self._db.execute(
+                        _SQL_INSERT_USER, tuple(getattr(user, c) for c in _USER_COLS)
+                    )
+                except sqlite3.IntegrityError:
+                    raise ValidationException("Kullanıcı adı zaten mevcut", field="username")
+                self._next_id += 1
             
-            user = User(**user_data)
-            self.users[user.username] = user
-            self._save_users()
-            
-            logger.info(f"New user added: {user.username}")
+            logger.info("New user added: %s", user.username)
             return user
     
     def update_user(self, username: str, updates: Dict) -> bool:
         """Kullanıcı güncelle"""
+        self._user_cache.pop(username, None)
         if USE_DATABASE:
             return self._db_manager.update_user(username, updates)
         else:
-            if username in self.users:
-                user = self.users[username]
-                for key, value in updates.items():
-                    if hasattr(user, key):
-                        setattr(user, key, value)
-                self._save_users()
-                logger.info(f"User updated: {username}")
+            fields = {k: v for k, v in updates.items() if k in _UPDATABLE_COLS}
+            if not fields:
+                return self.get_user(username) is not None
+            sql = "UPDATE users SET {} WHERE username = ?".format(
+                ", ".join(f"{k} = ?" for k in fields)
+            )
+            if self._execute(sql, *fields.values(), username):
+                logger.info("User updated: %s", username)
                 return True
             return False
     
@@ -213,12 +320,29 @@ class UserManager:
         return self.update_user(username, {'is_active': False})
     
     def change_password(self, username: str, new_password: str) -> bool:
-        """Kullanıcı şifresini değiştir (sadece database sisteminde)"""
+        """Kullanıcı şifresini değiştir"""
+        self._user_cache.pop(username, None)
         if USE_DATABASE:
             return self._db_manager.change_password(username, new_password)
         else:
-            logger.warning("Password change not supported in file-based system")
-            return False
+            if not new_password:
+                return False
+            salt = secrets.token_hex(8)   # 16 karakter = 16 byte
+            if not self._execute(_SQL_UPDATE_PASSWORD,
+                                 salt, _hash_password(new_password, salt), username):
+                return False
+            logger.info("Password changed: %s", username)
+            return True
+
+
+# Rol → yetki tablosu ("*" = her şey)
+_ALL_PERMS = "*"
+_EMPTY_PERMS: frozenset = frozenset()
+_ROLE_PERMS: Dict[str, frozenset] = {
+    "admin": frozenset({_ALL_PERMS}),
+    "operator": frozenset({"scan", "print", "manage_orders"}),
+    "scanner": frozenset({"scan"}),
+}
 
 
 class SessionManager:
@@ -227,6 +351,8 @@ class SessionManager:
     def __init__(self):
         self.current_user: Optional[User] = None
         self.session_start: Optional[datetime] = None
+        self._session_start_monotonic: Optional[float] = None
+        self._perms: frozenset = _EMPTY_PERMS     # login'de rolden çözülür
         self.user_manager = UserManager()
     
     def login(self, username: str, password: str = None) -> bool:
@@ -234,21 +360,14 @@ class SessionManager:
         try:
             user = self.user_manager.authenticate(username, password)
             self.current_user = user
+            self._perms = _ROLE_PERMS.get(user.role, _EMPTY_PERMS)
             self.session_start = datetime.now()
+            self._session_start_monotonic = time.monotonic()
             
-            # Logger context'ini güncelle (circular import olmadan)
-            try:
-                from app.core.logger import WMSLogger
-                for logger_instance in WMSLogger._loggers.values():
-                    for handler in logger_instance.handlers:
-                        for filter_obj in handler.filters:
-                            if hasattr(filter_obj, 'set_user_context'):
-                                filter_obj.set_user_context(user.username, str(user.user_id))
-            except:
-                pass  # Logger context set edilemezse önemli değil
+            # Logger context'ini güncelle
+            set_user_context(user.username, str(user.user_id))
             
             # Session bilgilerini logla
-            from app.core.logger import log_user_action
             log_user_action(
                 "LOGIN",
                 f"User logged in successfully",
@@ -263,7 +382,7 @@ class SessionManager:
             raise
         except Exception as e:
             # Beklenmeyen exception'ı wrap et
-            logger.exception(f"Unexpected error during login: {str(e)}")
+            logger.exception("Unexpected error during login: %s", e)
             raise AuthenticationException(
                 f"Giriş sırasında beklenmeyen hata: {str(e)}",
                 original_exception=e
@@ -272,15 +391,19 @@ class SessionManager:
     def logout(self):
         """Kullanıcı çıkışı"""
         if self.current_user:
-            from app.core.logger import log_user_action
+            started = self._session_start_monotonic
+            duration_sec = int(time.monotonic() - started) if started is not None else None
             log_user_action(
                 "LOGOUT",
-                f"User logged out",
-                session_duration=str(datetime.now() - self.session_start) if self.session_start else "unknown"
+                "User logged out",
+                session_duration_sec=duration_sec
             )
             
+            clear_user_context()
             self.current_user = None
+            self._perms = _EMPTY_PERMS
             self.session_start = None
+            self._session_start_monotonic = None
     
     def get_current_user(self) -> Optional[User]:
         """Mevcut kullanıcıyı al"""
@@ -298,24 +421,8 @@ class SessionManager:
     
     def has_permission(self, permission: str) -> bool:
         """Kullanıcının belirtilen yetkisi var mı"""
-        if not self.is_authenticated():
-            return False
-        
-        role = self.current_user.role
-        
-        # Admin her şeyi yapabilir
-        if role == "admin":
-            return True
-        
-        # Operator scan ve print yapabilir
-        if role == "operator":
-            return permission in ["scan", "print", "manage_orders"]
-        
-        # Scanner sadece scan yapabilir
-        if role == "scanner":
-            return permission == "scan"
-        
-        return False
+        perms = self._perms
+        return _ALL_PERMS in perms or permission in perms
 
 
 # Global session manager instance
@@ -6,7 +6,10 @@ UI katmanında hata yönetimi için yardımcı fonksiyonlar ve sınıflar.
 """
 
 from __future__ import annotations
+import inspect
 import sys
+import threading
+import time
 import traceback
 from typing import Optional, Callable, Any
 from functools import wraps
@@ -28,6 +31,32 @@ from app import toast
 logger = get_logger(__name__)
 
 
+def _db_message(exc: DatabaseException) -> str:
+    """DatabaseException mesajı (severity'e göre)"""
+    if exc.severity == ErrorSeverity.CRITICAL:
+        return "Sistem veritabanına bağlanılamıyor. Lütfen sistem yöneticisi ile iletişime geçin."
+    return "Veri işleme sırasında bir hata oluştu. Lütfen tekrar deneyin."
+
+
+# Exception tipi → kullanıcı mesajı üretici (alt sınıflar __mro__ ile bulunur)
+_MSG_BUILDERS = {
+    AuthenticationException: lambda e: e.message,
+    AuthorizationException: lambda e: e.message,
+    ValidationException: lambda e: f"Veri doğrulama hatası: {e.message}",
+    BusinessLogicException: lambda e: e.message,
+    DatabaseException: _db_message,
+    NetworkException: lambda e: "Ağ bağlantısı sorunu. Lütfen internet bağlantınızı kontrol edin.",
+}
+
+# Severity → (QMessageBox metodu, başlık); listede yoksa bilgi dialog'u
+_SEVERITY_DIALOG = {
+    ErrorSeverity.CRITICAL: ("critical", "Kritik Hata"),
+    ErrorSeverity.HIGH: ("critical", "Hata"),
+    ErrorSeverity.MEDIUM: ("warning", "Uyarı"),
+}
+_DEFAULT_DIALOG = ("information", "Bilgi")
+
+
 class ErrorHandler(QObject):
     """Merkezi hata yönetici sınıfı"""
     
@@ -60,12 +89,12 @@ class ErrorHandler(QObject):
         Returns:
             bool: Hata başarıyla handle edildi mi
         """
-        self._error_count += 1
+        count = self._error_count + 1
+        self._error_count = count
         
         # Çok fazla hata varsa durdur
-        if self._error_count > self._max_errors_per_session:
-            self._show_critical_error("Çok fazla hata oluştu. Uygulama kapatılacak.")
-            sys.exit(1)
+        if count > self._max_errors_per_session:
+            self._abort_session()
         
         # WMS Exception ise
         if isinstance(exception, WMSException):
@@ -87,6 +116,7 @@ class ErrorHandler(QObject):
         context: Optional[str]
     ) -> bool:
         """WMS Exception'ı handle et"""
+        exception.log()
         
         # User action log
         current_user = get_current_user()
@@ -108,8 +138,9 @@ class ErrorHandler(QObject):
         elif show_toast:
             self._show_error_toast(exception, display_message)
         
-        # Signal emit
-        self.error_occurred.emit(exception.error_code, display_message)
+        # Signal emit (bağlı slot yoksa argüman hazırlığı ve dispatch atlanır)
+        if self.receivers(self.error_occurred):
+            self.error_occurred.emit(exception.error_code, display_message)
         
         return True
     
@@ -147,44 +178,18 @@ class ErrorHandler(QObject):
     
     def _get_user_friendly_message(self, exception: WMSException) -> str:
         """Kullanıcı dostu hata mesajı üret"""
-        
-        # Authentication errors
-        if isinstance(exception, (AuthenticationException, AuthorizationException)):
-            return exception.message
-        
-        # Validation errors
-        if isinstance(exception, ValidationException):
-            return f"Veri doğrulama hatası: {exception.message}"
-        
-        # Business logic errors
-        if isinstance(exception, BusinessLogicException):
-            return exception.message
-        
-        # Database errors
-        if isinstance(exception, DatabaseException):
-            if exception.severity == ErrorSeverity.CRITICAL:
-                return "Sistem veritabanına bağlanılamıyor. Lütfen sistem yöneticisi ile iletişime geçin."
-            return "Veri işleme sırasında bir hata oluştu. Lütfen tekrar deneyin."
-        
-        # Network errors
-        if isinstance(exception, NetworkException):
-            return "Ağ bağlantısı sorunu. Lütfen internet bağlantınızı kontrol edin."
+        for cls in type(exception).__mro__:
+            builder = _MSG_BUILDERS.get(cls)
+            if builder is not None:
+                return builder(exception)
         
         # Default
         return exception.message
     
     def _show_error_dialog(self, exception: WMSException, message: str):
-        """Hata dialog'u göster"""
-        
-        # Severity'e göre dialog tipi
-        if exception.severity == ErrorSeverity.CRITICAL:
-            QMessageBox.critical(self.parent, "Kritik Hata", message)
-        elif exception.severity == ErrorSeverity.HIGH:
-            QMessageBox.critical(self.parent, "Hata", message)
-        elif exception.severity == ErrorSeverity.MEDIUM:
-            QMessageBox.warning(self.parent, "Uyarı", message)
-        else:
-            QMessageBox.information(self.parent, "Bilgi", message)
+        """Hata dialog'u göster (severity'e göre dialog tipi)"""
+        kind, title = _SEVERITY_DIALOG.get(exception.severity, _DEFAULT_DIALOG)
+        getattr(QMessageBox, kind)(self.parent, title, message)
     
     def _show_generic_error_dialog(self, exception: Exception, message: str):
         """Generic hata dialog'u göster"""
@@ -204,6 +209,12 @@ class ErrorHandler(QObject):
         """Kritik hata göster"""
         QMessageBox.critical(self.parent, "Kritik Hata", message)
     
+    def _abort_session(self):
+        """Hata limiti aşıldı: kullanıcıyı bilgilendir ve uygulamayı kapat"""
+        logger.critical("Error limit exceeded (%d), shutting down", self._error_count)
+        self._show_critical_error("Çok fazla hata oluştu. Uygulama kapatılacak.")
+        sys.exit(1)
+    
     def reset_error_count(self):
         """Hata sayacını sıfırla"""
         self._error_count = 0
@@ -258,19 +269,23 @@ def error_handler_decorator(
             # implementation
     """
     def decorator(func: Callable) -> Callable:
+        # Bağlam ve metot tespiti dekorasyon anında bir kez çözülür;
+        # hatasız çağrıda wrapper yalnızca func'u çağırır
+        func_context = context or f"{func.__module__}.{func.__name__}"
+        params = inspect.signature(func).parameters
+        has_self = next(iter(params), None) == "self"
+        
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
             try:
                 return func(*args, **kwargs)
             except Exception as e:
-                func_context = context or f"{func.__module__}.{func.__name__}"
-                
-                # Parent widget'ı args'dan bulmaya çalış
-                parent_widget = None
-                for arg in args:
-                    if isinstance(arg, QWidget):
-                        parent_widget = arg
-                        break
+                # Parent widget: yalnızca metodun self'i QWidget ise
+                parent_widget = (
+                    args[0]
+                    if has_self and args and isinstance(args[0], QWidget)
+                    else None
+                )
                 
                 handled = handle_error(
                     e, user_message, show_dialog, show_toast, func_context, parent_widget
@@ -305,10 +320,42 @@ def error_context(
         handle_error(e, user_message, show_dialog, show_toast, context, parent)
 
 
+# Global hata fırtınası koruması: kısa sürede çok sayıda yakalanmamış hata
+# gelirse yalnızca ilk birkaçı için dialog açılır, kalanı sadece loglanır
+_EXCEPTHOOK_BURST = 3            # art arda gösterilebilecek dialog sayısı
+_EXCEPTHOOK_RATE = 0.2           # saniyede yenilenen dialog hakkı (5 sn'de 1)
+
+
+class _TokenBucket:
+    """Basit token bucket (monotonic saat, thread-safe)"""
+    
+    def __init__(self, capacity: int, rate: float):
+        self.capacity = float(capacity)
+        self.rate = rate
+        self._tokens = float(capacity)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def take(self) -> bool:
+        """Token varsa bir tane harca ve True döndür"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
 def setup_global_exception_handler():
     """Global exception handler'ı kur"""
+    bucket = _TokenBucket(_EXCEPTHOOK_BURST, _EXCEPTHOOK_RATE)
+    suppressed = 0
+    
     def excepthook(exc_type, exc_value, exc_traceback):
         """Global exception hook"""
+        nonlocal suppressed
         
         # KeyboardInterrupt'ı normal şekilde handle et
         if issubclass(exc_type, KeyboardInterrupt):
@@ -321,11 +368,22 @@ def setup_global_exception_handler():
             exc_info=(exc_type, exc_value, exc_traceback)
         )
         
+        # Hata fırtınasında modal dialog'lar GUI thread'ini kilitlemesin
+        if not bucket.take():
+            suppressed += 1
+            return
+        message = "Kritik bir hata oluştu. Uygulama yeniden başlatılmalı."
+        if suppressed:
+            logger.warning("%d global hata dialog'u hız sınırı nedeniyle gösterilmedi", suppressed)
+            # Gösterilmeyen hatalar kullanıcıya bu dialog'da bildirilir
+            message += f"\n\nAyrıca {suppressed} hata daha oluştu (ayrıntılar log dosyasında)."
+            suppressed = 0
+        
         # Global error handler ile handle et
         if exc_value:
             handle_error(
                 exc_value,
-                "Kritik bir hata oluştu. Uygulama yeniden başlatılmalı.",
+                message,
                 show_dialog=True,
                 context="global_exception_handler"
             )
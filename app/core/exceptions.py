@@ -7,13 +7,23 @@ standardize edilmiş exception sınıfları ve hata işleme mekanizmaları.
 """
 
 from __future__ import annotations
+import logging
 import traceback
 from typing import Optional, Dict, Any
 from enum import Enum
 
-from app.core.logger import get_logger
+# Logger ilk kullanımda bağlanır: bu modülü import etmek WMSLogger'ı
+# (log klasörü, handler'lar) başlatmaz
+logger: Optional[logging.Logger] = None
 
-logger = get_logger(__name__)
+
+def _get_logger() -> logging.Logger:
+    """Modül logger'ı (ilk çağrıda oluşturulur)"""
+    global logger
+    if logger is None:
+        from app.core.logger import get_logger
+        logger = get_logger(__name__)
+    return logger
 
 
 class ErrorSeverity(Enum):
@@ -24,6 +34,24 @@ class ErrorSeverity(Enum):
     CRITICAL = "critical"
 
 
+# Severity → log seviyesi (WMSException.log için tek dict lookup)
+_SEVERITY_LEVEL = {
+    ErrorSeverity.CRITICAL: logging.CRITICAL,
+    ErrorSeverity.HIGH: logging.ERROR,
+    ErrorSeverity.MEDIUM: logging.WARNING,
+    ErrorSeverity.LOW: logging.INFO,
+}
+
+
+def _add_context(kwargs: Dict[str, Any], **values: Any) -> None:
+    """
+    kwargs["context"]'e alan ekle. Çağıranın verdiği dict kopyalanır,
+    yerinde değiştirilmez.
+    """
+    ctx = kwargs.get("context")
+    kwargs["context"] = {**ctx, **values} if ctx else values
+
+
 class ErrorCategory(Enum):
     """Hata kategorileri"""
     DATABASE = "database"
@@ -38,85 +66,146 @@ class ErrorCategory(Enum):
     USER_INPUT = "user_input"
 
 
+# Enum → string değer (log ve to_dict'te .value descriptor'ı yerine)
+_SEVERITY_VALUE = {s: s.value for s in ErrorSeverity}
+_CATEGORY_VALUE = {c: c.value for c in ErrorCategory}
+
+
 class WMSException(Exception):
     """Base exception class for WMS application"""
     
+    # BaseException'ın tembel __dict__'i hiç oluşturulmaz; alanlar slot'ta
+    __slots__ = (
+        "message", "error_code", "category", "severity",
+        "context", "original_exception", "_tb_cache",
+    )
+    
+    # Alt sınıflar varsayılanları sınıf özelliği olarak verir (raise başına
+    # kwargs.setdefault yok); DEFAULT_ERROR_CODE None → sınıf adı
+    DEFAULT_CATEGORY: ErrorCategory = ErrorCategory.BUSINESS_LOGIC
+    DEFAULT_SEVERITY: ErrorSeverity = ErrorSeverity.MEDIUM
+    DEFAULT_ERROR_CODE: Optional[str] = None
+    # Varsayılanlarla, context'siz raise için hazır log context'i (salt okunur)
+    _BASE_LOG_CONTEXT: Dict[str, Any] = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._BASE_LOG_CONTEXT = _base_log_context(cls)
+    
     def __init__(
         self,
         message: str,
         error_code: Optional[str] = None,
-        category: ErrorCategory = ErrorCategory.BUSINESS_LOGIC,
-        severity: ErrorSeverity = ErrorSeverity.MEDIUM,
+        category: Optional[ErrorCategory] = None,
+        severity: Optional[ErrorSeverity] = None,
         context: Optional[Dict[str, Any]] = None,
         original_exception: Optional[Exception] = None
     ):
         super().__init__(message)
+        cls = type(self)
         self.message = message
-        self.error_code = error_code or self.__class__.__name__
-        self.category = category
-        self.severity = severity
+        self.error_code = error_code or cls.DEFAULT_ERROR_CODE or cls.__name__
+        self.category = category or cls.DEFAULT_CATEGORY
+        self.severity = severity or cls.DEFAULT_SEVERITY
         self.context = context or {}
         self.original_exception = original_exception
-        
-        # Log the exception
-        self._log_exception()
+        self._tb_cache: Optional[str] = None
     
-    def _log_exception(self):
-        """Exception'ı uygun seviyede logla"""
-        log_context = {
-            "error_code": self.error_code,
-            "category": self.category.value,
-            "severity": self.severity.value,
-            "context": self.context
-        }
+    @property
+    def traceback_str(self) -> Optional[str]:
+        """original_exception'ın traceback'i (ilk erişimde formatlanır)"""
+        exc = self.original_exception
+        if exc is None:
+            return None
+        if self._tb_cache is None:
+            self._tb_cache = "".join(
+                traceback.format_exception(type(exc), exc, exc.__traceback__)
+            )
+        return self._tb_cache
+    
+    def log(self):
+        """
+        Exception'ı uygun seviyede logla.
+        
+        Oluşturulurken otomatik loglanmaz; yakalayıp işleyen üst katman
+        (handle_exceptions, ErrorHandler) çağırır.
+        """
+        level = _SEVERITY_LEVEL.get(self.severity, logging.INFO)
+        logger = _get_logger()
+        if not logger.isEnabledFor(level):
+            return                      # filtrelenecek kayıt için context kurma
         
-        if self.severity == ErrorSeverity.CRITICAL:
-            logger.critical(f"{self.message}", extra=log_context)
-        elif self.severity == ErrorSeverity.HIGH:
-            logger.error(f"{self.message}", extra=log_context)
-        elif self.severity == ErrorSeverity.MEDIUM:
-            logger.warning(f"{self.message}", extra=log_context)
+        cls = type(self)
+        if (
+            not self.context
+            and self.category is cls.DEFAULT_CATEGORY
+            and self.severity is cls.DEFAULT_SEVERITY
+            and self.error_code == cls._BASE_LOG_CONTEXT["error_code"]
+        ):
+            log_context = cls._BASE_LOG_CONTEXT
         else:
-            logger.info(f"{self.message}", extra=log_context)
+            log_context = {
+                "error_code": self.error_code,
+                "category": _CATEGORY_VALUE[self.category],
+                "severity": _SEVERITY_VALUE[self.severity],
+                "context": self.context
+            }
+        logger.log(level, self.message, extra=log_context)
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Exception'ı dictionary'ye çevir"""
-        return {
+    def to_dict(self, include_tb: bool = False) -> Dict[str, Any]:
+        """Exception'ı dictionary'ye çevir (traceback yalnızca istenirse)"""
+        data = {
             "error_code": self.error_code,
             "message": self.message,
-            "category": self.category.value,
-            "severity": self.severity.value,
+            "category": _CATEGORY_VALUE[self.category],
+            "severity": _SEVERITY_VALUE[self.severity],
             "context": self.context,
-            "traceback": traceback.format_exc() if self.original_exception else None
         }
+        if include_tb:
+            data["traceback"] = self.traceback_str
+        return data
+
+
+
+def _base_log_context(cls) -> Dict[str, Any]:
+    """Sınıf varsayılanlarından log context'i (context boş)"""
+    return {
+        "error_code": cls.DEFAULT_ERROR_CODE or cls.__name__,
+        "category": _CATEGORY_VALUE[cls.DEFAULT_CATEGORY],
+        "severity": _SEVERITY_VALUE[cls.DEFAULT_SEVERITY],
+        "context": {},
+    }
+
+
+WMSException._BASE_LOG_CONTEXT = _base_log_context(WMSException)
 
 
 # Database Exceptions
 class DatabaseException(WMSException):
     """Database operations exception"""
     
-    def __init__(self, message: str, **kwargs):
-        kwargs.setdefault("category", ErrorCategory.DATABASE)
-        kwargs.setdefault("severity", ErrorSeverity.HIGH)
-        super().__init__(message, **kwargs)
+    DEFAULT_CATEGORY = ErrorCategory.DATABASE
+    DEFAULT_SEVERITY = ErrorSeverity.HIGH
 
 
 class ConnectionException(DatabaseException):
     """Database connection exception"""
     
+    DEFAULT_SEVERITY = ErrorSeverity.CRITICAL
+    DEFAULT_ERROR_CODE = "DB_CONNECTION_FAILED"
+    
     def __init__(self, message: str = "Veritabanı bağlantısı kurulamadı", **kwargs):
-        kwargs.setdefault("error_code", "DB_CONNECTION_FAILED")
-        kwargs.setdefault("severity", ErrorSeverity.CRITICAL)
         super().__init__(message, **kwargs)
 
 
 class QueryException(DatabaseException):
     """SQL query execution exception"""
     
+    DEFAULT_ERROR_CODE = "DB_QUERY_FAILED"
+    
     def __init__(self, message: str, query: Optional[str] = None, **kwargs):
         if query:
-            kwargs.setdefault("context", {})["query"] = query
-        kwargs.setdefault("error_code", "DB_QUERY_FAILED")
+            _add_context(kwargs, query=query)
         super().__init__(message, **kwargs)
 
 
@@ -124,40 +213,44 @@ class QueryException(DatabaseException):
 class AuthenticationException(WMSException):
     """Authentication related exception"""
     
+    DEFAULT_CATEGORY = ErrorCategory.AUTHENTICATION
+    DEFAULT_SEVERITY = ErrorSeverity.HIGH
+    DEFAULT_ERROR_CODE = "AUTH_FAILED"
+    
     def __init__(self, message: str = "Kimlik doğrulaması başarısız", **kwargs):
-        kwargs.setdefault("category", ErrorCategory.AUTHENTICATION)
-        kwargs.setdefault("severity", ErrorSeverity.HIGH)
-        kwargs.setdefault("error_code", "AUTH_FAILED")
         super().__init__(message, **kwargs)
 
 
 class AuthorizationException(WMSException):
     """Authorization related exception"""
     
+    DEFAULT_CATEGORY = ErrorCategory.AUTHORIZATION
+    DEFAULT_SEVERITY = ErrorSeverity.MEDIUM
+    DEFAULT_ERROR_CODE = "AUTHORIZATION_DENIED"
+    
     def __init__(self, message: str = "Bu işlem için yetkiniz yok", **kwargs):
-        kwargs.setdefault("category", ErrorCategory.AUTHORIZATION)
-        kwargs.setdefault("severity", ErrorSeverity.MEDIUM)
-        kwargs.setdefault("error_code", "AUTHORIZATION_DENIED")
         super().__init__(message, **kwargs)
 
 
 class InvalidUserException(AuthenticationException):
     """Invalid user exception"""
     
+    DEFAULT_ERROR_CODE = "INVALID_USER"
+    
     def __init__(self, username: str, **kwargs):
         message = f"Geçersiz kullanıcı: {username}"
-        kwargs.setdefault("context", {})["username"] = username
-        kwargs.setdefault("error_code", "INVALID_USER")
+        _add_context(kwargs, username=username)
         super().__init__(message, **kwargs)
 
 
 class InactiveUserException(AuthenticationException):
     """Inactive user exception"""
     
+    DEFAULT_ERROR_CODE = "USER_INACTIVE"
+    
     def __init__(self, username: str, **kwargs):
         message = f"Kullanıcı aktif değil: {username}"
-        kwargs.setdefault("context", {})["username"] = username
-        kwargs.setdefault("error_code", "USER_INACTIVE")
+        _add_context(kwargs, username=username)
         super().__init__(message, **kwargs)
 
 
@@ -165,65 +258,69 @@ class InactiveUserException(AuthenticationException):
 class ValidationException(WMSException):
     """Data validation exception"""
     
+    DEFAULT_CATEGORY = ErrorCategory.VALIDATION
+    DEFAULT_SEVERITY = ErrorSeverity.LOW
+    DEFAULT_ERROR_CODE = "VALIDATION_FAILED"
+    
     def __init__(self, message: str, field: Optional[str] = None, **kwargs):
         if field:
-            kwargs.setdefault("context", {})["field"] = field
-        kwargs.setdefault("category", ErrorCategory.VALIDATION)
-        kwargs.setdefault("severity", ErrorSeverity.LOW)
-        kwargs.setdefault("error_code", "VALIDATION_FAILED")
+            _add_context(kwargs, field=field)
         super().__init__(message, **kwargs)
 
 
 class BusinessLogicException(WMSException):
     """Business logic violation exception"""
     
-    def __init__(self, message: str, **kwargs):
-        kwargs.setdefault("category", ErrorCategory.BUSINESS_LOGIC)
-        kwargs.setdefault("severity", ErrorSeverity.MEDIUM)
-        super().__init__(message, **kwargs)
+    DEFAULT_CATEGORY = ErrorCategory.BUSINESS_LOGIC
+    DEFAULT_SEVERITY = ErrorSeverity.MEDIUM
 
 
 class OrderNotFoundException(BusinessLogicException):
     """Order not found exception"""
     
+    DEFAULT_ERROR_CODE = "ORDER_NOT_FOUND"
+    
     def __init__(self, order_no: str, **kwargs):
         message = f"Sipariş bulunamadı: {order_no}"
-        kwargs.setdefault("context", {})["order_no"] = order_no
-        kwargs.setdefault("error_code", "ORDER_NOT_FOUND")
+        _add_context(kwargs, order_no=order_no)
         super().__init__(message, **kwargs)
 
 
 class InsufficientStockException(BusinessLogicException):
     """Insufficient stock exception"""
     
+    DEFAULT_ERROR_CODE = "INSUFFICIENT_STOCK"
+    
     def __init__(self, item_code: str, requested: int, available: int, **kwargs):
         message = f"Yetersiz stok - Ürün: {item_code}, İstenen: {requested}, Mevcut: {available}"
-        kwargs.setdefault("context", {}).update({
-            "item_code": item_code,
-            "requested_qty": requested,
-            "available_qty": available
-        })
-        kwargs.setdefault("error_code", "INSUFFICIENT_STOCK")
+        _add_context(
+            kwargs,
+            item_code=item_code,
+            requested_qty=requested,
+            available_qty=available,
+        )
         super().__init__(message, **kwargs)
 
 
 class BarcodeNotFoundException(BusinessLogicException):
     """Barcode not found exception"""
     
+    DEFAULT_ERROR_CODE = "BARCODE_NOT_FOUND"
+    
     def __init__(self, barcode: str, **kwargs):
         message = f"Barkod bulunamadı: {barcode}"
-        kwargs.setdefault("context", {})["barcode"] = barcode
-        kwargs.setdefault("error_code", "BARCODE_NOT_FOUND")
+        _add_context(kwargs, barcode=barcode)
         super().__init__(message, **kwargs)
 
 
 class InvalidBarcodeException(ValidationException):
     """Invalid barcode format exception"""
     
+    DEFAULT_ERROR_CODE = "INVALID_BARCODE"
+    
     def __init__(self, barcode: str, **kwargs):
         message = f"Geçersiz barkod formatı: {barcode}"
-        kwargs.setdefault("context", {})["barcode"] = barcode
-        kwargs.setdefault("error_code", "INVALID_BARCODE")
+        _add_context(kwargs, barcode=barcode)
         super().__init__(message, **kwargs)
 
 
@@ -231,23 +328,25 @@ class InvalidBarcodeException(ValidationException):
 class FileSystemException(WMSException):
     """File system related exception"""
     
+    DEFAULT_CATEGORY = ErrorCategory.FILE_SYSTEM
+    DEFAULT_SEVERITY = ErrorSeverity.MEDIUM
+    
     def __init__(self, message: str, file_path: Optional[str] = None, **kwargs):
         if file_path:
-            kwargs.setdefault("context", {})["file_path"] = file_path
-        kwargs.setdefault("category", ErrorCategory.FILE_SYSTEM)
-        kwargs.setdefault("severity", ErrorSeverity.MEDIUM)
+            _add_context(kwargs, file_path=file_path)
         super().__init__(message, **kwargs)
 
 
 class ConfigurationException(WMSException):
     """Configuration related exception"""
     
+    DEFAULT_CATEGORY = ErrorCategory.CONFIGURATION
+    DEFAULT_SEVERITY = ErrorSeverity.HIGH
+    DEFAULT_ERROR_CODE = "CONFIG_ERROR"
+    
     def __init__(self, message: str, config_key: Optional[str] = None, **kwargs):
         if config_key:
-            kwargs.setdefault("context", {})["config_key"] = config_key
-        kwargs.setdefault("category", ErrorCategory.CONFIGURATION)
-        kwargs.setdefault("severity", ErrorSeverity.HIGH)
-        kwargs.setdefault("error_code", "CONFIG_ERROR")
+            _add_context(kwargs, config_key=config_key)
         super().__init__(message, **kwargs)
 
 
@@ -255,20 +354,19 @@ class ConfigurationException(WMSException):
 class NetworkException(WMSException):
     """Network related exception"""
     
-    def __init__(self, message: str, **kwargs):
-        kwargs.setdefault("category", ErrorCategory.NETWORK)
-        kwargs.setdefault("severity", ErrorSeverity.HIGH)
-        super().__init__(message, **kwargs)
+    DEFAULT_CATEGORY = ErrorCategory.NETWORK
+    DEFAULT_SEVERITY = ErrorSeverity.HIGH
 
 
 class ExternalServiceException(WMSException):
     """External service exception"""
     
+    DEFAULT_CATEGORY = ErrorCategory.EXTERNAL_SERVICE
+    DEFAULT_SEVERITY = ErrorSeverity.HIGH
+    
     def __init__(self, message: str, service_name: Optional[str] = None, **kwargs):
         if service_name:
-            kwargs.setdefault("context", {})["service_name"] = service_name
-        kwargs.setdefault("category", ErrorCategory.EXTERNAL_SERVICE)
-        kwargs.setdefault("severity", ErrorSeverity.HIGH)
+            _add_context(kwargs, service_name=service_name)
         super().__init__(message, **kwargs)
 
 
@@ -276,10 +374,8 @@ class ExternalServiceException(WMSException):
 class UserInputException(WMSException):
     """User input related exception"""
     
-    def __init__(self, message: str, **kwargs):
-        kwargs.setdefault("category", ErrorCategory.USER_INPUT)
-        kwargs.setdefault("severity", ErrorSeverity.LOW)
-        super().__init__(message, **kwargs)
+    DEFAULT_CATEGORY = ErrorCategory.USER_INPUT
+    DEFAULT_SEVERITY = ErrorSeverity.LOW
 
 
 # Exception Handler Decorator
@@ -295,31 +391,37 @@ def handle_exceptions(
         default_message: Varsayılan hata mesajı
         log_traceback: Traceback'i logla
         reraise: Exception'ı yeniden fırlat
+    
+    Parantezsiz ``@handle_exceptions`` olarak da kullanılabilir.
     """
+    if callable(default_message):       # @handle_exceptions (parantezsiz)
+        return handle_exceptions()(default_message)
+    
     def decorator(func):
+        func_name = func.__name__
+        
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
-            except WMSException:
-                # WMS exception'ları zaten loglandı, sadece yeniden fırlat
+            except WMSException as e:
                 if reraise:
-                    raise
+                    raise           # loglama yakalayan üst katmana kalır
+                e.log()
                 return None
             except Exception as e:
                 # Beklenmeyen exception'ları WMSException'a çevir
                 if log_traceback:
-                    logger.exception(f"Beklenmeyen hata in {func.__name__}: {str(e)}")
+                    _get_logger().exception("Beklenmeyen hata in %s: %s", func_name, e)
+                
+                if not reraise:
+                    return None     # sarmalayıcı exception'a gerek yok
                 
-                wms_exc = WMSException(
+                raise WMSException(
                     message=f"{default_message}: {str(e)}",
                     error_code="UNEXPECTED_ERROR",
                     severity=ErrorSeverity.HIGH,
                     original_exception=e,
-                    context={"function": func.__name__}
+                    context={"function": func_name}
                 )
-                
-                if reraise:
-                    raise wms_exc
-                return None
         return wrapper
     return decorator
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+JSON (de)serialize yardımcıları
+===============================
+
+orjson kuruluysa C uzantısı, değilse stdlib json. Her iki yol da UTF-8
+bytes üretir/okur ve aynı biçimi verir (2 boşluk girinti, ASCII kaçışı yok).
+"""
+from typing import Any
+
+try:
+    import orjson
+
+    def json_loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+    def json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:  # pragma: no cover - orjson opsiyonel
+    import json
+
+    def json_loads(data: bytes) -> Any:
+        return json.loads(data)
+
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
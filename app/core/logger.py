@@ -2,8 +2,12 @@
 Gelişmiş Logging System
 =======================
 """
+import atexit
+import functools
 import logging
 import logging.handlers
+import os
+import queue
 import sys
 import traceback
 from datetime import datetime
@@ -12,6 +16,11 @@ from typing import Dict, Any, Optional
 
 from app.constants import DEFAULT_LOG_DIR
 
+# Formatlarda kullanılmayan kayıt alanları: thread/process bilgisi toplanmaz
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
 
 class ColoredFormatter(logging.Formatter):
     """Renkli console output için formatter"""
@@ -24,33 +33,217 @@ class ColoredFormatter(logging.Formatter):
         'CRITICAL': '\033[35m',   # Magenta
         'RESET': '\033[0m'        # Reset
     }
+    COLORED: Dict[str, str] = {}     # seviye adı → renkli ad (sınıf altında doldurulur)
+    
+    def format(self, record):
+        # Kayıt diğer handler'lara temiz kalsın: levelname geri yüklenir
+        orig = record.levelname
+        record.levelname = self.COLORED.get(orig, orig)
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = orig
+
+
+ColoredFormatter.COLORED = {
+    name: f"{color}{name}{ColoredFormatter.COLORS['RESET']}"
+    for name, color in ColoredFormatter.COLORS.items() if name != 'RESET'
+}
+
+
+class FastConsoleFormatter(ColoredFormatter):
+    """
+    Console için kısa yol: exception/stack içermeyen kayıtlarda
+    Formatter.format zinciri yerine doğrudan %-interpolasyon.
+    """
     
     def format(self, record):
-        log_color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
-        record.levelname = f"{log_color}{record.levelname}{self.COLORS['RESET']}"
-        return super().format(record)
+        if record.exc_info or record.exc_text or record.stack_info:
+            return super().format(record)   # traceback'li kayıt: tam yol
+        record.message = record.getMessage()
+        record.asctime = self.formatTime(record, self.datefmt)
+        orig = record.levelname
+        record.levelname = self.COLORED.get(orig, orig)
+        try:
+            return self._style._fmt % record.__dict__
+        finally:
+            record.levelname = orig
+
+
+# Aktif kullanıcı (username, user_id). Tek oturumlu masaüstü uygulaması:
+# süreç genelinde tutulur ki worker thread'lerin kayıtları da taşısın.
+_user_context = ("system", "N/A")
+
+
+def set_user_context(username: str, user_id: str):
+    """Log kayıtlarına eklenecek kullanıcıyı ayarla (circular import olmadan)"""
+    global _user_context
+    _user_context = (username, user_id)
+
+
+def clear_user_context():
+    """Kullanıcı bilgisini varsayılana döndür (logout)"""
+    global _user_context
+    _user_context = ("system", "N/A")
+
+
+def _install_record_factory():
+    """username/user_id'yi kayıt oluşturulurken bir kez ekle (handler başına değil)"""
+    base_factory = logging.getLogRecordFactory()
+    
+    def factory(*args, **kwargs):
+        record = base_factory(*args, **kwargs)
+        record.username, record.user_id = _user_context
+        return record
+    
+    logging.setLogRecordFactory(factory)
+
+
+class _FastCallerLogger(logging.Logger):
+    """
+    ERROR altındaki kayıtlarda findCaller() frame taramasını atlar;
+    dosya/satır bilgisi yalnızca errors.log formatında kullanılır.
+    """
+    
+    def _log(self, level, msg, args, exc_info=None, extra=None,
+             stack_info=False, stacklevel=1):
+        if level >= logging.ERROR or stack_info:
+            super()._log(level, msg, args, exc_info, extra, stack_info, stacklevel + 1)
+            return
+        if exc_info:
+            if isinstance(exc_info, BaseException):
+                exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+            elif not isinstance(exc_info, tuple):
+                exc_info = sys.exc_info()
+        record = self.makeRecord(
+            self.name, level, "(unknown file)", 0, msg, args, exc_info,
+            "(unknown function)", extra, None,
+        )
+        self.handle(record)
+
+
+logging.setLoggerClass(_FastCallerLogger)
+
+
+# WMS_LOG_EXTERNAL_ROTATE=1 → dosyalar logrotate(8) gibi harici bir araçla
+# döndürülür; handler boyut kontrolü yapmaz, inode değişince yeniden açar.
+# (Windows'ta açık dosya taşınamadığından varsayılan kapalı.)
+_EXTERNAL_ROTATE = os.getenv("WMS_LOG_EXTERNAL_ROTATE") == "1"
 
 
-class ContextFilter(logging.Filter):
-    """Kullanıcı context bilgilerini log'a ekler"""
+def _format_batch(handler: logging.Handler, records) -> str:
+    """Handler seviyesini/filtrelerini geçen kayıtları tek string'e birleştir"""
+    lines = [
+        handler.format(r) for r in records
+        if r.levelno >= handler.level and handler.filter(r)
+    ]
+    if not lines:
+        return ""
+    return handler.terminator.join(lines) + handler.terminator
+
+
+class BatchRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Bir grup kaydı tek write() + tek flush() ile yazan RotatingFileHandler.
+    Rotasyon kontrolü kayıt başına değil grup başına yapılır.
+    """
+    
+    def emit_batch(self, records):
+        data = _format_batch(self, records)
+        if not data:
+            return
+        self.acquire()
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self.stream.tell() + len(data) >= self.maxBytes:
+                self.doRollover()
+            self.stream.write(data)
+            self.stream.flush()
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+
+class BatchWatchedFileHandler(logging.handlers.WatchedFileHandler):
+    """
+    Harici rotasyon için WatchedFileHandler; grup başına tek stat(),
+    tek write() + tek flush().
+    """
+    
+    def emit_batch(self, records):
+        data = _format_batch(self, records)
+        if not data:
+            return
+        self.acquire()
+        try:
+            self.reopenIfNeeded()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(data)
+            self.stream.flush()
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+
+def _file_handler(path: Path, max_bytes: int, backup_count: int) -> logging.Handler:
+    """Ayara göre kendi döndüren ya da harici rotasyonu izleyen dosya handler'ı"""
+    if _EXTERNAL_ROTATE:
+        return BatchWatchedFileHandler(path, encoding='utf-8')
+    return BatchRotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+    )
+
+
+class BatchQueueListener(logging.handlers.QueueListener):
+    """
+    Kuyrukta biriken kayıtları (en fazla batch_size) tek seferde alır;
+    emit_batch destekleyen handler'lara grup halinde verir.
+    """
+    
+    def __init__(self, q, *handlers, respect_handler_level=False, batch_size=256):
+        super().__init__(q, *handlers, respect_handler_level=respect_handler_level)
+        self.batch_size = batch_size
     
-    def filter(self, record):
-        # User context'i varsa ekle (circular import'ı önlemek için global var kullan)
-        record.username = getattr(self, '_current_username', 'system')
-        record.user_id = getattr(self, '_current_user_id', 'N/A')
-        return True
+    def handle_batch(self, records):
+        records = [self.prepare(r) for r in records]
+        for handler in self.handlers:
+            emit_batch = getattr(handler, "emit_batch", None)
+            if emit_batch is not None:
+                emit_batch(records)
+                continue
+            for record in records:
+                if not self.respect_handler_level or record.levelno >= handler.level:
+                    handler.handle(record)
     
-    def set_user_context(self, username: str, user_id: str):
-        """User context'i manuel olarak set et (circular import olmadan)"""
-        self._current_username = username
-        self._current_user_id = user_id
+    def _monitor(self):
+        while True:
+            record = self.dequeue(True)
+            stop = record is self._sentinel
+            batch = [] if stop else [record]
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    record = self.dequeue(False)
+                except queue.Empty:
+                    break
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    batch.append(record)
+            if batch:
+                self.handle_batch(batch)
+            if stop:
+                break
 
 
 class WMSLogger:
     """WMS özel logger sistemi"""
     
-    _loggers: Dict[str, logging.Logger] = {}
     _initialized = False
+    _listener: Optional[BatchQueueListener] = None
     
     @classmethod
     def initialize(cls, log_dir: str = None):
@@ -61,6 +254,8 @@ class WMSLogger:
         log_dir = Path(log_dir or DEFAULT_LOG_DIR)
         log_dir.mkdir(exist_ok=True, parents=True)
         
+        _install_record_factory()
+        
         # Root logger ayarları
         root_logger = logging.getLogger()
         root_logger.setLevel(logging.DEBUG)
@@ -72,96 +267,103 @@ class WMSLogger:
         # Console handler
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.INFO)
-        console_formatter = ColoredFormatter(
+        console_formatter = FastConsoleFormatter(
             '%(asctime)s [%(levelname)s] %(name)s: %(message)s [%(username)s]'
         )
         console_handler.setFormatter(console_formatter)
-        console_handler.addFilter(ContextFilter())
         
         # File handler - Main log
-        main_file_handler = logging.handlers.RotatingFileHandler(
+        main_file_handler = _file_handler(
             log_dir / 'wms.log',
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=5,
-            encoding='utf-8'
+            max_bytes=10*1024*1024,  # 10MB
+            backup_count=5,
         )
         main_file_handler.setLevel(logging.DEBUG)
         main_file_formatter = logging.Formatter(
             '%(asctime)s [%(levelname)s] %(name)s: %(message)s '
-            '[User: %(username)s, ID: %(user_id)s] [%(pathname)s:%(lineno)d]'
+            '[User: %(username)s, ID: %(user_id)s]'
         )
         main_file_handler.setFormatter(main_file_formatter)
-        main_file_handler.addFilter(ContextFilter())
         
         # Error file handler
-        error_file_handler = logging.handlers.RotatingFileHandler(
+        error_file_handler = _file_handler(
             log_dir / 'errors.log',
-            maxBytes=5*1024*1024,  # 5MB
-            backupCount=10,
-            encoding='utf-8'
+            max_bytes=5*1024*1024,  # 5MB
+            backup_count=10,
         )
         error_file_handler.setLevel(logging.ERROR)
-        error_file_handler.setFormatter(main_file_formatter)
-        error_file_handler.addFilter(ContextFilter())
+        error_file_handler.setFormatter(logging.Formatter(
+            '%(asctime)s [%(levelname)s] %(name)s: %(message)s '
+            '[User: %(username)s, ID: %(user_id)s] [%(pathname)s:%(lineno)d]'
+        ))
         
-        # Root logger'a handler'ları ekle
+        # Dosya yazımı/rotasyonu arka plandaki listener thread'inde, biriken
+        # kayıtlar grup halinde; çağıran thread yalnızca kuyruğa atar
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        cls._listener = BatchQueueListener(
+            log_queue, main_file_handler, error_file_handler,
+            respect_handler_level=True,
+        )
+        cls._listener.start()
+        atexit.register(cls._listener.stop)
+        
+        # Root logger'a handler'ları ekle. QueueHandler önce: kaydın kopyasını
+        # kuyruğa atar, ColoredFormatter'ın levelname değişikliği dosyaya sızmaz
+        root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
         root_logger.addHandler(console_handler)
-        root_logger.addHandler(main_file_handler)
-        root_logger.addHandler(error_file_handler)
         
         cls._initialized = True
     
     @classmethod
     def get_logger(cls, name: str) -> logging.Logger:
-        """Named logger döndürür"""
-        if not cls._initialized:
-            cls.initialize()
-        
-        if name not in cls._loggers:
-            logger = logging.getLogger(name)
-            cls._loggers[name] = logger
-        
-        return cls._loggers[name]
+        """Named logger döndürür (modül seviyesindeki önbellekli get_logger)"""
+        return get_logger(name)
     
     @classmethod
     def log_user_activity(cls, action: str, details: str = "", **context):
         """Kullanıcı aktivitesi loglar"""
-        logger = cls.get_logger('user_activity')
+        logger = _activity_logger
+        if not logger.isEnabledFor(logging.INFO):
+            return                      # filtrelenecek kayıt için string kurma
         
-        # Context bilgilerini formatla
+        # Context bilgilerini formatla; mesaj formatlaması logging'e bırakılır
         context_str = " | ".join(f"{k}={v}" for k, v in context.items() if v is not None)
-        log_message = f"ACTION: {action} | DETAILS: {details}"
         if context_str:
-            log_message += f" | CONTEXT: {context_str}"
-        
-        logger.info(log_message)
+            logger.info("ACTION: %s | DETAILS: %s | CONTEXT: %s", action, details, context_str)
+        else:
+            logger.info("ACTION: %s | DETAILS: %s", action, details)
     
     @classmethod
     def log_database_operation(cls, operation: str, table: str, affected_rows: int = None, **context):
         """Veritabanı operasyonu loglar"""
-        logger = cls.get_logger('database')
+        logger = _db_logger
+        if not logger.isEnabledFor(logging.INFO):
+            return
         
-        context_str = " | ".join(f"{k}={v}" for k, v in context.items() if v is not None)
-        log_message = f"DB_OP: {operation} | TABLE: {table}"
+        fmt = "DB_OP: %s | TABLE: %s"
+        args = [operation, table]
         if affected_rows is not None:
-            log_message += f" | ROWS: {affected_rows}"
+            fmt += " | ROWS: %s"
+            args.append(affected_rows)
+        context_str = " | ".join(f"{k}={v}" for k, v in context.items() if v is not None)
         if context_str:
-            log_message += f" | {context_str}"
+            fmt += " | %s"
+            args.append(context_str)
         
-        logger.info(log_message)
+        logger.info(fmt, *args)
     
     @classmethod
     def log_barcode_scan(cls, barcode: str, item_code: str, order_no: str, result: str):
         """Barkod tarama loglar"""
-        logger = cls.get_logger('barcode_scanner')
-        logger.info(
-            f"BARCODE_SCAN: {barcode} | ITEM: {item_code} | ORDER: {order_no} | RESULT: {result}"
+        _barcode_logger.info(
+            "BARCODE_SCAN: %s | ITEM: %s | ORDER: %s | RESULT: %s",
+            barcode, item_code, order_no, result,
         )
     
     @classmethod
     def log_error_with_context(cls, error: Exception, context: Dict[str, Any] = None):
         """Hata ile birlikte context bilgilerini loglar"""
-        logger = cls.get_logger('error_handler')
+        logger = _error_logger
         
         error_details = {
             'error_type': type(error).__name__,
@@ -176,9 +378,12 @@ class WMSLogger:
 
 
 # Kolay erişim için kısayollar
+@functools.lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
-    """Logger al"""
-    return WMSLogger.get_logger(name)
+    """Logger al (isim başına bir kez çözülür)"""
+    if not WMSLogger._initialized:
+        WMSLogger.initialize()
+    return logging.getLogger(name)
 
 
 def log_user_action(action: str, details: str = "", **context):
@@ -202,4 +407,10 @@ def log_error(error: Exception, context: Dict[str, Any] = None):
 
 
 # Sistem başlatılırken logger'ı initialize et
-WMSLogger.initialize()
\ No newline at end of file
+WMSLogger.initialize()
+
+# Sık kullanılan logger'lar import'ta bir kez bağlanır
+_activity_logger = get_logger('user_activity')
+_db_logger = get_logger('database')
+_barcode_logger = get_logger('barcode_scanner')
+_error_logger = get_logger('error_handler')
\ No newline at end of file
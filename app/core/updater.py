@@ -8,15 +8,23 @@ Git repository'den otomatik güncelleme sistemi.
 import os
 import sys
 import json
+import queue
+import struct
 import subprocess
 import tempfile
 import shutil
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 import requests
-from PyQt5.QtCore import QObject, pyqtSignal, QThread, Qt
+from requests.adapters import HTTPAdapter
+from PyQt5.QtCore import QObject, pyqtSignal, QThread, Qt, QTimer
 from PyQt5.QtWidgets import QMessageBox, QProgressDialog, QApplication
 
 from app.core.logger import get_logger, log_user_action
@@ -33,6 +41,225 @@ GITHUB_DOWNLOAD_URL = f"https://github.com/{GITHUB_OWNER}/{GITHUB_REPO}/archive/
 
 # Version dosyası
 VERSION_FILE = Path(__file__).parent.parent.parent / "version.json"
+# Son kontrolün ETag/Last-Modified ve commit bilgisi (koşullu istek için)
+UPDATE_CHECK_CACHE_FILE = VERSION_FILE.with_name("update_check.json")
+CHANGELOG_ERROR = "Changelog alınamadı"
+
+# Uyarlanabilir kontrol aralığı: değişiklik yoksa 15 dk → ... → 12 saat
+POLL_INTERVAL_MIN = 15 * 60
+POLL_INTERVAL_MAX = 12 * 3600
+
+# Yarım kalan indirmeler denemeler arasında burada saklanır (Range ile devam)
+UPDATE_CACHE_DIR = Path(tempfile.gettempdir()) / "wms_update"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT = 30
+# İndirme/çıkarma ilerlemesi en fazla ~10 Hz bildirilir
+PROGRESS_MIN_INTERVAL = 0.1
+
+# GitHub API istekleri için başlık (arşiv indirmesine uygulanmaz)
+GITHUB_API_HEADERS = {"Accept": "application/vnd.github+json"}
+
+# Paralel (parçalı) indirme: sunucu Range destekliyorsa N bağlantı
+DOWNLOAD_SEGMENTS = 4
+SEGMENTED_MIN_SIZE = 1024 * 1024
+
+
+# Güncellemede atlanacaklar: klasör adları (alt ağaç komple), dosya adları, uzantılar
+UPDATE_SKIP_DIRS = frozenset({'.git', '__pycache__', 'venv', 'env', 'logs', 'backup'})
+UPDATE_SKIP_NAMES = frozenset({'config.json', 'settings.json', 'users.json', '.env'})
+UPDATE_SKIP_SUFFIXES = ('.pyc',)
+
+
+# ZIP girdileri paralel açılır (Deflate CPU işi + disk yazımı örtüşür)
+EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+class _RangeNotSupported(Exception):
+    """Sunucu Range isteğine 206 yerine 200 döndürdü"""
+
+
+def _make_session() -> requests.Session:
+    """
+    Güncelleme istekleri için Session: ardışık istekler aynı bağlantı
+    havuzunu (TCP/TLS) kullanır. requests.Session thread-safe değildir;
+    her thread (GUI kontrolü, arka plan kontrolü, UpdateWorker, parçalı
+    indirmenin her parçası) kendi oturumunu açar.
+    """
+    session = requests.Session()
+    session.headers["User-Agent"] = "WMS-Updater"
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(8, DOWNLOAD_SEGMENTS))
+    session.mount("https://", adapter)
+    return session
+
+
+# İndirme sürerken önceden açılan ZIP girdileri için bellek sınırı
+PREFETCH_MAX_BYTES = 64 * 1024 * 1024
+
+_ZIP_LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')
+_ZIP_LOCAL_SIG = b'PK\x03\x04'
+_ZIP_DESCRIPTOR_SIG = b'PK\x07\x08'
+
+
+class _StreamInflater(threading.Thread):
+    """
+    İndirme sürerken gelen ZIP baytlarını local file header'lardan
+    sırayla okuyup girdileri bellekte açar (ağ ve Deflate CPU işi örtüşür).
+    Sonuçlar yalnızca ipucudur: dosyalar, arşiv tamamlanıp central
+    directory ile boyut/CRC doğrulandıktan sonra hedefe yazılır.
+    Beklenmeyen bir yapıda ayrıştırma bırakılır, kalan veri tüketilir.
+    Bellekte tutulan açılmış veri max_bytes ile sınırlıdır; bütçeyi aşan
+    girdi ya hiç açılmadan atlanır ya da açılırken çıktısı bırakılır.
+    """
+    
+    def __init__(self, max_bytes: int = PREFETCH_MAX_BYTES):
+        super().__init__(daemon=True)
+        self.entries: Dict[str, bytes] = {}
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=64)
+        self._buffer = bytearray()
+        self._eof = False
+        self._budget = max_bytes
+    
+    def feed(self, chunk: bytes):
+        self._queue.put(chunk)
+    
+    def close(self):
+        """Akış bitti; ayrıştırmanın bitmesini bekle"""
+        self._queue.put(None)
+        self.join()
+    
+    def _read(self, n: int) -> bytes:
+        while len(self._buffer) < n and not self._eof:
+            chunk = self._queue.get()
+            if chunk is None:
+                self._eof = True
+            else:
+                self._buffer += chunk
+        if len(self._buffer) < n:
+            raise EOFError
+        data = bytes(self._buffer[:n])
+        del self._buffer[:n]
+        return data
+    
+    def _skip(self, n: int):
+        """n baytı tamponda biriktirmeden atla"""
+        while n > 0:
+            step = min(n, DOWNLOAD_CHUNK_SIZE)
+            self._read(step)
+            n -= step
+    
+    def run(self):
+        try:
+            while self._budget > 0 and self._inflate_next():
+                pass
+        except (EOFError, zlib.error, struct.error, UnicodeDecodeError):
+            pass
+        except Exception:
+            logger.debug("Akış içi ZIP ayrıştırma bırakıldı", exc_info=True)
+        finally:
+            # Ayrıştırma bitti (ya da hata): üreticiyi (feed) bloklamamak
+            # için kuyruktaki kalan veriyi sonuna kadar tüket
+            self._buffer.clear()
+            while not self._eof:
+                if self._queue.get() is None:
+                    self._eof = True
+    
+    def _inflate_next(self) -> bool:
+        (sig, _, flags, method, _, _, crc, csize, usize,
+         name_len, extra_len) = _ZIP_LOCAL_HEADER.unpack(self._read(_ZIP_LOCAL_HEADER.size))
+        if sig != _ZIP_LOCAL_SIG or flags & 0x1:
+            return False  # Central directory'ye gelindi ya da şifreli girdi
+        if 0xFFFFFFFF in (csize, usize):
+            return False  # ZIP64 boyutları extra alanda; ayrıştırılmaz
+        name = self._read(name_len).decode('utf-8' if flags & 0x800 else 'cp437')
+        self._read(extra_len)
+        sizes_known = not flags & 0x8
+        
+        if method not in (zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED):
+            return False
+        if sizes_known and usize > self._budget:
+            self._skip(csize)       # zaten tutulmayacak: hiç açma
+            return True
+        if method == zipfile.ZIP_STORED:
+            if not sizes_known:
+                return False        # boyutsuz stored girdinin sonu bulunamaz
+            data = self._read(csize)
+        else:
+            data = self._inflate_entry()
+        
+        
+        if flags & 0x8:
+            # Data descriptor: imza opsiyonel, ardından crc/csize/usize
+            head = self._read(4)
+            self._read(12 if head == _ZIP_DESCRIPTOR_SIG else 8)
+        
+        if data is not None and not name.endswith('/') and len(data) <= self._budget:
+            self._budget -= len(data)
+            self.entries[name] = data
+        return True
+    
+    def _inflate_entry(self) -> Optional[bytes]:
+        """
+        Deflate akışını sonuna kadar açar. Çıktı DOWNLOAD_CHUNK_SIZE'lık
+        adımlarla üretilir; toplam bütçeyi aşınca biriktirme bırakılır
+        (akışın sonunu bulmak için açma sürer) ve None döner.
+        """
+        inflater = zlib.decompressobj(-15)
+        parts: List[bytes] = []
+        size = 0
+        keep = True
+        while not inflater.eof:
+            buf = self._read_chunk()
+            while True:
+                out = inflater.decompress(buf, DOWNLOAD_CHUNK_SIZE)
+                buf = inflater.unconsumed_tail
+                if keep:
+                    size += len(out)
+                    if size > self._budget:
+                        keep = False
+                        parts.clear()
+                    else:
+                        parts.append(out)
+                # Girdi bitti ve bekleyen çıktı kalmadıysa yeni parça oku
+                if inflater.eof or (not buf and len(out) < DOWNLOAD_CHUNK_SIZE):
+                    break
+        self._buffer[:0] = inflater.unused_data
+        return b''.join(parts) if keep else None
+    
+    def _read_chunk(self) -> bytes:
+        """Tamponda ne varsa (yoksa en az bir parça bekleyerek) döndür"""
+        if not self._buffer:
+            chunk = None if self._eof else self._queue.get()
+            if chunk is None:
+                self._eof = True
+                raise EOFError
+            return chunk
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+# Windows: CopyFileW çekirdek tarafında kopyalar (zaman damgası/öznitelik dahil)
+_CopyFileW = None
+if sys.platform == "win32":
+    try:
+        import ctypes
+        from ctypes import wintypes
+        _CopyFileW = ctypes.windll.kernel32.CopyFileW
+        _CopyFileW.argtypes = (wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.BOOL)
+        _CopyFileW.restype = wintypes.BOOL
+    except (ImportError, AttributeError, OSError):  # pragma: no cover
+        _CopyFileW = None
+
+
+def _fast_copy(src: Path, dst: Path):
+    """
+    Dosya kopyala (copy2 eşdeğeri): Windows'ta tek CopyFileW çağrısı,
+    diğerlerinde shutil.copyfile (sendfile/fcopyfile) + copystat.
+    """
+    if _CopyFileW is not None and _CopyFileW(str(src), str(dst), False):
+        return
+    shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
 
 
 class UpdateInfo:
@@ -53,10 +280,13 @@ class UpdateWorker(QThread):
     progress_updated = pyqtSignal(int, str)
     update_completed = pyqtSignal(bool, str)
     
-    def __init__(self, download_url: str, target_dir: str):
+    def __init__(self, download_url: str, target_dir: str,
+                 session: Optional[requests.Session] = None):
         super().__init__()
         self.download_url = download_url
         self.target_dir = Path(target_dir)
+        self._session = session or _make_session()
+        self._last_progress_emit = 0.0
         
     def run(self):
         """Güncelleme işlemini gerçekleştir"""
@@ -68,64 +298,189 @@ class UpdateWorker(QThread):
                 temp_path = Path(temp_dir)
                 zip_file = temp_path / "update.zip"
                 
-                # Dosyayı indir
-                self._download_file(self.download_url, zip_file)
+                # Dosyayı indir; gelen baytlar eşzamanlı olarak açılır
+                inflater = _StreamInflater()
+                inflater.start()
+                try:
+                    self._download_file(self.download_url, zip_file, sink=inflater)
+                finally:
+                    inflater.close()
                 self.progress_updated.emit(50, "Dosyalar çıkarılıyor...")
                 
-                # ZIP'i çıkar
-                import zipfile
-                extract_dir = temp_path / "extracted"
+                # ZIP'i ara klasöre açmadan doğrudan hedefe yaz
                 with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-                    zip_ref.extractall(extract_dir)
-                
-                self.progress_updated.emit(70, "Dosyalar güncelleniyor...")
-                
-                # Ana klasörü bul (genelde reponame-main)
-                extracted_folders = list(extract_dir.iterdir())
-                if extracted_folders:
-                    source_dir = extracted_folders[0]
-                    
-                    # Kritik dosyaları yedekle
-                    self._backup_critical_files()
-                    
-                    self.progress_updated.emit(80, "Yeni dosyalar kopyalanıyor...")
-                    
-                    # Dosyaları kopyala (bazı dosyaları atla)
-                    self._copy_update_files(source_dir, self.target_dir)
-                    
-                    self.progress_updated.emit(95, "Güncelleme tamamlanıyor...")
-                    
-                    # Version bilgisini güncelle
-                    self._update_version_info()
-                    
-                    self.progress_updated.emit(100, "Güncelleme tamamlandı!")
-                    self.update_completed.emit(True, "Güncelleme başarıyla tamamlandı!")
-                    
-                else:
-                    self.update_completed.emit(False, "Güncelleme dosyaları bulunamadı")
+                    members = self._plan_update_members(zip_ref)
+                    if members:
+                        # Kritik dosyaları yedekle
+                        self._backup_critical_files()
+                        
+                        self.progress_updated.emit(70, "Yeni dosyalar yazılıyor...")
+                        
+                        # Dosyaları çıkar (bazı dosyaları atla)
+                        self._extract_update_files(zip_ref, members, self.target_dir,
+                                                   prefetched=inflater.entries)
+                        
+                        self.progress_updated.emit(95, "Güncelleme tamamlanıyor...")
+                        
+                        # Version bilgisini güncelle
+                        self._update_version_info()
+                        
+                        self.progress_updated.emit(100, "Güncelleme tamamlandı!")
+                        self.update_completed.emit(True, "Güncelleme başarıyla tamamlandı!")
+                        
+                    else:
+                        self.update_completed.emit(False, "Güncelleme dosyaları bulunamadı")
                     
         except Exception as e:
             logger.exception(f"Update failed: {e}")
             self.update_completed.emit(False, f"Güncelleme hatası: {str(e)}")
     
-    def _download_file(self, url: str, file_path: Path):
-        """Dosyayı indir"""
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
+    def _download_file(self, url: str, file_path: Path, sink: Optional[_StreamInflater] = None):
+        """
+        Dosyayı indir; önceki denemeden kalan parça varsa HTTP Range ile devam et.
+        sink verilirse baştan sırayla inen baytlar ona da aktarılır.
+        """
+        UPDATE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        part_file = UPDATE_CACHE_DIR / "update.zip.part"
+        meta_file = UPDATE_CACHE_DIR / "update.zip.part.json"
+        
+        # HEAD: boyut ve doğrulayıcı (ETag / Last-Modified)
+        head = self._session.head(url, allow_redirects=True, timeout=DOWNLOAD_TIMEOUT)
+        head_headers = head.headers if head.ok else {}
+        total_size = int(head_headers.get('content-length', 0))
+        validator = head_headers.get('ETag')
+        if not validator or validator.startswith('W/'):
+            # If-Range zayıf ETag kabul etmez
+            validator = head_headers.get('Last-Modified')
+        
+        # Parça aynı URL ve aynı sürüme aitse kaldığı yerden devam et
+        start = 0
+        if validator and part_file.exists() and meta_file.exists():
+            try:
+                meta = json.loads(meta_file.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                meta = {}
+            if meta.get('url') == url and meta.get('validator') == validator:
+                start = part_file.stat().st_size
+        
+        # Yeni indirme ve sunucu Range destekliyorsa parçalı/paralel indir
+        if (not start and total_size >= SEGMENTED_MIN_SIZE
+                and head_headers.get('Accept-Ranges', '').lower() == 'bytes'):
+            # Delikli parça dosyası devam ettirilemez: meta'yı kaldır
+            meta_file.unlink(missing_ok=True)
+            if self._download_segmented(url, part_file, total_size):
+                shutil.move(str(part_file), str(file_path))
+                return
+            logger.info("Range desteklenmiyor, tek bağlantıyla indiriliyor")
         
-        total_size = int(response.headers.get('content-length', 0))
+        meta_file.write_text(json.dumps({'url': url, 'validator': validator}), encoding='utf-8')
+        
+        if not (start and total_size and start >= total_size):
+            headers = {}
+            if start:
+                headers = {'Range': f"bytes={start}-", 'If-Range': validator}
+            
+            with self._session.get(url, stream=True, headers=headers,
+                              timeout=DOWNLOAD_TIMEOUT) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    start = 0  # Sunucu tam dosya gönderdi: baştan yaz
+                length = int(response.headers.get('content-length', 0))
+                if length:
+                    total_size = start + length
+                downloaded = 0
+                # Devam eden indirmede arşivin başı elde yok: akışla açılamaz
+                feed = sink.feed if sink is not None and not start else None
+                
+                with open(part_file, 'ab' if start else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk)
+                            if feed is not None:
+                                feed(chunk)
+                            downloaded += len(chunk)
+                            
+                            self._emit_download_progress(downloaded + start, total_size)
+        
+        shutil.move(str(part_file), str(file_path))
+        meta_file.unlink(missing_ok=True)
+    
+    def _download_segmented(self, url: str, part_file: Path, total_size: int) -> bool:
+        """
+        Dosyayı DOWNLOAD_SEGMENTS eşit byte aralığına bölüp paralel indir.
+        Sunucu 206 yerine 200 dönerse False döner (tek bağlantıya düşülür).
+        Not: hangi aralıkların tamamlandığı kaydedilmez; başarısız parçalı
+        indirmede önceden ayrılmış dosya silinir ve sonraki deneme baştan
+        başlar (Range ile devam yalnızca tek bağlantılı indirmede geçerli).
+        """
+        # Dosyayı önceden tam boyuta ayır; her parça kendi ofsetine yazar
+        with open(part_file, 'wb') as f:
+            f.truncate(total_size)
+        
+        segment = -(-total_size // DOWNLOAD_SEGMENTS)
+        ranges = [(lo, min(lo + segment, total_size) - 1)
+                  for lo in range(0, total_size, segment)]
+        lock = threading.Lock()
+        cancel = threading.Event()
         downloaded = 0
         
-        with open(file_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    
-                    # Progress güncelle
-                    if total_size > 0:
-                        progress = int((downloaded / total_size) * 40) + 10  # 10-50 arası
-                        self.progress_updated.emit(progress, f"İndiriliyor... {downloaded // 1024}KB")
+        def fetch(lo: int, hi: int):
+            nonlocal downloaded
+            # Session thread-safe değil: her parça kendi oturumuyla (ayrı bağlantı)
+            with _make_session() as session, \
+                    session.get(url, stream=True, headers={'Range': f"bytes={lo}-{hi}"},
+                                timeout=DOWNLOAD_TIMEOUT) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise _RangeNotSupported()
+                # Parça başına ayrı dosya tanıtıcısı: yazarken kilit gerekmez
+                with open(part_file, 'r+b') as f:
+                    f.seek(lo)
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if cancel.is_set():
+                            return
+                        if chunk:
+                            f.write(chunk)
+                            # Sayaç ve throttle zaman damgası (_last_progress_emit)
+                            # worker'lar arasında paylaşılır: ikisi de kilit altında
+                            with lock:
+                                downloaded += len(chunk)
+                                self._emit_download_progress(downloaded, total_size)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [executor.submit(fetch, lo, hi) for lo, hi in ranges]
+                try:
+                    for future in futures:
+                        future.result()
+                except BaseException:
+                    cancel.set()
+                    raise
+        except _RangeNotSupported:
+            part_file.unlink(missing_ok=True)
+            return False
+        except BaseException:
+            part_file.unlink(missing_ok=True)
+            raise
+        
+        return True
+    
+    def _emit_progress_throttled(self, value: int, text: str, final: bool = False) -> None:
+        """
+        Ara ilerlemeyi en fazla PROGRESS_MIN_INTERVAL'da bir bildir; her emit
+        thread sınırını geçip dialogu yeniden çizdirir. Son adım (final) her zaman gider.
+        """
+        now = time.monotonic()
+        if final or now - self._last_progress_emit >= PROGRESS_MIN_INTERVAL:
+            self._last_progress_emit = now
+            self.progress_updated.emit(value, text)
+    
+    def _emit_download_progress(self, done: int, total_size: int):
+        """İndirme ilerlemesini 10-50 aralığında bildir"""
+        if total_size > 0:
+            progress = int((done / total_size) * 40) + 10  # 10-50 arası
+            self._emit_progress_throttled(progress, f"İndiriliyor... {done // 1024}KB",
+                                          final=done >= total_size)
     
     def _backup_critical_files(self):
         """Kritik dosyaları yedekle"""
@@ -142,33 +497,78 @@ class UpdateWorker(QThread):
         for file_name in critical_files:
             file_path = self.target_dir / file_name
             if file_path.exists():
-                shutil.copy2(file_path, backup_dir / file_name)
+                _fast_copy(file_path, backup_dir / file_name)
                 logger.info(f"Backed up: {file_name}")
     
-    def _copy_update_files(self, source_dir: Path, target_dir: Path):
-        """Güncelleme dosyalarını kopyala"""
-        # Atlanacak dosya/klasörler
-        skip_items = {
-            '.git', '__pycache__', '*.pyc', 'venv', 'env',
-            'config.json', 'settings.json', 'users.json', '.env',
-            'logs', 'backup'
-        }
+    def _plan_update_members(self, zip_ref: zipfile.ZipFile) -> List[Tuple[zipfile.ZipInfo, Tuple[str, ...]]]:
+        """
+        Yazılacak ZIP girdilerini ve hedefe göreli yol parçalarını döndür.
+        Ortak kök klasör (reponame-main/) atılır, atlama kuralları uygulanır.
+        """
+        infos = [info for info in zip_ref.infolist() if not info.is_dir()]
+        roots = {info.filename.split('/', 1)[0] for info in infos}
+        strip = len(roots) == 1 and all('/' in info.filename for info in infos)
         
-        for item in source_dir.rglob('*'):
-            if any(skip in str(item) for skip in skip_items):
+        members = []
+        for info in infos:
+            parts = tuple(info.filename.split('/'))[1 if strip else 0:]
+            if '..' in parts or not parts[0]:
+                continue  # Arşiv dışına yazmaya çalışan girdi
+            name = parts[-1]
+            if (UPDATE_SKIP_DIRS.intersection(parts[:-1]) or name in UPDATE_SKIP_NAMES
+                    or name.endswith(UPDATE_SKIP_SUFFIXES)):
                 continue
-                
-            # Hedef yolu hesapla
-            relative_path = item.relative_to(source_dir)
-            target_path = target_dir / relative_path
+            members.append((info, parts))
+        return members
+    
+    def _extract_update_files(self, zip_ref: zipfile.ZipFile,
+                              members: List[Tuple[zipfile.ZipInfo, Tuple[str, ...]]],
+                              target_dir: Path, prefetched: Optional[Dict[str, bytes]] = None):
+        """
+        Seçilen ZIP girdilerini doğrudan hedef klasöre yaz. Girdiler
+        birbirinden bağımsız açılabildiği için thread havuzunda paralel
+        çıkarılır; ZipFile thread-safe olmadığından her worker kendi
+        handle'ını açar. İlerleme 70-95 arası, biten girdi sayısıyla.
+        prefetched: indirme sırasında açılmış içerik; boyut/CRC tutarsa kullanılır.
+        """
+        prefetched = prefetched or {}
+        for directory in sorted({target_dir.joinpath(*parts[:-1]) for _, parts in members}):
+            directory.mkdir(parents=True, exist_ok=True)
+        
+        local = threading.local()
+        handles = []
+        handles_lock = threading.Lock()
+        
+        def extract(info: zipfile.ZipInfo, parts: Tuple[str, ...]):
+            data = prefetched.get(info.filename)
+            if (data is not None and len(data) == info.file_size
+                    and zlib.crc32(data) == info.CRC):
+                with open(target_dir.joinpath(*parts), 'wb') as dst:
+                    dst.write(data)
+                return
             
-            if item.is_file():
-                # Klasör oluştur
-                target_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Dosyayı kopyala
-                shutil.copy2(item, target_path)
-                logger.debug(f"Copied: {relative_path}")
+            zf = getattr(local, 'zf', None)
+            if zf is None:
+                zf = local.zf = zipfile.ZipFile(zip_ref.filename, 'r')
+                with handles_lock:
+                    handles.append(zf)
+            with zf.open(info) as src, open(target_dir.joinpath(*parts), 'wb') as dst:
+                shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK_SIZE)
+        
+        total = len(members)
+        try:
+            with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS) as executor:
+                futures = [executor.submit(extract, info, parts) for info, parts in members]
+                for done, future in enumerate(as_completed(futures), 1):
+                    future.result()
+                    self._emit_progress_throttled(70 + done * 25 // total,
+                                                  f"Dosyalar yazılıyor... {done}/{total}",
+                                                  final=done == total)
+        finally:
+            for zf in handles:
+                zf.close()
+        
+        logger.debug("Extracted %d files", total)
     
     def _update_version_info(self):
         """Version bilgisini güncelle"""
@@ -178,8 +578,32 @@ class UpdateWorker(QThread):
             "update_method": "auto_update"
         }
         
-        with open(VERSION_FILE, 'w', encoding='utf-8') as f:
+        # Önce geçici dosyaya yaz, sonra atomik olarak değiştir
+        tmp_file = VERSION_FILE.with_suffix('.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(version_info, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, VERSION_FILE)
+        AutoUpdater._version_cache = None
+
+
+class UpdateCheckWorker(QThread):
+    """
+    Periyodik (sessiz) güncelleme kontrolü için worker thread: GitHub
+    istekleri GUI thread'ini bloklamaz. Sonuç check_finished ile GUI
+    thread'ine döner (kuyruklu sinyal).
+    """
+    
+    check_finished = pyqtSignal(object)  # Optional[UpdateInfo]
+    
+    def __init__(self, updater: "AutoUpdater", session: requests.Session):
+        super().__init__()
+        self._updater = updater
+        self._session = session
+    
+    def run(self):
+        self.check_finished.emit(
+            self._updater.check_for_updates(silent=True, session=self._session)
+        )
 
 
 class AutoUpdater(QObject):
@@ -187,17 +611,39 @@ class AutoUpdater(QObject):
     
     update_available = pyqtSignal(UpdateInfo)
     
+    # (mtime_ns, version dict): dosya değişmedikçe yeniden parse edilmez
+    _version_cache: Optional[Tuple[int, Dict]] = None
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
-        self._current_version = self._get_current_version()
+        # GUI thread'indeki API kontrolü ve changelog için
+        self._session = _make_session()
+        # Arka plan kontrolü kendi thread'inde, kendi oturumuyla çalışır
+        self._poll_session: Optional[requests.Session] = None
+        self._check_worker: Optional[UpdateCheckWorker] = None
         
+    @property
+    def _current_version(self) -> Dict:
+        return self._get_current_version()
+    
     def _get_current_version(self) -> Dict:
-        """Mevcut version bilgisini al"""
-        if VERSION_FILE.exists():
+        """Mevcut version bilgisini al (mtime değişmedikçe önbellekten)"""
+        try:
+            mtime_ns = VERSION_FILE.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        
+        cache = AutoUpdater._version_cache
+        if mtime_ns is not None and cache and cache[0] == mtime_ns:
+            return cache[1]
+        
+        if mtime_ns is not None:
             try:
                 with open(VERSION_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    version = json.load(f)
+                AutoUpdater._version_cache = (mtime_ns, version)
+                return version
             except Exception as e:
                 logger.warning(f"Version file read error: {e}")
         
@@ -208,26 +654,106 @@ class AutoUpdater(QObject):
             "updated_at": "2025-01-01T00:00:00"
         }
     
-    def check_for_updates(self, silent: bool = False) -> Optional[UpdateInfo]:
-        """Güncellemeleri kontrol et"""
+    def _load_check_cache(self) -> Dict:
+        """Önceki kontrolün önbelleğini oku"""
+        try:
+            with open(UPDATE_CHECK_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_check_cache(self, cache: Dict):
+        """Kontrol önbelleğini yaz"""
+        try:
+            with open(UPDATE_CHECK_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+        except OSError as e:
+            logger.warning(f"Update check cache write error: {e}")
+    
+    @staticmethod
+    def _record_poll(cache: Dict, changed: bool):
+        """Kontrol sonucuna göre bir sonraki aralığı hesapla (üstel geri çekilme)"""
+        now = time.time()
+        cache['last_check'] = now
+        if changed:
+            cache['last_change'] = now
+            cache['consecutive_unchanged'] = 0
+        else:
+            cache['consecutive_unchanged'] = cache.get('consecutive_unchanged', 0) + 1
+        cache['next_interval_s'] = min(
+            POLL_INTERVAL_MIN * 2 ** cache['consecutive_unchanged'], POLL_INTERVAL_MAX
+        )
+    
+    def next_check_delay(self) -> float:
+        """Bir sonraki kontrole kalan süre (saniye, 0 = şimdi)"""
+        cache = self._load_check_cache()
+        last_check = cache.get('last_check')
+        if last_check is None:
+            return 0.0
+        remaining = last_check + cache.get('next_interval_s', POLL_INTERVAL_MIN) - time.time()
+        return max(remaining, 0.0)
+    
+    def should_check_now(self) -> bool:
+        """Zamanlayıcı API'yi çağırmadan önce bunu sormalı"""
+        return self.next_check_delay() <= 0
+    
+    def check_for_updates(self, silent: bool = False,
+                          session: Optional[requests.Session] = None) -> Optional[UpdateInfo]:
+        """
+        Güncellemeleri kontrol et (ETag ile koşullu istek).
+        session: verilmezse GUI tarafının oturumu; arka plan kontrolü kendi
+        oturumunu verir (Session thread'ler arasında paylaşılmaz).
+        """
+        session = session or self._session
         try:
+            cache = self._load_check_cache()
+            headers = dict(GITHUB_API_HEADERS)
+            if cache.get('etag'):
+                headers['If-None-Match'] = cache['etag']
+            if cache.get('last_modified'):
+                headers['If-Modified-Since'] = cache['last_modified']
+            
             # GitHub API'den son commit bilgilerini al
-            response = requests.get(f"{GITHUB_API_URL}/commits/main", timeout=10)
-            response.raise_for_status()
+            response = session.get(f"{GITHUB_API_URL}/commits/main",
+                                   headers=headers, timeout=10)
             
-            commit_data = response.json()
-            latest_sha = commit_data['sha']
+            previous_sha = cache.get('sha')
+            if response.status_code == 304 and previous_sha:
+                # Değişiklik yok: gövdesiz yanıt, önceki commit bilgisi geçerli
+                latest_sha = previous_sha
+            else:
+                response.raise_for_status()
+                commit_data = response.json()
+                latest_sha = commit_data['sha']
+                cache.pop('changelog', None)
+                cache.pop('changelog_from', None)
+                cache.update({
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'sha': latest_sha,
+                    'message': commit_data['commit']['message'],
+                    'date': commit_data['commit']['committer']['date'],
+                })
+            self._record_poll(cache, changed=latest_sha != previous_sha)
             current_sha = self._current_version.get('commit_sha', '')
             
             # Güncelleme var mı kontrol et
             if latest_sha != current_sha:
+                # Changelog aynı sha aralığı için önbellekten
+                if cache.get('changelog_from') != current_sha or 'changelog' not in cache:
+                    cache['changelog'] = self._get_changelog(current_sha, latest_sha, session)
+                    # Başarısız changelog önbellekte kalmasın
+                    cache['changelog_from'] = (None if cache['changelog'] == [CHANGELOG_ERROR]
+                                               else current_sha)
+                self._save_check_cache(cache)
+                
                 update_info = UpdateInfo({
                     'version': 'latest',
                     'commit_sha': latest_sha,
-                    'commit_message': commit_data['commit']['message'],
-                    'commit_date': commit_data['commit']['committer']['date'],
+                    'commit_message': cache['message'],
+                    'commit_date': cache['date'],
                     'download_url': GITHUB_DOWNLOAD_URL,
-                    'changelog': self._get_changelog(current_sha, latest_sha)
+                    'changelog': cache['changelog']
                 })
                 
                 if not silent:
@@ -235,6 +761,7 @@ class AutoUpdater(QObject):
                 
                 return update_info
             else:
+                self._save_check_cache(cache)
                 if not silent:
                     QMessageBox.information(
                         self.parent,
@@ -257,15 +784,18 @@ class AutoUpdater(QObject):
                 handle_error(e, "Güncelleme kontrolünde hata", show_dialog=True, parent=self.parent)
             return None
     
-    def _get_changelog(self, from_sha: str, to_sha: str) -> list:
+    def _get_changelog(self, from_sha: str, to_sha: str,
+                       session: Optional[requests.Session] = None) -> list:
         """Değişiklik listesini al"""
+        session = session or self._session
         try:
             if not from_sha:
                 return ["İlk kurulum"]
                 
             # Commit'ler arasındaki farkı al
-            response = requests.get(
+            response = session.get(
                 f"{GITHUB_API_URL}/compare/{from_sha}...{to_sha}",
+                headers=GITHUB_API_HEADERS,
                 timeout=10
             )
             response.raise_for_status()
@@ -282,7 +812,7 @@ class AutoUpdater(QObject):
             
         except Exception as e:
             logger.warning(f"Changelog fetch error: {e}")
-            return ["Changelog alınamadı"]
+            return [CHANGELOG_ERROR]
     
     def perform_update(self, update_info: UpdateInfo) -> bool:
         """Güncellemeyi gerçekleştir"""
@@ -318,6 +848,7 @@ class AutoUpdater(QObject):
             
             # Worker thread başlat
             app_dir = Path(__file__).parent.parent.parent
+            # Worker kendi oturumunu açar (GUI oturumu thread'ler arası paylaşılmaz)
             self.worker = UpdateWorker(update_info.download_url, str(app_dir))
             
             self.worker.progress_updated.connect(
@@ -402,12 +933,36 @@ class AutoUpdater(QObject):
             )
     
     def check_updates_on_startup(self):
-        """Uygulama başlangıcında güncelleme kontrol et (sessiz)"""
-        update_info = self.check_for_updates(silent=True)
+        """
+        Başlangıçta ve sonrasında periyodik güncelleme kontrolü (sessiz).
+        Aralık uzak repo sessiz kaldıkça uzar (bkz. _record_poll).
+        Burada yalnızca zamanlama yapılır; HTTP istekleri UpdateCheckWorker'da.
+        """
+        if self._check_worker is not None and self._check_worker.isRunning():
+            return  # önceki kontrol bitince kendisi yeniden planlar
+        
+        if self.should_check_now():
+            if self._poll_session is None:
+                self._poll_session = _make_session()
+            self._check_worker = UpdateCheckWorker(self, self._poll_session)
+            self._check_worker.check_finished.connect(self._on_poll_finished)
+            self._check_worker.start()
+            return
+        
+        self._schedule_next_check()
+    
+    def _on_poll_finished(self, update_info: Optional[UpdateInfo]):
+        """Arka plan kontrolü bitti (GUI thread'inde çağrılır)"""
         if update_info:
             # Toast notification
             from app import toast
             toast(
                 "Güncelleme Mevcut", 
                 "Yeni güncelleme var! Menüden kontrol edin."
-            )
\ No newline at end of file
+            )
+        self._schedule_next_check()
+    
+    def _schedule_next_check(self):
+        """Bir sonraki kontrolü planla (hata durumunda en az POLL_INTERVAL_MIN)"""
+        delay = self.next_check_delay() or POLL_INTERVAL_MIN
+        QTimer.singleShot(int(delay * 1000), self.check_updates_on_startup)
\ No newline at end of file
@@ -6,10 +6,19 @@ Kullanıcı yönetimi için SQL Server tablosu ve işlemleri.
 """
 
 import hashlib
+import hmac
 import json
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, Optional, List
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+try:  # bcrypt opsiyonel; yoksa eski SHA-256 şemasına düşülür
+    import bcrypt
+except ImportError:  # pragma: no cover
+    bcrypt = None
 
 from app.dao.logo import get_conn, exec_sql, fetch_one, fetch_all
 from app.core.logger import get_logger
@@ -20,8 +29,23 @@ from app.core.exceptions import (
 
 logger = get_logger(__name__)
 
+# bcrypt maliyet faktörü (~50-100 ms / hash)
+BCRYPT_ROUNDS = 12
+# Eski şema: tuzsuz SHA-256 hex (64 karakter)
+_LEGACY_HASH_LEN = 64
+
+# get_user önbelleği (password_hash önbelleğe alınmaz)
+USER_CACHE_TTL = 60.0
+USER_CACHE_MAXSIZE = 512
+
+# last_login bu süreden sık yazılmaz (saniye)
+LAST_LOGIN_MIN_INTERVAL = 300.0
+# username -> son başarılı last_login yazımı (monotonic)
+_last_login_written: Dict[str, float] = {}
+_last_login_lock = threading.Lock()
+
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """Kullanıcı veri sınıfı"""
     user_id: int
@@ -34,10 +58,14 @@ class User:
     created_at: str
     last_login: Optional[str] = None
     password_hash: Optional[str] = None
+    # to_dict() sonucu; alan değiştiren kod None'a çekmeli
+    _cached_dict: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict:
-        """User'ı dictionary'ye çevir (password_hash hariç)"""
-        data = {
+        """User'ı dictionary'ye çevir (password_hash hariç, önbellekli)"""
+        if self._cached_dict is not None:
+            return self._cached_dict
+        self._cached_dict = {
             'user_id': self.user_id,
             'username': self.username,
             'full_name': self.full_name,
@@ -48,7 +76,7 @@ class User:
             'created_at': self.created_at,
             'last_login': self.last_login
         }
-        return data
+        return self._cached_dict
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'User':
@@ -59,10 +87,40 @@ class User:
 class DatabaseUserManager:
     """SQL Database tabanlı kullanıcı yönetimi"""
     
+    table_name = "WMS_USERS"
+    
+    # SQL metinleri bir kez oluşturulur: sürücünün statement önbelleği
+    # aynı metinle isabet eder, çağrı başına f-string kurulmaz
+    _SQL_USER_COLUMNS = ("user_id, username, full_name, email, role, warehouse_id, "
+                         "is_active, created_at, last_login")
+    _SQL_GET_USER = f"SELECT {_SQL_USER_COLUMNS} FROM {table_name} WHERE username = ?"
+    _SQL_GET_USER_WITH_HASH = (f"SELECT {_SQL_USER_COLUMNS}, password_hash "
+                               f"FROM {table_name} WHERE username = ?")
+    _SQL_GET_ALL_USERS = f"SELECT {_SQL_USER_COLUMNS} FROM {table_name} ORDER BY created_at"
+    _SQL_INSERT_USER = (f"INSERT INTO {table_name} "
+                        "(username, full_name, email, password_hash, role, warehouse_id, is_active) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)")
+    _SQL_UPDATE_LAST_LOGIN = f"UPDATE {table_name} SET last_login = GETDATE() WHERE username = ?"
+    _SQL_UPDATE_LAST_LOGIN_HASH = (f"UPDATE {table_name} "
+                                   "SET last_login = GETDATE(), password_hash = ?, updated_at = GETDATE() "
+                                   "WHERE username = ?")
+    _SQL_DELETE_USER = f"DELETE FROM {table_name} WHERE username = ?"
+    
+    # Tablo/admin kontrolü süreç başına bir kez (ilk örnekte) yapılır
+    _initialized = False
+    _init_lock = threading.Lock()
+    
     def __init__(self):
-        self.table_name = "WMS_USERS"
-        self._ensure_table_exists()
-        self._create_default_admin()
+        # username -> (son geçerlilik, hash'siz kullanıcı alanları); LRU sıralı
+        self._user_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        # OrderedDict'in get+move_to_end / popitem adımları atomik değil
+        self._cache_lock = threading.Lock()
+        if not DatabaseUserManager._initialized:
+            with DatabaseUserManager._init_lock:
+                if not DatabaseUserManager._initialized:
+                    self._ensure_table_exists()
+                    self._create_default_admin()
+                    DatabaseUserManager._initialized = True
     
     def _ensure_table_exists(self):
         """WMS_USERS tablosunu oluştur (yoksa)"""
@@ -116,55 +174,121 @@ class DatabaseUserManager:
             print(f"Error creating default admin user: {e}")
     
     def _hash_password(self, password: str) -> str:
-        """Şifreyi hash'le"""
-        # SHA-256 kullanıyoruz (production'da bcrypt kullanılmalı)
-        return hashlib.sha256(password.encode('utf-8')).hexdigest()
+        """Şifreyi hash'le (bcrypt; kurulu değilse eski SHA-256)"""
+        if bcrypt is None:
+            logger.warning("bcrypt yüklü değil, SHA-256 hash kullanılıyor")
+            return self._legacy_hash(password)
+        return bcrypt.hashpw(password.encode('utf-8'),
+                             bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('ascii')
+    
+    @staticmethod
+    def _legacy_digest(password: str) -> bytes:
+        """Eski şema: tuzsuz SHA-256 ham özeti (yalnızca geçiş için)"""
+        return hashlib.sha256(password.encode('utf-8')).digest()
+    
+    @classmethod
+    def _legacy_hash(cls, password: str) -> str:
+        """Eski şema: tuzsuz SHA-256 hex (bcrypt yoksa yeni hash olarak da)"""
+        return cls._legacy_digest(password).hex()
+    
+    @staticmethod
+    def _is_legacy_hash(password_hash: str) -> bool:
+        """Hash eski SHA-256 şemasında mı?"""
+        return len(password_hash) == _LEGACY_HASH_LEN and not password_hash.startswith('$')
     
     def _verify_password(self, password: str, password_hash: str) -> bool:
         """Şifreyi doğrula"""
-        return self._hash_password(password) == password_hash
+        if self._is_legacy_hash(password_hash):
+            # Ham özetler sabit zamanlı karşılaştırılır (hex biçimleme yok)
+            try:
+                expected = bytes.fromhex(password_hash)
+            except ValueError:
+                return False
+            return hmac.compare_digest(self._legacy_digest(password), expected)
+        if bcrypt is None:
+            logger.error("bcrypt hash doğrulanamıyor: bcrypt yüklü değil")
+            return False
+        try:
+            return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('ascii'))
+        except ValueError:
+            return False
     
-    def get_user(self, username: str) -> Optional[User]:
-        """Kullanıcıyı username ile al"""
-        if not username:
-            return None
-        
+    @staticmethod
+    def _row_fields(row: Dict) -> tuple:
+        """DB satırını User alan sırasında tuple'a çevir (password_hash hariç)"""
+        created_at = row['created_at']
+        last_login = row['last_login']
+        return (
+            row['user_id'], row['username'], row['full_name'], row['email'],
+            row['role'], row['warehouse_id'], bool(row['is_active']),
+            created_at.isoformat() if created_at else None,
+            last_login.isoformat() if last_login else None,
+        )
+    
+    def _cache_get(self, username: str) -> Optional[tuple]:
+        """Önbellekten süresi dolmamış kaydı al"""
+        with self._cache_lock:
+            entry = self._user_cache.get(username)
+            if entry is None:
+                return None
+            expires, data = entry
+            if expires < time.monotonic():
+                del self._user_cache[username]
+                return None
+            self._user_cache.move_to_end(username)
+            return data
+    
+    def _cache_put(self, username: str, data: tuple):
+        """Kaydı önbelleğe koy (password_hash içermez), LRU sınırını uygula"""
+        with self._cache_lock:
+            self._user_cache[username] = (time.monotonic() + USER_CACHE_TTL, data)
+            self._user_cache.move_to_end(username)
+            if len(self._user_cache) > USER_CACHE_MAXSIZE:
+                self._user_cache.popitem(last=False)
+    
+    def _cache_drop(self, username: str):
+        """Kaydı önbellekten çıkar (yazma/silme sonrası)"""
+        with self._cache_lock:
+            self._user_cache.pop(username, None)
+    
+    def _fetch_user(self, username: str, with_hash: bool = False) -> Optional[tuple]:
+        """
+        Kullanıcı satırını DB'den User alan sırasında oku (önbelleği tazeler).
+        with_hash=True ise sona password_hash eklenir.
+        """
         try:
-            sql = f"""
-            SELECT user_id, username, full_name, email, role, warehouse_id, 
-                   is_active, created_at, last_login, password_hash
-            FROM {self.table_name}
-            WHERE username = ?
-            """
-            
+            sql = self._SQL_GET_USER_WITH_HASH if with_hash else self._SQL_GET_USER
             row = fetch_one(sql, username)
-            if row:
-                user_data = {
-                    'user_id': row['user_id'],
-                    'username': row['username'],
-                    'full_name': row['full_name'],
-                    'email': row['email'],
-                    'role': row['role'],
-                    'warehouse_id': row['warehouse_id'],
-                    'is_active': bool(row['is_active']),
-                    'created_at': row['created_at'].isoformat() if row['created_at'] else None,
-                    'last_login': row['last_login'].isoformat() if row['last_login'] else None,
-                    'password_hash': row['password_hash']
-                }
-                return User(**user_data)
+            if not row:
+                return None
             
-            return None
+            fields = self._row_fields(row)
+            self._cache_put(username, fields)
+            return fields + (row['password_hash'],) if with_hash else fields
             
         except Exception as e:
             logger.error(f"Error getting user {username}: {e}")
             raise DatabaseException(f"Kullanıcı bilgisi alınamadı: {str(e)}")
     
+    def get_user(self, username: str) -> Optional[User]:
+        """Kullanıcıyı username ile al (TTL önbellekli, password_hash içermez)"""
+        if not username:
+            return None
+        
+        fields = self._cache_get(username) or self._fetch_user(username)
+        return User(*fields) if fields else None
+    
     def authenticate(self, username: str, password: str = None) -> Optional[User]:
         """Kullanıcı doğrula"""
         if not username or not username.strip():
             raise ValidationException("Kullanıcı adı boş olamaz", field="username")
         
-        user = self.get_user(username)
+        # Şifre kontrolü için hash her seferinde DB'den okunur
+        if password:
+            fields = self._fetch_user(username, with_hash=True)
+            user = User(*fields) if fields else None
+        else:
+            user = self.get_user(username)
         if not user:
             raise InvalidUserException(username)
         
@@ -172,12 +296,18 @@ class DatabaseUserManager:
             raise InactiveUserException(username)
         
         # Şifre kontrolü (verilmişse)
+        new_hash = None
         if password and user.password_hash:
             if not self._verify_password(password, user.password_hash):
                 raise InvalidUserException(username)
+            # Eski SHA-256 hash'i başarılı girişte bcrypt'e yükselt
+            if bcrypt is not None and self._is_legacy_hash(user.password_hash):
+                new_hash = self._hash_password(password)
+                user.password_hash = new_hash
         
-        # Last login güncelle
-        self.update_last_login(username)
+        # Last login güncelle (gerekirse yeni hash ile aynı UPDATE'te)
+        if self.update_last_login(username, new_hash) and new_hash:
+            logger.info("Password hash upgraded to bcrypt: %s", username)
         
         logger.info(f"User authenticated: {username}")
         return user
@@ -196,12 +326,6 @@ class DatabaseUserManager:
         try:
             password_hash = self._hash_password(user_data['password'])
             
-            sql = f"""
-            INSERT INTO {self.table_name} 
-            (username, full_name, email, password_hash, role, warehouse_id, is_active)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            
             params = (
                 user_data['username'],
                 user_data['full_name'],
@@ -212,7 +336,7 @@ class DatabaseUserManager:
                 user_data.get('is_active', True)
             )
             
-            exec_sql(sql, *params)
+            exec_sql(self._SQL_INSERT_USER, *params)
             
             # Oluşturulan kullanıcıyı getir
             new_user = self.get_user(user_data['username'])
@@ -225,6 +349,7 @@ class DatabaseUserManager:
     
     def update_user(self, username: str, updates: Dict) -> bool:
         """Kullanıcı güncelle"""
+        self._cache_drop(username)
         if not self.get_user(username):
             return False
         
@@ -255,6 +380,7 @@ class DatabaseUserManager:
             """
             
             exec_sql(sql, *params)
+            self._cache_drop(username)
             logger.info(f"User updated: {username}")
             return True
             
@@ -262,16 +388,29 @@ class DatabaseUserManager:
             logger.error(f"Error updating user {username}: {e}")
             raise DatabaseException(f"Kullanıcı güncellenemedi: {str(e)}")
     
-    def update_last_login(self, username: str) -> bool:
-        """Last login zamanını güncelle"""
+    def update_last_login(self, username: str, password_hash: Optional[str] = None,
+                          force: bool = False) -> bool:
+        """
+        Last login zamanını (ve verilmişse yükseltilmiş şifre hash'ini) güncelle.
+        Son yazımdan LAST_LOGIN_MIN_INTERVAL geçmediyse yazım atlanır
+        (force=True veya hash yükseltmesi hariç).
+        """
+        now = time.monotonic()
+        if not (force or password_hash):
+            with _last_login_lock:
+                written = _last_login_written.get(username)
+            if written is not None and now - written < LAST_LOGIN_MIN_INTERVAL:
+                return True
+        
+        self._cache_drop(username)
         try:
-            sql = f"""
-            UPDATE {self.table_name}
-            SET last_login = GETDATE()
-            WHERE username = ?
-            """
+            if password_hash:
+                exec_sql(self._SQL_UPDATE_LAST_LOGIN_HASH, password_hash, username)
+            else:
+                exec_sql(self._SQL_UPDATE_LAST_LOGIN, username)
             
-            exec_sql(sql, username)
+            with _last_login_lock:
+                _last_login_written[username] = now
             return True
             
         except Exception as e:
@@ -281,31 +420,9 @@ class DatabaseUserManager:
     def get_all_users(self) -> List[User]:
         """Tüm kullanıcıları al"""
         try:
-            sql = f"""
-            SELECT user_id, username, full_name, email, role, warehouse_id, 
-                   is_active, created_at, last_login
-            FROM {self.table_name}
-            ORDER BY created_at
-            """
-            
-            rows = fetch_all(sql)
-            users = []
-            
-            for row in rows:
-                user_data = {
-                    'user_id': row['user_id'],
-                    'username': row['username'],
-                    'full_name': row['full_name'],
-                    'email': row['email'],
-                    'role': row['role'],
-                    'warehouse_id': row['warehouse_id'],
-                    'is_active': bool(row['is_active']),
-                    'created_at': row['created_at'].isoformat() if row['created_at'] else None,
-                    'last_login': row['last_login'].isoformat() if row['last_login'] else None
-                }
-                users.append(User(**user_data))
-            
-            return users
+            # Sütun sırası User alan sırasıyla aynı: ara dict yok, konumsal kurulum
+            row_fields = self._row_fields
+            return [User(*row_fields(row)) for row in fetch_all(self._SQL_GET_ALL_USERS)]
             
         except Exception as e:
             logger.error(f"Error getting all users: {e}")
@@ -332,8 +449,8 @@ class DatabaseUserManager:
             raise ValidationException("Admin kullanıcısı silinemez")
         
         try:
-            sql = f"DELETE FROM {self.table_name} WHERE username = ?"
-            exec_sql(sql, username)
+            exec_sql(self._SQL_DELETE_USER, username)
+            self._cache_drop(username)
             logger.info(f"User deleted: {username}")
             return True
             
@@ -25,14 +25,17 @@ CREATE TABLE dbo.WMS_PICKQUEUE (
 from __future__ import annotations
 import os
 import logging
+import queue
 import time
 import uuid
 from contextlib import contextmanager
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import pyodbc
 
-from app.constants import MAX_RETRY, RETRY_WAIT, DEFAULT_COMPANY_NR, DEFAULT_PERIOD_NR
+from app.constants import (
+    MAX_RETRY, RETRY_WAIT, DEFAULT_COMPANY_NR, DEFAULT_PERIOD_NR, WAREHOUSE_PREFIXES_MAP,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -79,31 +82,100 @@ CONN_STR = (
 QUEUE_TABLE = "WMS_PICKQUEUE"  # kalıcı kuyruk tablosu
 
 # ---------------------------------------------------------------------------
-@contextmanager
-def get_conn(*, autocommit: bool = False):
-    """
-    MSSQL bağlantısı üretir; geçici hatalarda max 3 kez yeniden dener.
-    Başarı → pyodbc.Connection  |  Başarısız → son hatayı yükseltir.
-    """
+def _connect(autocommit: bool) -> pyodbc.Connection:
+    """Yeni bağlantı açar; geçici hatalarda MAX_RETRY kez yeniden dener."""
     last_exc = None
     for attempt in range(1, MAX_RETRY + 1):
         try:
-            conn = pyodbc.connect(CONN_STR, timeout=5, autocommit=autocommit)
-            break                      # ➜ başarılı çıkış
+            return pyodbc.connect(CONN_STR, timeout=5, autocommit=autocommit)
         except pyodbc.Error as exc:
             last_exc = exc
             logger.warning(
                 "DB bağlantı hatası (deneme %d/%d): %s",
                 attempt, MAX_RETRY, exc)
             time.sleep(RETRY_WAIT)
-    else:                              # for-else 👉 3 deneme de başarısız
-        raise last_exc                 # ↑ main window yakalayacak
+    raise last_exc                     # ↑ main window yakalayacak
+
 
+@contextmanager
+def get_conn(*, autocommit: bool = False):
+    """
+    MSSQL bağlantısı üretir; geçici hatalarda max 3 kez yeniden dener.
+    Başarı → pyodbc.Connection  |  Başarısız → son hatayı yükseltir.
+    """
+    conn = _connect(autocommit)
     try:
         yield conn
     finally:
         conn.close()
 
+
+# ---------------------------------------------------------------------------
+# Bağlantı havuzu – sık çağrılan DAO'lar için (login el sıkışması bir kez)
+# ---------------------------------------------------------------------------
+POOL_SIZE = int(os.getenv("WMS_ODBC_POOL", "16"))
+# Bu süreden (sn) uzun boşta kalan bağlantı verilmeden önce SELECT 1 ile yoklanır
+# (sunucu yeniden başlaması / idle timeout sonrası kopuk bağlantı)
+POOL_PING_AFTER = float(os.getenv("WMS_ODBC_POOL_PING", "30"))
+# (bağlantı, havuza dönüş zamanı – time.monotonic)
+_pool: "queue.LifoQueue[Tuple[pyodbc.Connection, float]]" = queue.LifoQueue(maxsize=POOL_SIZE)
+
+
+def _checkout(autocommit: bool) -> pyodbc.Connection:
+    """Havuzdan bağlantı al; boşsa ya da kopuk çıkarsa bir kez yenisini aç."""
+    try:
+        conn, idle_since = _pool.get_nowait()
+    except queue.Empty:
+        return _connect(autocommit)
+    try:
+        conn.autocommit = autocommit
+        if time.monotonic() - idle_since > POOL_PING_AFTER:
+            conn.execute("SELECT 1").fetchone()
+        return conn
+    except pyodbc.Error as exc:
+        logger.info("Havuzdaki DB bağlantısı kopmuş, yenisi açılıyor: %s", exc)
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+        return _connect(autocommit)
+
+
+@contextmanager
+def get_conn_pooled(*, autocommit: bool = False):
+    """
+    `get_conn` ile aynı arayüz, fakat bağlantıyı kapatmak yerine havuza
+    geri koyar. Havuz boşsa yeni bağlantı açılır; doluysa fazlası kapanır.
+    pyodbc hatası alan bağlantı havuza dönmez. Uzun süre boşta kalmış
+    bağlantı verilmeden önce yoklanır (bkz. POOL_PING_AFTER).
+    """
+    conn = _checkout(autocommit)
+
+    healthy = True
+    try:
+        yield conn
+    except pyodbc.Error:
+        healthy = False
+        raise
+    finally:
+        if healthy:
+            try:
+                if not conn.autocommit:
+                    conn.rollback()    # açık işlem kalmasın
+                _pool.put_nowait((conn, time.monotonic()))
+            except (pyodbc.Error, queue.Full):
+                healthy = False
+        if not healthy:
+            try:
+                conn.close()
+            except pyodbc.Error:
+                pass
+
+
+def pool_stats() -> Dict[str, int]:
+    """Havuz durumu (sağlık / durum ekranı için)."""
+    return {"size": POOL_SIZE, "idle": _pool.qsize()}
+
 # ---------------------------------------------------------------------------
 # Yardımcı – tablo adı üretici
 # ---------------------------------------------------------------------------
@@ -464,11 +536,12 @@ def queue_delete(order_id: int):
     exec_sql(f"DELETE FROM {QUEUE_TABLE} WHERE order_id = ?", order_id)
 
 
-_PREFIX_BY_WH = {0: "D1-", 1: "D3-", 2: "D4-", 3: "D5-"}   # depo → stok kodu ön eki
-
 def resolve_barcode_prefix(barcode: str, warehouse_id: int) -> str | None:
-    prefix = _PREFIX_BY_WH.get(warehouse_id)
-    if not prefix:
+    # depo → stok kodu ön eki (constants.WAREHOUSE_PREFIXES_MAP, id = index).
+    # Mapping araması: DB satırından gelen Decimal id de eşleşir, geçersiz
+    # tip/aralık TypeError yerine None döner.
+    prefix = WAREHOUSE_PREFIXES_MAP.get(warehouse_id)
+    if prefix is None:
         return None
 
     sql = f'''
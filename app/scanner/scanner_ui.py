@@ -137,10 +137,12 @@ class ScannerUI(tk.Tk):
         if koli is None:
             return
         try:
+            missing_rows = []
             for l in self.lines:
                 missing = l["qty_ordered"] - self.counts.get(l["item_code"],0)
                 if missing>0:
-                    bo.insert_backorder(order_no, l["line_id"], l["warehouse_id"], l["item_code"], missing, None)
+                    missing_rows.append((order_no, l["line_id"], l["warehouse_id"], l["item_code"], missing, None))
+            bo.insert_backorders_bulk(missing_rows)     # tek MERGE
             dao.update_order_header(order_id, genexp4=f"PAKET SAYISI : {koli}", genexp5=order_no)
             dao.update_order_status(order_id, 4)
             self.status_lbl.config(text="Sipariş tamamlandı", foreground="blue"); self.bell()
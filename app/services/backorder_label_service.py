@@ -3,7 +3,7 @@ from __future__ import annotations
 import argparse, datetime as dt, logging
 from typing import Optional, Set
 
-from app.backorder    import list_fulfilled
+from app.backorder    import list_fulfilled, list_fulfilled_all
 from app.dao.logo     import fetch_order_header, update_order_header
 from app.services.label_service import make_labels as create_labels
 
@@ -35,9 +35,9 @@ def make_backorder_labels(
         Sadece belirtilen sipariş numarası işlensin. (UI seçimi)
     """
     if only_order:
-        rows = [r for r in list_fulfilled() if r["order_no"] == only_order]
+        rows = [r for r in list_fulfilled() if r.order_no == only_order]
     else:
-        rows = list_fulfilled(the_date.isoformat())
+        rows = list_fulfilled_all(the_date.isoformat())
 
     if not rows:
         log.info("İşlenecek back-order yok.")
@@ -45,11 +45,11 @@ def make_backorder_labels(
 
     done: Set[str] = set()
     for r in rows:
-        ord_no = r["order_no"]
+        ord_no = r.order_no
         if ord_no in done:
             continue
 
-        pkg_tot = override_pkg_tot or max(int(r.get("qty_missing", 1)), 1)
+        pkg_tot = override_pkg_tot or max(int(r.qty_missing or 1), 1)
 
         hdr = fetch_order_header(ord_no)
         if not hdr:
@@ -72,7 +72,7 @@ def process_backorders() -> None:
     • depo‐stok bazında gruplayıp serbest stoku (ONHAND) kontrol eder
     • yeterli stok varsa bo.mark_fulfilled + toast bildirimi
     """
-    pending = bo.list_pending()
+    pending = bo.list_pending_all()
     if not pending:
         log.info("Back-order kontrolü: tamamlanacak eksik ürün yok")
         return
@@ -82,8 +82,8 @@ def process_backorders() -> None:
         lambda: {"need": 0.0, "recs": []}
     )
     for rec in pending:
-        key = (rec["order_no"], rec["item_code"], rec["warehouse_id"])
-        groups[key]["need"] += rec["qty_missing"]
+        key = (rec.order_no, rec.item_code, rec.warehouse_id)
+        groups[key]["need"] += rec.qty_missing
         groups[key]["recs"].append(rec)
 
     log.info("Back-order kontrolü başlıyor (%d grup)…", len(groups))
@@ -99,7 +99,7 @@ def process_backorders() -> None:
         if free >= need:
             # ► tüm alt kayıtları kapat
             for rec in g["recs"]:
-                bo.mark_fulfilled(rec["id"])
+                bo.mark_fulfilled(rec.id)
 
             msg = f"{ord_no}  {item_code}  +{need:.0f} (AMB {wh_id})"
             log.info("TAMAMLANDI ▸ %s", msg)
@@ -8,18 +8,34 @@ Kullanım:
 
 from pathlib import Path
 import time, csv
-from typing import List, Tuple
+from itertools import islice
+from typing import Iterable, Iterator, Tuple
 
-import pandas as pd                       # openpyxl + xlrd kurulu olmalı
 from app.dao.logo import get_connection    # DAO’daki ortak bağlantı
 
 # ────────────────────────────────────────────────────────────────────────────
-# MERGE  →  varsa UPDATE  |  yoksa INSERT
+# Satırlar önce #stg geçici tablosuna toplu yazılır (fast_executemany),
+# ardından TEK bir set-based MERGE  →  varsa UPDATE  |  yoksa INSERT.
+# Dosyadaki tekrarlarda (barcode, wh) başına son satır geçerli: MERGE aynı
+# hedef satırı iki kez güncelleyemeyeceği için kaynak seq ile tekilleştirilir.
 # ────────────────────────────────────────────────────────────────────────────
-SQL = (
+# #stg kolon tipleri/uzunlukları/collation hedef tablodan kopyalanır (TOP 0 …
+# INTO): hedefe sığan her değer staging'e de sığar, MERGE join'i tip/collation
+# dönüşümsüz olur. seq dosya sırası (tekrarlarda son satır kazanır).
+SQL_CREATE_STAGE = (
+    "SELECT TOP 0 IDENTITY(INT, 1, 1) AS seq, "
+    "       barcode, warehouse_id AS wh, item_code, multiplier AS mul "
+    "INTO #stg FROM dbo.barcode_xref"
+)
+
+SQL_INSERT_STAGE = "INSERT INTO #stg (barcode, wh, item_code, mul) VALUES (?, ?, ?, ?)"
+
+SQL_MERGE_STAGE = (
     "MERGE dbo.barcode_xref AS tgt "
-    "USING (VALUES (?, ?, ?, ?)) "
-    "     AS src(barcode, wh, item_code, mul) "
+    "USING (SELECT barcode, wh, item_code, mul FROM ("
+    "         SELECT *, ROW_NUMBER() OVER (PARTITION BY barcode, wh "
+    "                                      ORDER BY seq DESC) AS rn "
+    "         FROM #stg) AS d WHERE d.rn = 1) AS src "
     "ON (tgt.barcode = src.barcode AND tgt.warehouse_id = src.wh) "
     "WHEN MATCHED THEN "
     "     UPDATE SET tgt.item_code   = src.item_code, "
@@ -30,28 +46,75 @@ SQL = (
     "     VALUES (src.barcode, src.wh, src.item_code, src.mul, GETDATE());"
 )
 
+SQL_DROP_STAGE = "DROP TABLE #stg"
+
+# Dosya bu büyüklükte parçalar halinde okunup #stg'ye yazılır; bellekte
+# yalnızca bir parça tutulur (commit yine tek)
+STAGE_BATCH = 1000
+
 # ────────────────────────────────────────────────────────────────────────────
 # Dosya okuma yardımcıları
 # ────────────────────────────────────────────────────────────────────────────
-def _read_csv(path: Path) -> List[Tuple]:
+def _read_csv(path: Path) -> Iterator[Tuple]:
+    # csv.reader + başlıktan bir kez çözülen sütun indeksleri (satır başına dict yok)
     with open(path, newline="", encoding="utf-8") as f:
-        return [(
-            r["barcode"].strip(),
-            int(r["warehouse_id"]),
-            r["item_code"].strip(),
-            float(r.get("multiplier") or 1),
-        ) for r in csv.DictReader(f)]
-
-
-def _read_xlsx(path: Path) -> List[Tuple]:
-    df = pd.read_excel(path, dtype=str)
-    df["multiplier"] = df.get("multiplier", 1).fillna(1).astype(float)
-    return list(zip(
-        df["barcode"].str.strip(),
-        df["warehouse_id"].astype(int),
-        df["item_code"].str.strip(),
-        df["multiplier"]
-    ))
+        yield from _sheet_rows(csv.reader(f))
+
+
+def _cell_str(value) -> str:
+    """Hücre değerini metne çevir (12345.0 → '12345', pandas dtype=str gibi)"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _sheet_rows(rows: Iterable[tuple]) -> Iterator[Tuple]:
+    """
+    Başlık satırı + veri satırlarından (barcode, wh, item_code, mul) üretir.
+    Sütunlar başlıktan bir kez çözülür, satırlara konumla erişilir.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+    idx = {str(h).strip(): i for i, h in enumerate(header) if h not in (None, "")}
+    i_bc, i_wh, i_item = idx["barcode"], idx["warehouse_id"], idx["item_code"]
+    i_mul = idx.get("multiplier")
+
+    for row in rows:
+        if not row or row[i_bc] in (None, ""):    # boş satır
+            continue
+        mul = row[i_mul] if i_mul is not None else None
+        yield (
+            _cell_str(row[i_bc]),
+            int(row[i_wh]),
+            _cell_str(row[i_item]),
+            float(mul) if mul not in (None, "") else 1.0,
+        )
+
+
+def _read_xlsx(path: Path) -> Iterator[Tuple]:
+    """
+    Excel dosyasını satır satır okur; DataFrame kurulmaz, bellek kullanımı
+    dosya boyutundan bağımsız kalır. Kütüphaneler yalnızca burada yüklenir
+    (pandas/numpy hiç yüklenmez).
+    """
+    if path.suffix.lower() == ".xls":     # eski format: openpyxl okuyamaz
+        import xlrd
+        book = xlrd.open_workbook(str(path), on_demand=True)
+        try:
+            sheet = book.sheet_by_index(0)
+            yield from _sheet_rows(sheet.row_values(r) for r in range(sheet.nrows))
+        finally:
+            book.release_resources()
+        return
+
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from _sheet_rows(wb.active.iter_rows(values_only=True))
+    finally:
+        wb.close()
 
 # ────────────────────────────────────────────────────────────────────────────
 # Ana fonksiyon
@@ -70,9 +133,15 @@ def load_file(path: str) -> Tuple[int, float, int]:
 
     t0 = time.time(); err = 0
     try:
-        cur.executemany(SQL, rows)        # tek seferde bütün satırlar
+        cur.execute(SQL_CREATE_STAGE)
+        total = 0
+        while batch := list(islice(rows, STAGE_BATCH)):   # dosya akışla okunur
+            cur.executemany(SQL_INSERT_STAGE, batch)
+            total += len(batch)
+        cur.execute(SQL_MERGE_STAGE)                    # tek set-based MERGE
+        cur.execute(SQL_DROP_STAGE)
         conn.commit()
-        done = len(rows)
+        done = total
         conn.close()
     except Exception as exc:
         conn.rollback(); conn.close()
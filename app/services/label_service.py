@@ -27,6 +27,7 @@ LABEL_OUT_DIR (default: ./labels)
 from __future__ import annotations
 
 import os, sys, re, logging, argparse, datetime as dt
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -57,10 +58,15 @@ COMPANY_TEXT = "CAN OTOMOTIV"
 PAGE_SIZE    = (100*mm, 100*mm)
 OUT_DIR      = Path(os.getenv("LABEL_OUT_DIR", "labels"))
 OUT_DIR.mkdir(exist_ok=True)
+BARCODE_BAR_HEIGHT = 12*mm
+BARCODE_BAR_WIDTH  = 0.825
 FONT_PATH    = os.getenv("FONT_PATH", str(BASE_DIR/"fonts"/"DejaVuSans.ttf"))
 
 try:
-    pdfmetrics.registerFont(TTFont("DejaVu", FONT_PATH))
+    # Aynı süreçte başka modül (ör. backorder_picklist) "DejaVu"yu kaydettiyse
+    # TTF dosyası yeniden parse edilmez
+    if "DejaVu" not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont("DejaVu", FONT_PATH))
     FONT_NAME = "DejaVu"
 except Exception:
     logging.warning("DejaVuSans.ttf bulunamadı; Helvetica kullanılacak")
@@ -72,98 +78,122 @@ def parse_int(text: str, default:int=1) -> int:
     return int(m.group(1)) if m else default
 
 # ---------------------------------------------------------------------------
+# Fatura no sorguları modül yüklenirken bir kez biçimlenir (tablo adları sabit)
+# 1) CAN*/ARV* fatura (pri=1), yoksa SPECODE eşleşmesi (pri=2) – tek round trip
+_SQL_INVOICE_NO = f"""
+SELECT TOP 1 FICHENO FROM (
+    SELECT TOP 1 1 AS pri, I.FICHENO
+    FROM {dao._t('INVOICE')} I
+    JOIN {dao._t('STLINE')} S ON S.INVOICEREF = I.LOGICALREF
+    WHERE S.ORDFICHEREF IN (
+          SELECT LOGICALREF FROM {dao._t('ORFICHE')} WHERE FICHENO = ?)
+      AND I.CANCELLED = 0
+      AND (I.FICHENO LIKE 'CAN%' OR I.FICHENO LIKE 'ARV%')
+    UNION ALL
+    SELECT TOP 1 2 AS pri, FICHENO
+    FROM {dao._t('INVOICE')}
+    WHERE SPECODE = ? AND CANCELLED=0
+) q
+ORDER BY pri
+"""
+# 2) STLINE erişilemeyen şemalar için yalnız SPECODE
+_SQL_INVOICE_BY_SPECODE = f"""
+SELECT TOP 1 FICHENO
+FROM {dao._t('INVOICE')}
+WHERE SPECODE = ? AND CANCELLED=0
+"""
+# (sql, parametre sayısı) – öncelik sırasıyla
+_INVOICE_SQLS = ((_SQL_INVOICE_NO, 2), (_SQL_INVOICE_BY_SPECODE, 1))
+
 def fetch_invoice_no(order_no: str) -> Optional[str]:
-    """Fatura no al (CAN*/ARV* öncelikli)"""
-    sqls = [
-        f"""
-        SELECT TOP 1 I.FICHENO
-        FROM {dao._t('INVOICE')} I
-        JOIN {dao._t('STLINE')} S ON S.INVOICEREF = I.LOGICALREF
-        WHERE S.ORDFICHEREF IN (
-              SELECT LOGICALREF FROM {dao._t('ORFICHE')} WHERE FICHENO = ?)
-          AND I.CANCELLED = 0
-          AND (I.FICHENO LIKE 'CAN%' OR I.FICHENO LIKE 'ARV%')
-        """,
-        f"""
-        SELECT TOP 1 FICHENO
-        FROM {dao._t('INVOICE')}
-        WHERE SPECODE = ? AND CANCELLED=0
-        """,
-    ]
+    """Fatura no al (CAN*/ARV* öncelikli) – tek round trip"""
     with dao.get_conn() as cn:
-        for sql in sqls:
+        for sql, n_params in _INVOICE_SQLS:
             try:
-                row = cn.execute(sql, order_no).fetchone()
-                if row:
-                    return row[0]
+                row = cn.execute(sql, *([order_no] * n_params)).fetchone()
             except pyodbc.ProgrammingError:
                 continue
+            # Sorgu çalıştıysa iki öncelik de denenmiştir; sonuç kesin
+            return row[0] if row else None
     return None
 
 # ---------------------------------------------------------------------------
-def draw_page(c: canvas.Canvas, p: Dict[str, str]):
-    """Tek koli etiketi (100×100 mm) çizer"""
-    x = 6*mm
-    y = 93*mm
+def _layout(p: Dict[str, str]) -> Dict[str, float]:
+    """Etiketin dikey yerleşimi (yukarıdan aşağı); adres satırı sayısına bağlı"""
+    y = {"title": 93*mm}
+    y["region"]  = y["title"] - 6*mm
+    y["kod"]     = y["region"] - 10*mm                  # cari kodu
+    y["adi"]     = y["kod"] - 5*mm                      # cari adı
+    y["adres"]   = [y["adi"] - (k + 1)*4*mm for k in range(len(p["adres_lines"]))]
+    y["order"]   = (y["adres"][-1] if y["adres"] else y["adi"]) - 6*mm
+    y["bc"]      = y["order"] - 20*mm                   # barkod
+    y["bc_txt"]  = y["bc"] - 7*mm                       # barkod altı fatura no
+    y["date"]    = y["bc_txt"] - 6*mm
+    y["inv"]     = y["date"] - 8*mm
+    return y
+
+
+def draw_chrome(c: canvas.Canvas, p: Dict[str, str], y: Dict[str, float]):
+    """
+    Siparişin tüm kolilerinde aynı olan kısım: başlık, cari, adres,
+    sipariş no, tarih/transfer, footer. Metinler boyuta göre gruplu.
+    """
+    x, right, center = 6*mm, PAGE_SIZE[0] - 6*mm, PAGE_SIZE[0] / 2
 
-    # Başlık & bölge
+    # 14 pt: başlık
     c.setFont(FONT_NAME, 14)
-    c.drawString(x, y, COMPANY_TEXT)
+    c.drawString(x, y["title"], COMPANY_TEXT)
+
+    # 10 pt: bölge, cari adı, sipariş no
     c.setFont(FONT_NAME, 10)
-    c.drawRightString(PAGE_SIZE[0]-x, y, "GEREDE")
+    c.drawRightString(right, y["title"], "GEREDE")
+    c.drawString(x, y["adi"], p["cari_adi"])
+    c.drawString(x, y["order"], f"Sipariş No: {p['order_no']}")
 
-    y -= 6*mm
+    # 8 pt: bölge detayı, cari kodu, adres, footer
     c.setFont(FONT_NAME, 8)
-    c.drawRightString(PAGE_SIZE[0]-x, y, p["region"])
+    c.drawRightString(right, y["region"], p["region"])
+    c.drawString(x, y["kod"], p["cari_kodu"])
+    for y_line, line in zip(y["adres"], p["adres_lines"]):
+        c.drawString(x, y_line, line)
+    if p.get("footer"):                                 # ör: "EKSİK GÖNDERİLEN SEVKİYAT"
+        c.drawCentredString(center, 5*mm, p["footer"])
+
+    # 7 pt: sipariş tarihi & transfer
+    c.setFont(FONT_NAME, 7)
+    c.drawString(x, y["date"], f"Sipariş Tarihi: {p['sip_tarih']}")
+    if p.get("transfer"):
+        c.drawRightString(right, y["date"], f"Transfer: {p['transfer']}")
 
-    # Cari kodu & adı
-    y -= 10*mm
-    c.setFont(FONT_NAME, 8)
-    c.drawString(x, y, p["cari_kodu"])
-    y -= 5*mm
-    c.setFont(FONT_NAME, 10)
-    c.drawString(x, y, p["cari_adi"])
 
-    # Adres
-    c.setFont(FONT_NAME, 8)
-    for line in p["adres_lines"]:
-        y -= 4*mm
-        c.drawString(x, y, line)
+def draw_page(c: canvas.Canvas, p: Dict[str, str], chrome: Optional[str] = None):
+    """
+    Tek koli etiketi (100×100 mm) çizer.
+    chrome: make_labels'ın bir kez çizdiği Form XObject adı; verilirse sabit
+    kısım doForm ile tekrar kullanılır, yalnızca koliye özgü alanlar çizilir.
+    """
+    y = _layout(p)
+    right, center = PAGE_SIZE[0] - 6*mm, PAGE_SIZE[0] / 2
 
-    # Sipariş No & Koli
-    y -= 6*mm
-    c.setFont(FONT_NAME, 10)
-    c.drawString(x, y, f"Sipariş No: {p['order_no']}")
-    c.drawRightString(PAGE_SIZE[0]-x, y, f"Koli: {p['pkg_no']}/{p['pkg_tot']}")
+    if chrome:
+        c.doForm(chrome)
+    else:
+        draw_chrome(c, p, y)
 
-    # Barkod
-    y -= 20*mm
-    bc = code128.Code128(p["barkod"], barHeight=12*mm, barWidth=0.825)
-    bc_x = (PAGE_SIZE[0] - bc.width) / 2
-    bc.drawOn(c, bc_x, y)
+    # Koli no
+    c.setFont(FONT_NAME, 10)
+    c.drawRightString(right, y["order"], f"Koli: {p['pkg_no']}/{p['pkg_tot']}")
 
-    # Barkod altı fatura no
-    y -= 7*mm
+    # Barkod (değer her kolide farklı: FaturaNo-K1, -K2 …) ve altındaki metin
+    bc = code128.Code128(p["barkod"], barHeight=BARCODE_BAR_HEIGHT, barWidth=BARCODE_BAR_WIDTH)
+    bc.drawOn(c, (PAGE_SIZE[0] - bc.width) / 2, y["bc"])
     c.setFont(FONT_NAME, 8)
-    c.drawCentredString(PAGE_SIZE[0]/2, y, p["barkod"])
-
-    # Sipariş tarihi & transfer
-    y -= 6*mm
-    c.setFont(FONT_NAME, 7)
-    c.drawString(x, y, f"Sipariş Tarihi: {p['sip_tarih']}")
-    if p.get("transfer"):
-        c.drawRightString(PAGE_SIZE[0]-x, y, f"Transfer: {p['transfer']}")
+    c.drawCentredString(center, y["bc_txt"], p["barkod"])
 
     # İlk sayfa için fatura hatırlatma metni
     if p.get("inv_line"):
-        y -= 8*mm
         c.setFont(FONT_NAME, 9)
-        c.drawCentredString(PAGE_SIZE[0]/2, y, p["inv_line"])
-
-    # Footer (ör: "EKSİK GÖNDERİLEN SEVKİYAT")
-    if p.get("footer"):
-        c.setFont(FONT_NAME, 8)
-        c.drawCentredString(PAGE_SIZE[0]/2, 5*mm, p["footer"])
+        c.drawCentredString(center, y["inv"], p["inv_line"])
 
     c.showPage()
 
@@ -174,12 +204,17 @@ def make_labels(order_no: str, *, force: bool = False, footer: str = ""):
     • Her paket için barkod  →  FaturaNo-K1 , FaturaNo-K2 …
     • force=True  → fatura yoksa da sipariş no kullanılır.
     """
-    hdr = dao.fetch_order_header(order_no)
+    # Başlık ve fatura no birbirinden bağımsız iki round trip → paralel
+    # (her biri kendi bağlantısını açar)
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        fut_inv = ex.submit(fetch_invoice_no, order_no)
+        hdr = dao.fetch_order_header(order_no)
+        invoice_no = fut_inv.result()
+
     if not hdr:
         logging.error("Sipariş bulunamadı: %s", order_no)
         sys.exit(1)
 
-    invoice_no = fetch_invoice_no(order_no)
     if not invoice_no and not force:
         logging.warning("Fatura yok – basılmadı")
         sys.exit(1)
@@ -205,24 +240,32 @@ def make_labels(order_no: str, *, force: bool = False, footer: str = ""):
     if user_info:
         combined_footer = f"{footer} | {user_info}" if footer else user_info
 
-    for i in range(1, pkg_tot + 1):
-        barkod = f"{barkod_root}-K{i}"             # ← 🔸 YENİ: paket no ekle
+    # Tüm kolilerde aynı olan alanlar
+    static = {
+        "order_no":   order_no,
+        "pkg_tot":    pkg_tot,
+        "cari_kodu":  hdr.get("cari_kodu", ""),
+        "cari_adi":   hdr.get("cari_adi", "")[:30],
+        "adres_lines": adres_lines,
+        "region":     f"{hdr.get('genexp2','')} - {hdr.get('genexp3','')}".strip(" -"),
+        "sip_tarih":  dt.datetime.now().strftime("%d-%m-%Y"),
+        "transfer":   hdr.get("genexp1", "").strip(";"),
+        "footer":     combined_footer,
+    }
+
+    # Sabit kısım bir kez Form XObject olarak çizilir, her sayfada doForm
+    c.beginForm("chrome")
+    draw_chrome(c, static, _layout(static))
+    c.endForm()
 
+    for i in range(1, pkg_tot + 1):
         payload = {
-            "order_no":   order_no,
+            **static,
             "pkg_no":     i,
-            "pkg_tot":    pkg_tot,
-            "barkod":     barkod,                  # ← güncel barkod
-            "cari_kodu":  hdr.get("cari_kodu", ""),
-            "cari_adi":   hdr.get("cari_adi", "")[:30],
-            "adres_lines": adres_lines,
-            "region":     f"{hdr.get('genexp2','')} - {hdr.get('genexp3','')}".strip(" -"),
-            "sip_tarih":  dt.datetime.now().strftime("%d-%m-%Y"),
-            "transfer":   hdr.get("genexp1", "").strip(";"),
+            "barkod":     f"{barkod_root}-K{i}",   # ← paket no ekli barkod
             "inv_line":   "FATURA BU PAKETİN İÇİNDEDİR" if i == 1 else "",
-            "footer":     combined_footer,
         }
-        draw_page(c, payload)
+        draw_page(c, payload, chrome="chrome")
 
     c.save()
     
@@ -3,12 +3,16 @@
 #  Kalıcı ayar yönetimi (JSON)  –  app/settings.py
 # ──────────────────────────────────────────────────────────────
 from __future__ import annotations
-import json
+import atexit
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+from app.core.jsonio import json_dumps, json_loads
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 CFG_PATH = BASE_DIR / "settings.json"
+SAVE_DEBOUNCE_SECS = 0.5     # art arda set() çağrıları tek yazmada birleşir
 
 # ───────────── Varsayılanlar ─────────────
 DEFAULTS: Dict[str, Any] = {
@@ -53,15 +57,25 @@ DEFAULTS: Dict[str, Any] = {
 
 # ───────────── Yardımcılar ─────────────
 _cfg: Dict[str, Any] = {}
+_pending: Optional[threading.Timer] = None    # zamanlanmış (debounce) kayıt
+_lock = threading.RLock()                     # _cfg değişikliği ↔ diske yazma
 
 
 def _deep_update(dst: Dict, src: Dict) -> None:
-    """src içeriğini dst’ye (recursive) ekle / güncelle."""
-    for k, v in src.items():
-        if isinstance(v, dict) and isinstance(dst.get(k, {}), dict):
-            _deep_update(dst.setdefault(k, {}), v)
-        else:
-            dst[k] = v
+    """src içeriğini dst’ye (iç içe sözlükler dahil) ekle / güncelle."""
+    stack = [(dst, src)]
+    while stack:
+        d, s = stack.pop()
+        for k, v in s.items():
+            if isinstance(v, dict):
+                cur = d.get(k)
+                if cur is None and k not in d:
+                    # kopya: src'nin (ör. DEFAULTS) alt sözlüğü paylaşılmasın
+                    cur = d[k] = {}
+                if isinstance(cur, dict):
+                    stack.append((cur, v))
+                    continue
+            d[k] = v
 
 
 def _load_disk() -> Dict[str, Any]:
@@ -69,8 +83,7 @@ def _load_disk() -> Dict[str, Any]:
     if not CFG_PATH.exists():
         return {}
     try:
-        with CFG_PATH.open(encoding="utf-8") as f:
-            return json.load(f)
+        return json_loads(CFG_PATH.read_bytes())
     except Exception as exc:
         # bozuk dosyayı .bak yap, defaults’a dön
         try:
@@ -88,6 +101,7 @@ def reload() -> Dict[str, Any]:
     **tamamen** disk’teki hali kullanılır.
     """
     global _cfg
+    flush()                             # bekleyen değişiklik kaybolmasın
     _cfg = {}
     _deep_update(_cfg, DEFAULTS)        # 1) varsayılanlar
 
@@ -109,12 +123,35 @@ load = reload
 def save() -> None:
     """Bellekteki ayarları diske yazar (pretty JSON)."""
     try:
-        with CFG_PATH.open("w", encoding="utf-8") as f:
-            json.dump(_cfg, f, ensure_ascii=False, indent=2)
+        with _lock:
+            data = json_dumps(_cfg)
+        CFG_PATH.write_bytes(data)
     except Exception as exc:
         print(f"[settings] Kaydetme hatası: {exc}")
 
 
+def flush() -> None:
+    """Zamanlanmış kayıt varsa beklemeden diske yazar."""
+    global _pending
+    with _lock:
+        if _pending is None:
+            return
+        _pending.cancel()
+        _pending = None
+        save()
+
+
+def _schedule_save() -> None:
+    """Kaydı SAVE_DEBOUNCE_SECS sonra yap; yeni set() süreyi baştan başlatır."""
+    global _pending
+    with _lock:
+        if _pending is not None:
+            _pending.cancel()
+        _pending = threading.Timer(SAVE_DEBOUNCE_SECS, flush)
+        _pending.daemon = True
+        _pending.start()
+
+
 def get(path: str, default: Any = None) -> Any:
     """'ui.theme' gibi noktalı yolu okuyup değeri döndürür."""
     cur = _cfg
@@ -127,16 +164,18 @@ def get(path: str, default: Any = None) -> Any:
 
 
 def set(path: str, value: Any) -> None:
-    """'db.retry', 5 → değeri güncelle & otomatik kaydet."""
+    """'db.retry', 5 → değeri güncelle & kısa gecikmeyle otomatik kaydet."""
     parts = path.split(".")
-    cur = _cfg
-    for p in parts[:-1]:
-        cur = cur.setdefault(p, {})
-    cur[parts[-1]] = value
-    save()
+    with _lock:
+        cur = _cfg
+        for p in parts[:-1]:
+            cur = cur.setdefault(p, {})
+        cur[parts[-1]] = value
+        _schedule_save()
 
 # ───────────── İlk yükleme ─────────────
 reload()
+atexit.register(flush)                  # çıkışta bekleyen kaydı yaz
 
 
 # — Basit CLI testi —
@@ -144,4 +183,5 @@ if __name__ == "__main__":
     from pprint import pprint
     print("Tema:", get("ui.theme"))
     set("ui.theme", "dark")
+    flush()
     pprint(_cfg)
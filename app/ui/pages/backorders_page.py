@@ -3,7 +3,7 @@
 Tablo:
     * ID, Sipariş No, Stok Kodu, Eksik Adet, Ambar, Kayıt Tarihi
 İşlevler:
-    * Yenile ↻  – list_pending()
+    * Yenile ↻  – list_pending_all()
     * Seçiliyi Tamamla ✓ – mark_fulfilled(id)  ➜ UI & DB güncellenir
 """
 from __future__ import annotations
@@ -14,7 +14,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 
-from app.backorder import list_pending, mark_fulfilled
+from app.backorder import list_pending_all, mark_fulfilled
 
 
 class BackordersPage(QWidget):
@@ -56,7 +56,7 @@ class BackordersPage(QWidget):
     def refresh(self):
         """DB'den bekleyenleri çek ve tabloyu güncelle."""
         try:
-            recs = list_pending()
+            recs = list_pending_all()
         except Exception as exc:
             QMessageBox.critical(self, "DB Hatası", str(exc))
             return
@@ -66,7 +66,7 @@ class BackordersPage(QWidget):
         for r, rec in enumerate(recs):
             self.tbl.insertRow(r)
             for c, key in enumerate(["id", "order_no", "item_code", "qty_missing", "warehouse_id", "created_at"]):
-                self.tbl.setItem(r, c, QTableWidgetItem(str(rec[key])))
+                self.tbl.setItem(r, c, QTableWidgetItem(str(getattr(rec, key))))
 
     # ------------------------------------------------------------------
     def complete_selected(self):
@@ -79,11 +79,11 @@ class BackordersPage(QWidget):
         for row in rows:
             rec = self.records_cache[row]
             try:
-                mark_fulfilled(rec["id"])
+                mark_fulfilled(rec.id)
                 ok += 1
             except Exception as exc:
                 fail += 1
-                QMessageBox.warning(self, "Hata", f"{rec['item_code']} : {exc}")
+                QMessageBox.warning(self, "Hata", f"{rec.item_code} : {exc}")
         self.refresh()
         QMessageBox.information(
             self, "Tamamlandı", f"{ok} kayıt kapatıldı. {(''+str(fail)+' hata.') if fail else ''}")
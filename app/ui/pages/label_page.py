@@ -6,9 +6,10 @@ LabelPage – Back‑order etiket basma ekranı (sipariş bazlı)
 * Çift‑tık **veya** sağ‑tık ▸ Detayları Göster  → eksik satır listesini ve PDF Bas/Kapat düğmelerini açar
 * Ana ekranda toplu seçim yapıp “Etiket Bas” ile birden fazla sipariş etiketi oluşturulabilir
 """
+from contextlib import closing
 from pathlib import Path
 from datetime import date
-from typing import Dict, List
+from typing import Any, Dict, List
 
 from PyQt5.QtCore import Qt, QDate, QPoint
 from PyQt5.QtWidgets import (
@@ -32,7 +33,7 @@ class LabelPage(QWidget):
     def __init__(self):
         super().__init__()
         self._group: Dict[str, Dict] = {}
-        self._details: Dict[str, List[Dict]] = {}
+        self._details: Dict[str, List[Any]] = {}
         self._build_ui()
 
     # ---------------- UI -----------------
@@ -66,16 +67,16 @@ class LabelPage(QWidget):
     # ----------- listele ---------------
     def refresh(self):
         on_date = self.dt.date().toPyDate().isoformat()
-        rows = list_fulfilled(on_date)
-
         grouped: Dict[str, Dict] = {}
-        details: Dict[str, List[Dict]] = {}
-        for r in rows:
-            g = grouped.setdefault(r["order_no"], {"satir": 0, "eksik": 0, "first": r["fulfilled_at"]})
-            g["satir"] += 1
-            g["eksik"] += r["qty_missing"]
-            g["first"] = min(g["first"], r["fulfilled_at"])
-            details.setdefault(r["order_no"], []).append(r)
+        details: Dict[str, List[Any]] = {}
+        # closing → hata olsa da cursor kapanır, bağlantı havuza hemen döner
+        with closing(list_fulfilled(on_date)) as rows:
+            for r in rows:
+                g = grouped.setdefault(r.order_no, {"satir": 0, "eksik": 0, "first": r.fulfilled_at})
+                g["satir"] += 1
+                g["eksik"] += r.qty_missing
+                g["first"] = min(g["first"], r.fulfilled_at)
+                details.setdefault(r.order_no, []).append(r)
 
         self._group = grouped
         self._details = details
@@ -119,7 +120,7 @@ class LabelPage(QWidget):
         tbl = QTableWidget(len(lines), 5)
         tbl.setHorizontalHeaderLabels(["Stok", "Eksik", "Ambar", "Tamamlama", "Back‑ID"])
         for r, ln in enumerate(lines):
-            vals = [ln["item_code"], ln["qty_missing"], ln["warehouse_id"], str(ln["fulfilled_at"])[:19], ln["id"]]
+            vals = [ln.item_code, ln.qty_missing, ln.warehouse_id, str(ln.fulfilled_at)[:19], ln.id]
             for c, v in enumerate(vals):
                 it = QTableWidgetItem(str(v)); it.setTextAlignment(Qt.AlignCenter)
                 tbl.setItem(r, c, it)
@@ -13,7 +13,7 @@ BASE_DIR = Path(__file__).resolve().parents[3]
 if str(BASE_DIR) not in sys.path:
     sys.path.append(str(BASE_DIR))
 
-from app.backorder import list_fulfilled   # DAO
+from app.backorder import list_fulfilled_all, row_to_dict   # DAO
 
 class ReportPage(QWidget):
     def __init__(self):
@@ -40,13 +40,13 @@ class ReportPage(QWidget):
     # --------------------------- Veri --------------------------
     def refresh(self):
         sel_date = self.dt.date().toPyDate()
-        recs = list_fulfilled(sel_date.isoformat())
-        self._df = pd.DataFrame(recs)
+        recs = list_fulfilled_all(sel_date.isoformat())
+        self._df = pd.DataFrame([row_to_dict(r) for r in recs])
         self.tbl.setRowCount(0)
         for r in recs:
             row = self.tbl.rowCount(); self.tbl.insertRow(row)
             for col, key in enumerate(["order_no","item_code","qty_missing","warehouse_id","fulfilled","fulfilled_at"]):
-                it = QTableWidgetItem(str(r[key]))
+                it = QTableWidgetItem(str(getattr(r, key)))
                 it.setTextAlignment(Qt.AlignCenter)
                 self.tbl.setItem(row, col, it)
 
@@ -9,7 +9,6 @@ from __future__ import annotations
 
 import getpass
 import logging
-from datetime import date
 from decimal import Decimal
 from pathlib import Path
 from typing import Dict, List
@@ -372,19 +371,16 @@ class ScannerPage(QWidget):
         # Siparişi tamamla (order_id kullan!)
         update_order_status(self._current_order_id, 4)  # STATUS = 4 (Tamamlandı)
         
-        # Sevkiyat kayıtları
-        for line in self._order_lines:
-            scanned = line.get("qty_scanned", 0)
-            if scanned > 0:
-                # Shipment record
-                bo.add_shipment(
-                    self._current_order,
-                    str(date.today()),
-                    line["item_code"],
-                    line.get("warehouse_id", 0),
-                    line["qty_ordered"],
-                    scanned
-                )
+        # Sevkiyat kayıtları – tüm satırlar tek MERGE
+        bo.add_shipments(
+            (self._current_order,
+             line["item_code"],
+             line.get("warehouse_id", 0),
+             line["qty_ordered"],
+             line["qty_scanned"])
+            for line in self._order_lines
+            if line.get("qty_scanned", 0) > 0
+        )
         
         # Kuyruktan temizle (order_id kullan!)
         queue_delete(self._current_order_id)
@@ -2,7 +2,7 @@
 SettingsPage – Uygulama ayarları paneli
 ---------------------------------------
 • app.settings üzerinden JSON okur / yazar.
-• Kaydet → settings.save() + settings_saved sinyali.
+• Kaydet → settings.set() … + settings.flush() + settings_saved sinyali.
 • Vazgeç → JSON’daki son duruma geri döner.
 """
 from __future__ import annotations
@@ -254,6 +254,7 @@ class SettingsPage(QWidget):
         st.set("paths.export_dir", self.lbl_export_dir.text())
         st.set("paths.log_dir",    self.lbl_log_dir.text())
 
+        st.flush()                      # toplu set() → tek yazma, hemen diske
         self.settings_saved.emit()
         QMessageBox.information(self, "Ayarlar", "Kaydedildi ✓")
             # ----------------------------------------------------------------
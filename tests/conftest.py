@@ -8,6 +8,10 @@ from unittest.mock import Mock, patch
 from pathlib import Path
 import tempfile
 
+# Dosya tabanlı kullanıcı deposu bellekte kalsın (auth import'undan önce);
+# yoksa test koşusu çalışma dizinine users.db* bırakır
+os.environ.setdefault("WMS_SKIP_DEFAULT_USER_PERSIST", "1")
+
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_environment():
@@ -70,9 +70,12 @@ class TestBackorderIntegration:
     def test_complete_backorder_workflow(self, mock_db_connection, sample_order_data):
         """Tam backorder iş akışı testi"""
         mock_cursor = Mock()
-        mock_cursor.fetchall.return_value = [
-            (1, "TEST001", 1, 0, "ITEM001", 5.0, None, 0, "2025-01-01", None)
-        ]
+        # pyodbc.Row gibi: kolonlara attribute ile erişilir
+        row = Mock(id=1, order_no="TEST001", line_id=1, warehouse_id=0,
+                   item_code="ITEM001", qty_missing=5.0, eta_date=None,
+                   fulfilled=0, created_at="2025-01-01", fulfilled_at=None)
+        # list_* fetchmany ile parça parça okur; boş parça = son
+        mock_cursor.fetchmany.side_effect = [[row], [], [row], []]
         mock_cursor.description = [
             ["id"], ["order_no"], ["line_id"], ["warehouse_id"], 
             ["item_code"], ["qty_missing"], ["eta_date"], 
@@ -81,15 +84,15 @@ class TestBackorderIntegration:
         mock_db_connection.execute.return_value = mock_cursor
         
         # 1. Pending backorders listele
-        pending = bo.list_pending()
+        pending = bo.list_pending_all()
         assert isinstance(pending, list)
         
         # 2. Backorder'ı fulfilled yap
         if pending:
-            bo.mark_fulfilled(pending[0]["id"])
+            bo.mark_fulfilled(pending[0].id)
         
         # 3. Fulfilled backorders listele
-        fulfilled = bo.list_fulfilled()
+        fulfilled = bo.list_fulfilled_all()
         assert isinstance(fulfilled, list)
 
 
@@ -99,13 +102,13 @@ class TestBackorderErrorHandling:
     @pytest.mark.integration
     def test_database_error_handling(self):
         """Veritabanı hata yönetimi testi"""
-        with patch('app.backorder.get_conn') as mock_get_conn:
+        with patch('app.backorder.get_conn_pooled') as mock_get_conn:
             # Database hatası simüle et
             mock_get_conn.side_effect = Exception("Database connection failed")
             
             # Hata fırlatılmalı
             with pytest.raises(Exception):
-                bo.list_pending()
+                bo.list_pending_all()
     
     @pytest.mark.integration
     def test_invalid_data_handling(self, mock_db_connection):
@@ -9,6 +9,7 @@ from pathlib import Path
 from unittest.mock import patch, mock_open
 
 from app.core.auth import User, UserManager, SessionManager
+from app.core.exceptions import InvalidUserException, ValidationException
 
 
 class TestUser:
@@ -136,6 +137,31 @@ class TestUserManager:
         finally:
             Path(temp_path).unlink(missing_ok=True)
     
+    @pytest.mark.unit
+    def test_change_password_and_authenticate(self):
+        """Şifre atanan kullanıcı yalnızca doğru şifreyle girebilmeli"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            temp_path = f.name
+        
+        try:
+            manager = UserManager(temp_path)
+            assert manager.change_password('operator', 's3cret') is True
+            
+            stored = manager.get_user('operator')
+            assert stored.password_hash and stored.password_salt
+            assert 's3cret' not in stored.password_hash
+            assert 'password_hash' not in stored.to_dict()
+            
+            assert manager.authenticate('operator', 's3cret').username == 'operator'
+            with pytest.raises(InvalidUserException):
+                manager.authenticate('operator', 'wrong')
+            with pytest.raises(InvalidUserException):
+                manager.authenticate('operator')
+            
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+            Path(temp_path).with_suffix('.db').unlink(missing_ok=True)
+    
     @pytest.mark.unit
     def test_authenticate_invalid_user(self):
         """Geçersiz kullanıcı doğrulama testi"""
@@ -185,6 +211,54 @@ class TestUserManager:
         finally:
             Path(temp_path).unlink(missing_ok=True)
     
+    @pytest.mark.unit
+    def test_add_user_ids_and_duplicate(self):
+        """Yeni kullanıcı id'si artar, aynı kullanıcı adı reddedilir"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            temp_path = f.name
+        
+        try:
+            manager = UserManager(temp_path)
+            max_id = max(u.user_id for u in manager.users.values())
+            
+            base = {'full_name': 'X', 'email': 'x@example.com',
+                    'role': 'scanner', 'warehouse_id': 0}
+            first = manager.add_user({**base, 'username': 'u1'})
+            second = manager.add_user({**base, 'username': 'u2'})
+            assert first.user_id == max_id + 1
+            assert second.user_id == max_id + 2
+            
+            with pytest.raises(ValidationException):
+                manager.add_user({**base, 'username': 'u1'})
+            
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+            Path(temp_path).with_suffix('.db').unlink(missing_ok=True)
+    
+    @pytest.mark.unit
+    def test_failed_migration_rolls_back(self):
+        """users.json taşıması yarıda kalırsa yarım kayıt kalmaz, varsayılanlar kurulur"""
+        base = {'full_name': 'X', 'email': 'x@example.com', 'role': 'scanner',
+                'warehouse_id': 0, 'is_active': True,
+                'created_at': '2025-01-01T00:00:00'}
+        users = {   # aynı user_id → ikinci satırda IntegrityError
+            'legacy1': {**base, 'user_id': 7, 'username': 'legacy1'},
+            'legacy2': {**base, 'user_id': 7, 'username': 'legacy2'},
+        }
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(users, f)
+            temp_path = f.name
+        
+        try:
+            manager = UserManager(temp_path)
+            
+            assert manager.get_user('legacy1') is None
+            assert {'admin', 'operator', 'scanner'} <= set(manager.users)
+            
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+            Path(temp_path).with_suffix('.db').unlink(missing_ok=True)
+    
     @pytest.mark.unit
     def test_update_user(self):
         """Kullanıcı güncelleme testi"""
@@ -0,0 +1,135 @@
+"""
+Unit tests for backorder DAO (TVP MERGE yolları)
+================================================
+"""
+import os
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+# Import anında arka planda şema DDL'i başlatılmasın (gerçek DB yok)
+os.environ.setdefault("WMS_SKIP_SCHEMA_INIT", "1")
+
+import app.backorder as bo
+
+
+@pytest.fixture
+def pooled_conn():
+    """get_conn_pooled yerine mock bağlantı; create_tables devre dışı"""
+    with patch.object(bo, "get_conn_pooled") as pooled, \
+         patch.object(bo, "create_tables"):
+        yield pooled.return_value.__enter__.return_value
+
+
+class TestCoalesceBackorders:
+    """_coalesce_backorders testleri"""
+    
+    @pytest.mark.unit
+    def test_same_key_sums_qty_and_keeps_first_row(self):
+        """Aynı (order_no, item_code) satırları tek satırda toplanmalı"""
+        rows = [
+            ("S1", 1, 0, "ITEM1", 2.0, None),
+            ("S1", 5, 3, "ITEM1", 3.5, None),
+        ]
+        
+        result = bo._coalesce_backorders(rows)
+        
+        assert result == [("S1", 1, 0, "ITEM1", 5.5, None)]
+    
+    @pytest.mark.unit
+    def test_distinct_keys_keep_input_order(self):
+        """Farklı anahtarlar ayrı kalmalı, giriş sırası korunmalı"""
+        rows = [
+            ("S2", 1, 0, "B", 1.0, None),
+            ("S1", 2, 0, "A", 1.0, None),
+            ("S2", 3, 0, "A", 1.0, None),
+        ]
+        
+        result = bo._coalesce_backorders(rows)
+        
+        assert [(r[0], r[3]) for r in result] == [("S2", "B"), ("S1", "A"), ("S2", "A")]
+    
+    @pytest.mark.unit
+    def test_iso_eta_date_is_parsed(self):
+        """Metin eta_date, TVP'nin DATE kolonu için date'e çevrilmeli"""
+        result = bo._coalesce_backorders([("S1", 1, 0, "A", 1.0, "2025-03-04")])
+        
+        assert result[0][5] == date(2025, 3, 4)
+    
+    @pytest.mark.unit
+    def test_empty_input(self):
+        """Boş giriş boş liste döndürmeli"""
+        assert bo._coalesce_backorders([]) == []
+
+
+class TestInsertBackordersBulk:
+    """insert_backorders_bulk testleri"""
+    
+    @pytest.mark.unit
+    def test_single_merge_with_tvp(self, pooled_conn):
+        """Tüm satırlar tek MERGE çağrısında TVP olarak gitmeli"""
+        rows = [
+            ("S1", 1, 0, "A", 1.0, None),
+            ("S1", 2, 0, "A", 2.0, None),
+            ("S1", 3, 0, "B", 4.0, None),
+        ]
+        
+        count = bo.insert_backorders_bulk(rows)
+        
+        assert count == 2
+        pooled_conn.execute.assert_called_once()
+        sql, tvp = pooled_conn.execute.call_args.args
+        assert sql == bo._SQL_MERGE_BO
+        assert tvp[:2] == ["BackorderTVP", bo.SCHEMA]
+        assert tvp[2:] == [("S1", 1, 0, "A", 3.0, None), ("S1", 3, 0, "B", 4.0, None)]
+    
+    @pytest.mark.unit
+    def test_empty_rows_skip_database(self, pooled_conn):
+        """Satır yoksa bağlantı açılmamalı"""
+        assert bo.insert_backorders_bulk([]) == 0
+        pooled_conn.execute.assert_not_called()
+    
+    @pytest.mark.unit
+    def test_insert_backorder_delegates_to_bulk(self):
+        """Tek satırlık kısayol bulk yolunu kullanmalı"""
+        with patch.object(bo, "insert_backorders_bulk") as bulk:
+            bo.insert_backorder("S1", 1, 0, "A", 2.0, "2025-01-01")
+        
+        bulk.assert_called_once_with([("S1", 1, 0, "A", 2.0, "2025-01-01")])
+
+
+class TestAddShipments:
+    """add_shipments / add_shipment testleri"""
+    
+    @pytest.mark.unit
+    def test_deltas_coalesced_into_single_merge(self, pooled_conn):
+        """Aynı anahtarın qty_delta'ları toplanıp tek MERGE ile gitmeli"""
+        rows = [
+            ("S1", "A", 0, 10.0, 2.0),
+            ("S1", "B", 0, 5.0, 1.0),
+            ("S1", "A", 0, 10.0, 3.0),
+        ]
+        
+        count = bo.add_shipments(rows)
+        
+        assert count == 2
+        pooled_conn.execute.assert_called_once()
+        sql, tvp = pooled_conn.execute.call_args.args
+        assert sql == bo._SQL_MERGE_SHIP
+        assert tvp[:2] == ["ShipmentLineTVP", bo.SCHEMA]
+        assert list(tvp[2:]) == [("S1", "A", 0, 10.0, 5.0), ("S1", "B", 0, 5.0, 1.0)]
+    
+    @pytest.mark.unit
+    def test_empty_rows_skip_database(self, pooled_conn):
+        """Satır yoksa bağlantı açılmamalı"""
+        assert bo.add_shipments([]) == 0
+        pooled_conn.execute.assert_not_called()
+    
+    @pytest.mark.unit
+    def test_add_shipment_delegates(self):
+        """Tek satırlık kısayol trip_date'i atlayıp add_shipments'a gitmeli"""
+        with patch.object(bo, "add_shipments") as ship:
+            bo.add_shipment("S1", "2025-01-01", "A", 0, 10.0, 2.0)
+        
+        ship.assert_called_once_with([("S1", "A", 0, 10.0, 2.0)])
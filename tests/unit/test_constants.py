@@ -2,10 +2,12 @@
 Unit tests for constants module
 ===============================
 """
+from collections.abc import Mapping
+
 import pytest
 from app.constants import (
     MAX_RETRY, RETRY_WAIT, DEFAULT_COMPANY_NR, DEFAULT_PERIOD_NR,
-    WAREHOUSE_PREFIXES, SOUND_FILES, PDF_COLUMN_WIDTHS_MM,
+    WAREHOUSE_PREFIXES, WAREHOUSE_PREFIXES_MAP, SOUND_FILES, PDF_COLUMN_WIDTHS_MM,
     DARK_THEME_CSS, QUEUE_TABLE, DEFAULT_SIDEBAR_WIDTH
 )
 
@@ -49,10 +51,10 @@ class TestWarehouseConstants:
     @pytest.mark.unit
     def test_warehouse_prefixes_structure(self):
         """WAREHOUSE_PREFIXES yapısı doğru olmalı"""
-        assert isinstance(WAREHOUSE_PREFIXES, dict)
+        assert isinstance(WAREHOUSE_PREFIXES, tuple)
         assert len(WAREHOUSE_PREFIXES) > 0
         
-        for warehouse_id, prefix in WAREHOUSE_PREFIXES.items():
+        for warehouse_id, prefix in WAREHOUSE_PREFIXES_MAP.items():
             assert isinstance(warehouse_id, int)
             assert isinstance(prefix, str)
             assert prefix.endswith("-")
@@ -61,7 +63,7 @@ class TestWarehouseConstants:
     @pytest.mark.unit
     def test_warehouse_prefixes_unique(self):
         """Depo prefix'leri benzersiz olmalı"""
-        prefixes = list(WAREHOUSE_PREFIXES.values())
+        prefixes = list(WAREHOUSE_PREFIXES)
         assert len(prefixes) == len(set(prefixes))
 
 
@@ -71,7 +73,7 @@ class TestSoundConstants:
     @pytest.mark.unit
     def test_sound_files_structure(self):
         """SOUND_FILES yapısı doğru olmalı"""
-        assert isinstance(SOUND_FILES, dict)
+        assert isinstance(SOUND_FILES, Mapping)
         
         required_sounds = ["success", "duplicate", "error"]
         for sound_type in required_sounds:
@@ -105,7 +107,7 @@ class TestPDFConstants:
     @pytest.mark.unit
     def test_pdf_column_widths(self):
         """PDF kolon genişlikleri doğru olmalı"""
-        assert isinstance(PDF_COLUMN_WIDTHS_MM, list)
+        assert isinstance(PDF_COLUMN_WIDTHS_MM, tuple)
         assert len(PDF_COLUMN_WIDTHS_MM) > 0
         
         for width in PDF_COLUMN_WIDTHS_MM:
@@ -2,12 +2,15 @@
 Unit tests for DAO layer
 ========================
 """
+import queue
+
 import pytest
 from unittest.mock import patch, Mock
 import pyodbc
 
+import app.dao.logo as logo
 from app.dao.logo import (
-    _t, fetch_one, exec_sql, lookup_barcode,
+    _t, fetch_one, exec_sql, lookup_barcode, get_conn_pooled,
     MAX_RETRY, RETRY_WAIT
 )
 from app.constants import DEFAULT_COMPANY_NR, DEFAULT_PERIOD_NR
@@ -125,6 +128,75 @@ class TestBarcodeOperations:
         assert result is None
 
 
+class TestConnectionPool:
+    """get_conn_pooled havuz testleri"""
+    
+    @pytest.fixture
+    def pool(self):
+        """Her test için boş havuz ve sahte _connect"""
+        with patch.object(logo, "_pool", queue.LifoQueue(maxsize=2)) as q, \
+             patch.object(logo, "_connect") as connect:
+            connect.side_effect = lambda autocommit: Mock(autocommit=autocommit)
+            yield q, connect
+    
+    @pytest.mark.unit
+    def test_connection_is_reused(self, pool):
+        """Havuza dönen bağlantı bir sonraki çağrıda yeniden kullanılmalı"""
+        q, connect = pool
+        
+        with get_conn_pooled() as first:
+            pass
+        with get_conn_pooled() as second:
+            pass
+        
+        assert first is second
+        assert connect.call_count == 1
+        first.rollback.assert_called()
+        assert q.qsize() == 1
+    
+    @pytest.mark.unit
+    def test_failed_connection_not_returned(self, pool):
+        """pyodbc hatası alan bağlantı kapatılıp havuza konmamalı"""
+        q, _ = pool
+        
+        with pytest.raises(pyodbc.Error):
+            with get_conn_pooled() as conn:
+                raise pyodbc.Error("bağlantı koptu")
+        
+        conn.close.assert_called_once()
+        assert q.qsize() == 0
+    
+    @pytest.mark.unit
+    def test_stale_connection_replaced(self, pool):
+        """Uzun süre boşta kalıp yoklamada düşen bağlantı yenisiyle değişmeli"""
+        q, connect = pool
+        stale = Mock(autocommit=False)
+        stale.execute.side_effect = pyodbc.Error("08S01")
+        q.put_nowait((stale, 0.0))  # idle_since çok eski → yoklanır
+        
+        with get_conn_pooled() as conn:
+            pass
+        
+        assert conn is not stale
+        stale.close.assert_called_once()
+        assert connect.call_count == 1
+    
+    @pytest.mark.unit
+    def test_recent_connection_not_pinged(self, pool):
+        """Yakın zamanda dönen bağlantı yoklanmadan verilmeli"""
+        q, connect = pool
+        fresh = Mock(autocommit=False)
+        q.put_nowait((fresh, logo.time.monotonic()))
+        
+        with get_conn_pooled(autocommit=True) as conn:
+            pass
+        
+        assert conn is fresh
+        assert fresh.autocommit is True
+        fresh.execute.assert_not_called()
+        connect.assert_not_called()
+
+
 class TestConstants:
     """Constants testleri"""
     
@@ -2,6 +2,7 @@
 Unit tests for exception system
 ==============================
 """
+import logging
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -64,6 +65,30 @@ class TestWMSException:
         assert result["error_code"] == "TEST_ERROR"
         assert result["category"] == "database"
         assert result["severity"] == "critical"
+    
+    @pytest.mark.unit
+    @patch('app.core.exceptions.logger')
+    def test_wms_exception_logs_only_on_demand(self, mock_logger):
+        """Exception oluşturulurken loglanmaz, log() ile loglanır"""
+        exc = WMSException("Test error", severity=ErrorSeverity.HIGH)
+        mock_logger.log.assert_not_called()
+        
+        exc.log()
+        mock_logger.log.assert_called_once()
+        assert mock_logger.log.call_args[0][0] == logging.ERROR
+    
+    @pytest.mark.unit
+    def test_wms_exception_traceback_only_when_requested(self):
+        """to_dict traceback'i yalnızca include_tb ile ekler"""
+        try:
+            raise ValueError("inner")
+        except ValueError as e:
+            exc = WMSException("Test error", original_exception=e)
+        
+        assert "traceback" not in exc.to_dict()
+        tb = exc.to_dict(include_tb=True)["traceback"]
+        assert "ValueError: inner" in tb
+        assert exc.traceback_str is tb
 
 
 class TestDatabaseExceptions:
@@ -186,6 +211,15 @@ class TestBusinessLogicExceptions:
         assert exc.message == "Geçersiz barkod formatı: invalid"
         assert exc.error_code == "INVALID_BARCODE"
         assert exc.context["barcode"] == "invalid"
+    
+    @pytest.mark.unit
+    def test_context_not_mutated(self):
+        """Çağıranın verdiği context dict'i değiştirilmez"""
+        ctx = {"station": "A1"}
+        exc = BarcodeNotFoundException("123", context=ctx)
+        
+        assert ctx == {"station": "A1"}
+        assert exc.context == {"station": "A1", "barcode": "123"}
 
 
 class TestExceptionDecorator:
@@ -226,6 +260,16 @@ class TestExceptionDecorator:
         assert result is None
         mock_logger.exception.assert_called_once()
     
+    @pytest.mark.unit
+    def test_handle_exceptions_bare_decorator(self):
+        """handle_exceptions parantezsiz kullanım testi"""
+        
+        @handle_exceptions
+        def test_function():
+            raise ValueError("Test error")
+        
+        assert test_function() is None
+    
     @pytest.mark.unit
     def test_handle_exceptions_decorator_reraise(self):
         """handle_exceptions decorator reraise testi"""
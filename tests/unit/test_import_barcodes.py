@@ -0,0 +1,138 @@
+"""
+Unit tests for barcode import service
+=====================================
+"""
+from unittest.mock import call, patch
+
+import pytest
+
+import app.services.import_barcodes as ib
+from app.services.import_barcodes import _read_csv, _sheet_rows, load_file
+
+
+class TestSheetRows:
+    """_sheet_rows başlık / sütun indeksi testleri"""
+    
+    @pytest.mark.unit
+    def test_columns_resolved_from_header(self):
+        """Sütun sırası başlıktan çözülmeli, fazladan sütunlar yok sayılmalı"""
+        rows = [
+            ("item_code", "note", "multiplier", "barcode", "warehouse_id"),
+            ("ITEM1", "x", "2", "869000", "1"),
+        ]
+        
+        assert list(_sheet_rows(rows)) == [("869000", 1, "ITEM1", 2.0)]
+    
+    @pytest.mark.unit
+    def test_header_whitespace_and_blank_columns(self):
+        """Başlıktaki boşluklar kırpılmalı, adsız sütunlar atlanmalı"""
+        rows = [
+            (" barcode ", None, "warehouse_id", "", "item_code"),
+            ("111", "?", "0", "?", "A"),
+        ]
+        
+        assert list(_sheet_rows(rows)) == [("111", 0, "A", 1.0)]
+    
+    @pytest.mark.unit
+    def test_missing_multiplier_defaults_to_one(self):
+        """multiplier sütunu yoksa ya da hücre boşsa 1.0 olmalı"""
+        no_column = [("barcode", "warehouse_id", "item_code"), ("1", "0", "A")]
+        empty_cell = [("barcode", "warehouse_id", "item_code", "multiplier"),
+                      ("1", "0", "A", ""), ("2", "0", "B", None)]
+        
+        assert [r[3] for r in _sheet_rows(no_column)] == [1.0]
+        assert [r[3] for r in _sheet_rows(empty_cell)] == [1.0, 1.0]
+    
+    @pytest.mark.unit
+    def test_blank_rows_skipped(self):
+        """Boş satırlar ve barkodu boş satırlar atlanmalı"""
+        rows = [
+            ("barcode", "warehouse_id", "item_code"),
+            (),
+            ("", "0", "A"),
+            (None, "0", "A"),
+            ("2", "0", "B"),
+        ]
+        
+        assert list(_sheet_rows(rows)) == [("2", 0, "B", 1.0)]
+    
+    @pytest.mark.unit
+    def test_excel_numeric_cells(self):
+        """Excel'den gelen float hücreler metne/int'e doğru çevrilmeli"""
+        rows = [
+            ("barcode", "warehouse_id", "item_code", "multiplier"),
+            (8690000000001.0, 1.0, 12345.0, 6.0),
+            (" 42 ", 2, "X-1.5", 0.5),
+        ]
+        
+        assert list(_sheet_rows(rows)) == [
+            ("8690000000001", 1, "12345", 6.0),
+            ("42", 2, "X-1.5", 0.5),
+        ]
+    
+    @pytest.mark.unit
+    def test_empty_input_and_missing_column(self):
+        """Boş girdi satır üretmemeli; zorunlu sütun yoksa KeyError"""
+        assert list(_sheet_rows([])) == []
+        with pytest.raises(KeyError):
+            list(_sheet_rows([("barcode", "item_code"), ("1", "A")]))
+    
+    @pytest.mark.unit
+    def test_read_csv(self, tmp_path):
+        """CSV dosyası başlıktan çözülen sütunlarla okunmalı"""
+        path = tmp_path / "barkod.csv"
+        path.write_text("warehouse_id,barcode,item_code\n0,111,A\n\n1,222,B\n", encoding="utf-8")
+        
+        assert list(_read_csv(path)) == [("111", 0, "A", 1.0), ("222", 1, "B", 1.0)]
+
+
+class TestLoadFile:
+    """load_file #stg staging testleri (mock bağlantı)"""
+    
+    @pytest.fixture
+    def conn(self):
+        with patch.object(ib, "get_connection") as get_connection:
+            yield get_connection.return_value
+    
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        path = tmp_path / "barkod.csv"
+        lines = ["barcode,warehouse_id,item_code,multiplier"]
+        lines += [f"{1000 + i},0,ITEM{i},1" for i in range(5)]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+    
+    @pytest.mark.unit
+    def test_stage_merge_drop_in_one_transaction(self, conn, csv_path):
+        """CREATE → batch INSERT → tek MERGE → DROP sırasıyla, tek commit"""
+        cur = conn.cursor.return_value
+        
+        with patch.object(ib, "STAGE_BATCH", 2):
+            done, secs, err = load_file(str(csv_path))
+        
+        assert (done, err) == (5, 0)
+        assert secs >= 0
+        ib.get_connection.assert_called_once_with(False)
+        assert cur.fast_executemany is True
+        assert cur.execute.call_args_list == [
+            call(ib.SQL_CREATE_STAGE), call(ib.SQL_MERGE_STAGE), call(ib.SQL_DROP_STAGE)]
+        batches = [c.args[1] for c in cur.executemany.call_args_list]
+        assert all(c.args[0] == ib.SQL_INSERT_STAGE for c in cur.executemany.call_args_list)
+        assert [len(b) for b in batches] == [2, 2, 1]
+        assert batches[0][0] == ("1000", 0, "ITEM0", 1.0)
+        conn.commit.assert_called_once()
+        conn.rollback.assert_not_called()
+        conn.close.assert_called_once()
+    
+    @pytest.mark.unit
+    def test_error_rolls_back(self, conn, csv_path):
+        """MERGE hatasında rollback yapılmalı, hata adedi dönmeli"""
+        cur = conn.cursor.return_value
+        cur.execute.side_effect = [None, RuntimeError("merge failed")]
+        
+        done, _, err = load_file(str(csv_path))
+        
+        assert (done, err) == (0, 1)
+        conn.commit.assert_not_called()
+        conn.rollback.assert_called_once()
+        conn.close.assert_called_once()
@@ -61,10 +61,15 @@ class TestSettingsModule:
             # Test set operation
             settings.set("ui.theme", "dark")
             
+            settings.set("ui.font_pt", 12)
+            
             # Değer set edilmeli
             assert settings._cfg["ui"]["theme"] == "dark"
+            assert settings._cfg["ui"]["font_pt"] == 12
             
-            # Save çağrılmalı
+            # Kayıt ertelenmeli, flush ile tek seferde yazılmalı
+            mock_save.assert_not_called()
+            settings.flush()
             mock_save.assert_called_once()
     
     @pytest.mark.unit
@@ -128,26 +133,23 @@ class TestSettingsModule:
             assert result == {}
     
     @pytest.mark.unit
-    def test_save_function(self):
+    def test_save_function(self, tmp_path):
         """Save fonksiyonu testi"""
-        test_config = {"ui": {"theme": "dark"}}
+        test_config = {"ui": {"theme": "dark", "lang": "TR – ğüşiöç"}}
+        cfg_path = tmp_path / "settings.json"
         
         with patch.object(settings, '_cfg', test_config), \
-             patch("builtins.open", mock_open()) as mock_file, \
-             patch("json.dump") as mock_json_dump:
+             patch.object(settings, 'CFG_PATH', cfg_path):
             
             settings.save()
             
-            # Dosya açılmalı
-            mock_file.assert_called_once()
+            # Dosya yazılmalı, UTF-8 ve okunabilir JSON olmalı
+            raw = cfg_path.read_bytes()
+            assert "ğüşiöç".encode("utf-8") in raw
+            assert json.loads(raw) == test_config
             
-            # JSON dump çağrılmalı
-            mock_json_dump.assert_called_once_with(
-                test_config, 
-                mock_file.return_value.__enter__.return_value,
-                ensure_ascii=False,
-                indent=2
-            )
+            # _load_disk aynı içeriği geri okumalı
+            assert settings._load_disk() == test_config
 
 
 class TestSettingsReload:
@@ -0,0 +1,375 @@
+"""
+Unit tests for updater (akış içi ZIP açma)
+==========================================
+"""
+import io
+import json
+import zipfile
+from unittest.mock import Mock, patch
+
+import pytest
+
+import app.core.updater as updater
+from app.core.updater import AutoUpdater, UpdateWorker, _StreamInflater
+
+
+class _Unseekable(io.RawIOBase):
+    """Seek desteklemeyen yazıcı: zipfile data descriptor'lı girdi üretir"""
+    
+    def __init__(self):
+        self.buffer = bytearray()
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+
+def _zip_bytes(files, compression=zipfile.ZIP_DEFLATED):
+    """{ad: içerik} sözlüğünden bellekte ZIP üret"""
+    bio = io.BytesIO()
+    with zipfile.ZipFile(bio, 'w', compression=compression) as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+    return bio.getvalue()
+
+
+def _inflate(data, chunk=1000, max_bytes=1 << 20):
+    """Veriyi parça parça besleyip açılan girdileri döndür"""
+    inflater = _StreamInflater(max_bytes=max_bytes)
+    inflater.start()
+    for i in range(0, len(data), chunk):
+        inflater.feed(data[i:i + chunk])
+    inflater.close()
+    return inflater.entries
+
+
+FILES = {
+    "root/main.py": b"print('merhaba')\n" * 200,
+    "root/app/__init__.py": b"",
+    "root/app/data.bin": bytes(range(256)) * 40,
+}
+
+
+class TestStreamInflater:
+    """_StreamInflater testleri"""
+    
+    @pytest.mark.unit
+    def test_stored_entries(self):
+        """Sıkıştırmasız (stored) girdiler aynen açılmalı"""
+        entries = _inflate(_zip_bytes(FILES, zipfile.ZIP_STORED))
+        
+        assert entries == FILES
+    
+    @pytest.mark.unit
+    def test_deflated_entries(self):
+        """Deflate girdiler akışla açılmalı"""
+        entries = _inflate(_zip_bytes(FILES), chunk=97)
+        
+        assert entries == FILES
+    
+    @pytest.mark.unit
+    def test_data_descriptor_entries(self):
+        """Boyutu başlıkta olmayan (data descriptor) girdiler açılmalı"""
+        raw = _Unseekable()
+        with zipfile.ZipFile(raw, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for name, data in FILES.items():
+                with zf.open(name, 'w') as f:
+                    f.write(data)
+        data = bytes(raw.buffer)
+        
+        # Girdiler gerçekten data descriptor bayrağıyla yazılmış olmalı
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            assert all(info.flag_bits & 0x8 for info in zf.infolist())
+        
+        assert _inflate(data) == FILES
+    
+    @pytest.mark.unit
+    def test_truncated_stream(self):
+        """Yarıda kesilen akışta tamamlanan girdiler kalmalı, takılmamalı"""
+        data = _zip_bytes(FILES)
+        cut = data.find(b"data.bin") + 20  # son girdinin ortası
+        
+        entries = _inflate(data[:cut])
+        
+        assert entries == {name: FILES[name] for name in ("root/main.py", "root/app/__init__.py")}
+    
+    @pytest.mark.unit
+    def test_budget_skips_large_entries(self):
+        """Bütçeyi aşan girdi tutulmamalı, sonraki küçük girdiler açılmalı"""
+        files = {"big.bin": b"x" * 5000, "small.txt": b"ok"}
+        
+        entries = _inflate(_zip_bytes(files), max_bytes=100)
+        
+        assert entries == {"small.txt": b"ok"}
+    
+    @pytest.mark.unit
+    def test_budget_with_data_descriptor(self):
+        """Boyutu bilinmeyen girdi açılırken bütçe aşılınca bırakılmalı"""
+        raw = _Unseekable()
+        with zipfile.ZipFile(raw, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            with zf.open("big.bin", 'w') as f:
+                f.write(b"x" * 5000)
+            with zf.open("small.txt", 'w') as f:
+                f.write(b"ok")
+        
+        entries = _inflate(bytes(raw.buffer), max_bytes=100)
+        
+        assert entries == {"small.txt": b"ok"}
+    
+    @pytest.mark.unit
+    def test_unexpected_error_drains_queue(self):
+        """Beklenmeyen hatada kalan veri tüketilmeli, feed/close bloklanmamalı"""
+        inflater = _StreamInflater()
+        with patch.object(inflater, "_inflate_next", side_effect=RuntimeError("boom")):
+            inflater.start()
+            for _ in range(200):  # kuyruk boyutundan (64) fazla parça
+                inflater.feed(b"x" * 10)
+            inflater.close()
+        
+        assert not inflater.is_alive()
+        assert inflater.entries == {}
+
+
+def _plan(tmp_path, names):
+    """Verilen adlarla ZIP açıp _plan_update_members sonucunu döndür"""
+    worker = UpdateWorker("https://example.invalid/update.zip", str(tmp_path), session=Mock())
+    with zipfile.ZipFile(io.BytesIO(_zip_bytes({name: b"x" for name in names}))) as zf:
+        return [parts for _, parts in worker._plan_update_members(zf)]
+
+
+class TestPlanUpdateMembers:
+    """_plan_update_members testleri"""
+    
+    @pytest.mark.unit
+    def test_common_root_is_stripped(self, tmp_path):
+        """Tek ortak kök klasör (reponame-main/) atılmalı"""
+        plan = _plan(tmp_path, ["repo-main/main.py", "repo-main/app/core/x.py"])
+        
+        assert plan == [("main.py",), ("app", "core", "x.py")]
+    
+    @pytest.mark.unit
+    def test_root_kept_when_files_at_top_level(self, tmp_path):
+        """Kökte dosya varsa ya da birden çok kök varsa yol aynen kalmalı"""
+        assert _plan(tmp_path, ["main.py", "app/x.py"]) == [("main.py",), ("app", "x.py")]
+        assert _plan(tmp_path, ["a/x.py", "b/y.py"]) == [("a", "x.py"), ("b", "y.py")]
+    
+    @pytest.mark.unit
+    def test_skip_rules(self, tmp_path):
+        """Atlanan klasör, dosya adı ve uzantılar plana girmemeli"""
+        plan = _plan(tmp_path, [
+            "repo-main/app/main.py",
+            "repo-main/.git/config",
+            "repo-main/app/__pycache__/main.cpython-311.pyc",
+            "repo-main/app/util.pyc",
+            "repo-main/logs/wms.log",
+            "repo-main/settings.json",
+            "repo-main/app/data/users.json",
+            "repo-main/.env",
+        ])
+        
+        assert plan == [("app", "main.py")]
+    
+    @pytest.mark.unit
+    def test_path_traversal_is_dropped(self, tmp_path):
+        """'..' içeren ya da mutlak yollu girdi yazılmamalı"""
+        plan = _plan(tmp_path, [
+            "repo-main/app/ok.py",
+            "repo-main/../evil.py",
+            "repo-main/app/../../evil.py",
+        ])
+        
+        assert plan == [("app", "ok.py")]
+        assert _plan(tmp_path, ["/etc/passwd", "ok.py"]) == [("ok.py",)]
+
+
+class _FakeResponse:
+    """requests.Response yerine geçen basit yanıt"""
+    
+    def __init__(self, status_code=200, headers=None, body=b""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.ok = status_code < 400
+        self._body = body
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def raise_for_status(self):
+        pass
+    
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self._body), chunk_size):
+            yield self._body[i:i + chunk_size]
+
+
+class TestResumableDownload:
+    """_download_file Range ile devam testleri"""
+    
+    URL = "https://example.invalid/update.zip"
+    BODY = b"0123456789" * 100
+    
+    @pytest.fixture
+    def cache_dir(self, tmp_path):
+        cache = tmp_path / "cache"
+        with patch.object(updater, "UPDATE_CACHE_DIR", cache):
+            yield cache
+    
+    def _worker(self, tmp_path, session):
+        return UpdateWorker(self.URL, str(tmp_path), session=session)
+    
+    def _session(self, get_response, etag='"v1"'):
+        session = Mock()
+        session.head.return_value = _FakeResponse(headers={
+            'content-length': str(len(self.BODY)), 'ETag': etag})
+        session.get.return_value = get_response
+        return session
+    
+    def _leave_part(self, cache_dir, data, validator='"v1"'):
+        """Önceki denemeden kalmış parça ve meta dosyası"""
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        (cache_dir / "update.zip.part").write_bytes(data)
+        (cache_dir / "update.zip.part.json").write_text(
+            json.dumps({'url': self.URL, 'validator': validator}), encoding='utf-8')
+    
+    @pytest.mark.unit
+    def test_fresh_download(self, tmp_path, cache_dir):
+        """Parça yoksa Range olmadan indirilmeli, meta temizlenmeli"""
+        session = self._session(_FakeResponse(200, {'content-length': str(len(self.BODY))}, self.BODY))
+        target = tmp_path / "update.zip"
+        
+        self._worker(tmp_path, session)._download_file(self.URL, target)
+        
+        assert session.get.call_args.kwargs['headers'] == {}
+        assert target.read_bytes() == self.BODY
+        assert not (cache_dir / "update.zip.part.json").exists()
+    
+    @pytest.mark.unit
+    def test_resume_with_range(self, tmp_path, cache_dir):
+        """Aynı sürümün parçası varsa Range/If-Range ile kaldığı yerden devam etmeli"""
+        self._leave_part(cache_dir, self.BODY[:300])
+        rest = self.BODY[300:]
+        session = self._session(_FakeResponse(206, {'content-length': str(len(rest))}, rest))
+        target = tmp_path / "update.zip"
+        
+        self._worker(tmp_path, session)._download_file(self.URL, target)
+        
+        assert session.get.call_args.kwargs['headers'] == {
+            'Range': "bytes=300-", 'If-Range': '"v1"'}
+        assert target.read_bytes() == self.BODY
+    
+    @pytest.mark.unit
+    def test_server_ignores_range(self, tmp_path, cache_dir):
+        """Sunucu 200 ile tam dosya gönderirse parça baştan yazılmalı"""
+        self._leave_part(cache_dir, self.BODY[:300])
+        session = self._session(_FakeResponse(200, {'content-length': str(len(self.BODY))}, self.BODY))
+        target = tmp_path / "update.zip"
+        
+        self._worker(tmp_path, session)._download_file(self.URL, target)
+        
+        assert target.read_bytes() == self.BODY
+    
+    @pytest.mark.unit
+    def test_validator_mismatch_restarts(self, tmp_path, cache_dir):
+        """Parça başka sürüme aitse Range gönderilmeden baştan indirilmeli"""
+        self._leave_part(cache_dir, b"eski-surum", validator='"v0"')
+        session = self._session(_FakeResponse(200, {'content-length': str(len(self.BODY))}, self.BODY))
+        target = tmp_path / "update.zip"
+        
+        self._worker(tmp_path, session)._download_file(self.URL, target)
+        
+        assert session.get.call_args.kwargs['headers'] == {}
+        assert target.read_bytes() == self.BODY
+    
+    @pytest.mark.unit
+    def test_segmented_download_uses_own_sessions(self, tmp_path, cache_dir):
+        """Parçalı indirmede her parça kendi oturumuyla, worker oturumu paylaşılmadan"""
+        body = bytes(range(256)) * (updater.SEGMENTED_MIN_SIZE // 256)
+        session = Mock()
+        session.head.return_value = _FakeResponse(headers={
+            'content-length': str(len(body)), 'ETag': '"v1"', 'Accept-Ranges': 'bytes'})
+        
+        def ranged_get(url, headers, **kwargs):
+            lo, hi = map(int, headers['Range'][len("bytes="):].split('-'))
+            return _FakeResponse(206, {}, body[lo:hi + 1])
+        
+        segment_sessions = []
+        
+        def make_session():
+            seg = Mock()
+            seg.__enter__ = Mock(return_value=seg)
+            seg.__exit__ = Mock(return_value=False)
+            seg.get.side_effect = ranged_get
+            segment_sessions.append(seg)
+            return seg
+        
+        target = tmp_path / "update.zip"
+        with patch.object(updater, "_make_session", side_effect=make_session):
+            self._worker(tmp_path, session)._download_file(self.URL, target)
+        
+        assert target.read_bytes() == body
+        session.get.assert_not_called()
+        assert len(segment_sessions) == updater.DOWNLOAD_SEGMENTS
+        assert all(seg.get.call_count == 1 for seg in segment_sessions)
+    
+    @pytest.mark.unit
+    def test_weak_etag_falls_back_to_last_modified(self, tmp_path, cache_dir):
+        """Zayıf ETag If-Range'de kullanılamaz; Last-Modified kullanılmalı"""
+        modified = "Wed, 01 Jan 2025 00:00:00 GMT"
+        self._leave_part(cache_dir, self.BODY[:300], validator=modified)
+        rest = self.BODY[300:]
+        session = self._session(_FakeResponse(206, {'content-length': str(len(rest))}, rest),
+                                etag='W/"v1"')
+        session.head.return_value.headers['Last-Modified'] = modified
+        
+        self._worker(tmp_path, session)._download_file(self.URL, tmp_path / "update.zip")
+        
+        assert session.get.call_args.kwargs['headers']['If-Range'] == modified
+
+
+class TestBackgroundPoll:
+    """check_updates_on_startup arka plan kontrolü testleri"""
+    
+    @pytest.fixture
+    def qapp(self):
+        from PyQt5.QtCore import QCoreApplication
+        return QCoreApplication.instance() or QCoreApplication([])
+    
+    @pytest.mark.unit
+    def test_poll_runs_off_gui_thread(self, qapp):
+        """HTTP kontrolü worker'da, sonuç ve yeniden planlama GUI thread'inde"""
+        import threading
+        from PyQt5.QtCore import QEventLoop, QTimer
+        
+        auto = AutoUpdater()
+        seen = {}
+        
+        def fake_check(silent=False, session=None):
+            seen['check_thread'] = threading.current_thread()
+            seen['silent'] = silent
+            seen['session'] = session
+            return None
+        
+        loop = QEventLoop()
+        
+        def fake_schedule():
+            seen['schedule_thread'] = threading.current_thread()
+            loop.quit()
+        
+        with patch.object(auto, "should_check_now", return_value=True), \
+             patch.object(auto, "check_for_updates", side_effect=fake_check), \
+             patch.object(auto, "_schedule_next_check", side_effect=fake_schedule):
+            auto.check_updates_on_startup()
+            QTimer.singleShot(5000, loop.quit)  # güvenlik sınırı
+            loop.exec_()
+            auto._check_worker.wait()
+        
+        assert seen['check_thread'] is not threading.main_thread()
+        assert seen['schedule_thread'] is threading.main_thread()
+        assert seen['silent'] is True
+        assert seen['session'] is not None and seen['session'] is not auto._session